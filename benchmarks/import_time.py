@@ -0,0 +1,95 @@
+"""Measure import time and cold-start latency of one_chat in fresh interpreters.
+
+Each run starts a new Python process that times ``import one_chat``,
+``from one_chat import OneChat``, building a client and its first
+``send_message`` (against the local stub server), then prints the timings as
+JSON. The median over ``--runs`` processes is reported. Point ``--tree`` at
+another checkout (e.g. a ``git worktree`` of an older commit) to compare::
+
+    git worktree add /tmp/one-chat-old HEAD~1
+    python benchmarks/import_time.py --tree /tmp/one-chat-old
+    python benchmarks/import_time.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from stub_server import PUSH_MESSAGE, start_stub_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import one_chat
+t1 = time.perf_counter()
+from one_chat import OneChat
+t2 = time.perf_counter()
+client = OneChat("bench")
+t3 = time.perf_counter()
+client.message_sender.base_url = sys.argv[1]
+response = client.send_message("U1", "B1", "hello")
+t4 = time.perf_counter()
+assert response.get("status") == "success", response
+print(json.dumps({
+    "import_one_chat": t1 - t0,
+    "import_OneChat": t2 - t0,
+    "construct_client": t3 - t2,
+    "first_send": t4 - t3,
+    "cold_start": t4 - t0,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def measure(tree: str, url: str, runs: int) -> Dict[str, float]:
+    """Return the median of each timing over `runs` fresh interpreters importing from `tree`."""
+    env = dict(os.environ, PYTHONPATH=tree)
+    samples: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, url + PUSH_MESSAGE],
+            env=env,
+            cwd=tree,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for name, value in json.loads(output).items():
+            samples.setdefault(name, []).append(value)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure one_chat import and cold-start time.")
+    parser.add_argument("--runs", type=int, default=15, help="fresh interpreters to sample")
+    parser.add_argument("--tree", default=ROOT, help="source tree to import one_chat from")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    server = start_stub_server()
+    try:
+        # One throwaway run so every tree starts with warm .pyc files and disk cache.
+        measure(args.tree, server.url, 1)
+        result = measure(args.tree, server.url, args.runs)
+    finally:
+        server.shutdown()
+
+    for name, value in result.items():
+        if name == "modules":
+            print(f"{name:<18} {value:>9.0f}")
+        else:
+            print(f"{name:<18} {value * 1000:>8.2f}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"tree": args.tree, "runs": args.runs, "median": result}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Compare JSON encode/decode cost of the available codecs on typical payloads.
+
+Times, per payload, encoding a request body and decoding a response body the
+way each option does it: ``requests`` (``json=`` plus ``response.json()``,
+the behaviour before codecs existed), the stdlib :class:`JSONCodec` and, when
+installed, :class:`OrjsonCodec`. Run with ``python benchmarks/json_codec.py``.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.models import PreparedRequest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from one_chat.codec import JSONCodec, OrjsonCodec  # noqa: E402
+
+THAI = "สวัสดีครับ ยินดีต้อนรับสู่บริการของเรา "
+
+
+def payloads() -> Dict[str, Tuple[Any, bytes]]:
+    """Return name -> (request payload, response body) for the benchmark cases."""
+    ok = b'{"status":"success"}'
+    broadcast = {"bot_id": "B" * 32, "to": [f"U{i:032d}" for i in range(100)], "message": THAI * 20}
+    carousel = {
+        "to": "U1",
+        "bot_id": "B1",
+        "elements": [
+            {
+                "image": f"https://example.com/{i}.png",
+                "title": THAI,
+                "detail": THAI * 3,
+                "choice": [{"label": "ดูเพิ่มเติม", "type": "link", "url": "https://example.com"}],
+            }
+            for i in range(10)
+        ],
+    }
+    listroom = json.dumps(
+        {
+            "status": "success",
+            "list_friend": [
+                {"one_id": f"U{i:032d}", "display_name": f"ผู้ใช้ {i}", "user_id": str(i)}
+                for i in range(2000)
+            ],
+            "list_group": [],
+        }
+    ).encode()
+    return {
+        "send_message": ({"to": "U1", "bot_id": "B1", "type": "text", "message": THAI}, ok),
+        "broadcast_100": (broadcast, ok),
+        "image_carousel": (carousel, ok),
+        "getlistroom_2000": ({"bot_id": "B1"}, listroom),
+    }
+
+
+def requests_default() -> Tuple[Callable[[Any], Any], Callable[[bytes], Any]]:
+    def encode(payload: Any) -> Any:
+        request = PreparedRequest()
+        request.prepare_headers({})
+        request.prepare_body(data=None, files=None, json=payload)
+        return request.body
+
+    def decode(body: bytes) -> Any:
+        response = requests.Response()
+        response._content = body
+        response.status_code = 200
+        return response.json()
+
+    return encode, decode
+
+
+def best_of(call: Callable[[], Any], number: int) -> float:
+    """Return the fastest of three timings of `number` calls, in seconds."""
+    return min(timeit.repeat(call, number=number, repeat=3))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing")
+    args = parser.parse_args(argv)
+
+    codecs: Dict[str, Tuple[Callable[[Any], Any], Callable[[bytes], Any]]] = {
+        "requests": requests_default()
+    }
+    for codec_class in (JSONCodec, OrjsonCodec):
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f"skipping {codec_class.name}: not installed")
+            continue
+        codecs[codec.name] = (codec.dumps, codec.loads)
+
+    print(f"{'payload':<18} {'codec':<9} {'encode':>10} {'decode':>10} {'body':>9}")
+    for name, (payload, response) in payloads().items():
+        for codec_name, (encode, decode) in codecs.items():
+            number = max(1, args.number // 10) if name.startswith("getlistroom") else args.number
+            encode_us = best_of(functools.partial(encode, payload), number)
+            decode_us = best_of(functools.partial(decode, response), number)
+            print(
+                f"{name:<18} {codec_name:<9}"
+                f" {encode_us / number * 1e6:>8.1f}us {decode_us / number * 1e6:>8.1f}us"
+                f" {len(encode(payload)):>8}B"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""Benchmark the client against a local stub of the OneChat API.
+
+Every sender and bulk mode is driven through the real network stack
+(requests/urllib3, or aiohttp for the async client) against
+``stub_server.StubOneChatServer``. For each scenario the harness records
+throughput, latency percentiles, the number of HTTP requests and errors,
+and peak Python memory. Results are printed as a table and written as JSON,
+which ``--compare`` can check against an earlier run.
+
+Examples::
+
+    python benchmarks/run.py --ops 500 --concurrency 8 --output results.json
+    python benchmarks/run.py --latency-ms 20 --error-rate 0.05 --retries 3
+    python benchmarks/run.py --only send_message,broadcast_bulk --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubOneChatServer, start_stub_server  # noqa: E402
+
+import one_chat  # noqa: E402
+from one_chat import OneChat, RetryPolicy  # noqa: E402
+
+API_ORIGIN = "https://chat-api.one.th"
+BOT_ID = "B_BENCH"
+TEMPLATE = [{"type": "text", "message": "hello"}]
+QUICK_REPLY = [{"label": "Yes", "type": "text", "message": "yes", "payload": "y"}]
+CAROUSEL = [
+    {
+        "image": f"https://example.com/{i}.png",
+        "title": f"สินค้า {i}",
+        "detail": "รายละเอียดสินค้า " * 4,
+        "choice": [{"label": "ดูเพิ่มเติม", "type": "link", "url": "https://example.com"}],
+    }
+    for i in range(10)
+]
+
+Operation = Callable[[OneChat, int], Any]
+
+
+def point_at(client: OneChat, base_url: str) -> None:
+    """Redirect every sender of `client` from the real API to `base_url`."""
+    for sender in (
+        client.message_sender,
+        client.broadcast_sender,
+        client.location_sender,
+        client.sticker_sender,
+        client.quick_reply_sender,
+        client.image_carousel_sender,
+        client.friends_and_groups,
+    ):
+        for attr in ("base_url", "url", "api_url"):
+            value = getattr(sender, attr, None)
+            if isinstance(value, str) and value.startswith(API_ORIGIN):
+                setattr(sender, attr, base_url + value[len(API_ORIGIN) :])
+
+
+def sync_scenarios(upload_path: str, concurrency: int) -> Dict[str, Operation]:
+    """Return the synchronous scenarios: one facade call per operation."""
+    audience = [f"U{i}" for i in range(1000)]
+    prepared: Dict[int, Any] = {}
+
+    def send_prepared_carousel(c: OneChat, i: int) -> Any:
+        if id(c) not in prepared:
+            prepared[id(c)] = c.prepare("send_image_carousel", BOT_ID, CAROUSEL)
+        return c.send_prepared(prepared[id(c)], f"U{i}")
+
+    return {
+        "send_message": lambda c, i: c.send_message(f"U{i}", BOT_ID, "hello"),
+        "send_template": lambda c, i: c.send_template(f"U{i}", BOT_ID, TEMPLATE),
+        "send_webview": lambda c, i: c.send_webview(f"U{i}", BOT_ID, "https://example.com"),
+        "send_file": lambda c, i: c.send_file(f"U{i}", BOT_ID, upload_path),
+        "send_location": lambda c, i: c.send_location(f"U{i}", BOT_ID, "13.7", "100.5", "BKK"),
+        "send_sticker": lambda c, i: c.send_sticker(f"U{i}", BOT_ID, "STK1"),
+        "send_quickreply": lambda c, i: c.send_quickreply(f"U{i}", BOT_ID, "pick", QUICK_REPLY),
+        "send_image_carousel": lambda c, i: c.send_image_carousel(f"U{i}", BOT_ID, CAROUSEL),
+        "send_prepared_carousel": send_prepared_carousel,
+        "broadcast_message": lambda c, i: c.broadcast_message(BOT_ID, audience[:100], "hi"),
+        "fetch_friends_and_groups": lambda c, i: c.fetch_friends_and_groups(BOT_ID),
+        # Bulk modes: one operation fans out to many requests.
+        "broadcast_bulk": lambda c, i: c.broadcast_bulk(
+            BOT_ID, audience, "hi", max_workers=concurrency
+        ),
+        "send_many": lambda c, i: list(
+            c.send_many("send_message", audience[:100], BOT_ID, "hi", max_workers=concurrency)
+        ),
+    }
+
+
+BULK_SCENARIOS = ("broadcast_bulk", "send_many")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def is_error(response: Any) -> bool:
+    if isinstance(response, dict) and "chunks" in response:  # broadcast_bulk
+        return response["status"] != "success"
+    if isinstance(response, list):  # send_many
+        return any(r.get("status") != "success" for _, r in response)
+    return not (isinstance(response, dict) and response.get("status") == "success")
+
+
+def summarize(
+    name: str,
+    latencies: List[float],
+    errors: int,
+    seconds: float,
+    requests: int,
+    peak_bytes: Optional[int],
+) -> Dict[str, Any]:
+    latencies.sort()
+    ops = len(latencies)
+    return {
+        "scenario": name,
+        "ops": ops,
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(seconds, 4),
+        "ops_per_sec": round(ops / seconds, 1) if seconds else 0.0,
+        "req_per_sec": round(requests / seconds, 1) if seconds else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / ops * 1000, 3) if ops else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if ops else 0.0,
+        },
+        "peak_mem_kib": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+    }
+
+
+def run_sync(
+    name: str,
+    op: Operation,
+    client: OneChat,
+    server: StubOneChatServer,
+    ops: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    def timed(i: int) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        response = op(client, i)
+        return time.perf_counter() - started, is_error(response)
+
+    workers = 1 if name in BULK_SCENARIOS else concurrency
+    for i in range(min(5, ops)):  # warm up connections
+        op(client, i)
+
+    requests_before = server.total_requests()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        # Results are tallied here, on the main thread, not by the workers.
+        outcomes = list(pool.map(timed, range(ops)))
+    seconds = time.perf_counter() - started
+    latencies = [latency for latency, _ in outcomes]
+    errors = sum(failed for _, failed in outcomes)
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "seconds": seconds,
+        "requests": server.total_requests() - requests_before,
+    }
+
+
+def measure_peak(run: Callable[[], Any]) -> int:
+    """Return the peak traced Python allocation while `run` executes."""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_async(
+    server: StubOneChatServer, ops: int, concurrency: int, retries: int, json_codec: str = "auto"
+) -> Dict[str, Any]:
+    from one_chat.async_client import AsyncOneChat
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def main() -> float:
+        nonlocal errors
+        policy = RetryPolicy(max_attempts=retries, backoff_base=0.01)
+        async with AsyncOneChat(
+            "bench",
+            base_url=server.url,
+            max_concurrency=concurrency,
+            retry_policy=policy,
+            json_codec=json_codec,
+        ) as client:
+
+            async def one(i: int) -> None:
+                nonlocal errors
+                started = time.perf_counter()
+                response = await client.send_message(f"U{i}", BOT_ID, "hello")
+                latencies.append(time.perf_counter() - started)
+                if is_error(response):
+                    errors += 1
+
+            await asyncio.gather(*(one(i) for i in range(min(5, ops))))
+            latencies.clear()
+            errors = 0
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(ops)))
+            return time.perf_counter() - started
+
+    requests_before = server.total_requests()
+    seconds = asyncio.run(main())
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "seconds": seconds,
+        # The warm-up calls are included here; they are few next to `ops`.
+        "requests": server.total_requests() - requests_before,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Return regressions of throughput or p99 latency beyond `threshold` (a fraction)."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {r["scenario"]: r for r in json.load(fh)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["scenario"])
+        if before is None:
+            continue
+        if result["req_per_sec"] < before["req_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{result['scenario']}: req/s {before['req_per_sec']} -> {result['req_per_sec']}"
+            )
+        if result["latency_ms"]["p99"] > before["latency_ms"]["p99"] * (1 + threshold):
+            regressions.append(
+                f"{result['scenario']}: p99 {before['latency_ms']['p99']}ms -> "
+                f"{result['latency_ms']['p99']}ms"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark one_chat against a local stub API.")
+    parser.add_argument("--ops", type=int, default=300, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of errors")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retries", type=int, default=1, help="max attempts per call")
+    parser.add_argument(
+        "--json-codec", default="auto", choices=("auto", "orjson", "json"), help="JSON codec"
+    )
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression")
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    upload = tempfile.NamedTemporaryFile(suffix=".bin", delete=False)
+    upload.write(os.urandom(256 * 1024))
+    upload.close()
+
+    client = OneChat(
+        "bench",
+        pool_maxsize=max(10, args.concurrency),
+        retry_policy=RetryPolicy(max_attempts=args.retries, backoff_base=0.01),
+        json_codec=args.json_codec,
+    )
+    point_at(client, server.url)
+    scenarios = sync_scenarios(upload.name, args.concurrency)
+    names = list(scenarios) + ["async_send_message"]
+    if args.only:
+        names = [n for n in names if n in args.only.split(",")]
+
+    results = []
+    try:
+        for name in names:
+            if name == "async_send_message":
+                try:
+                    import aiohttp  # noqa: F401
+                except ImportError:
+                    print("skipping async_send_message: aiohttp is not installed")
+                    continue
+                run = run_async(server, args.ops, args.concurrency, args.retries, args.json_codec)
+            else:
+                run = run_sync(name, scenarios[name], client, server, args.ops, args.concurrency)
+            peak = None
+            if not args.no_memory:
+                small = max(1, args.ops // 10)
+                if name == "async_send_message":
+                    peak = measure_peak(
+                        functools.partial(
+                            run_async,
+                            server,
+                            small,
+                            args.concurrency,
+                            args.retries,
+                            args.json_codec,
+                        )
+                    )
+                else:
+                    peak = measure_peak(
+                        functools.partial(
+                            run_sync, name, scenarios[name], client, server, small, args.concurrency
+                        )
+                    )
+            result = summarize(
+                name, run["latencies"], run["errors"], run["seconds"], run["requests"], peak
+            )
+            results.append(result)
+            latency = result["latency_ms"]
+            line = (
+                f"{name:<26} {result['ops_per_sec']:>9.1f} ops/s"
+                f" {result['req_per_sec']:>9.1f} req/s"
+                f"  p50 {latency['p50']:>8.2f}ms  p99 {latency['p99']:>8.2f}ms"
+                f"  errors {result['errors']:>4}"
+            )
+            if peak is not None:
+                line += f"  peak {result['peak_mem_kib']:>8.1f}KiB"
+            print(line, flush=True)
+    finally:
+        client.close()
+        server.shutdown()
+        os.unlink(upload.name)
+
+    report = {
+        "meta": {
+            "one_chat": one_chat.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "options": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Local stand-in for the OneChat API used by the benchmarks.
+
+Answers the endpoints the library calls (push_message, broadcast_group,
+push_quickreply, image-carousel and getlistroom) over keep-alive HTTP/1.1,
+with optional added latency and injected errors. Run it on its own with
+``python benchmarks/stub_server.py --port 8080`` or start it in-process via
+:func:`start_stub_server`.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+PUSH_MESSAGE = "/message/api/v1/push_message"
+BROADCAST = "/bc_msg/api/v1/broadcast_group"
+QUICKREPLY = "/message/api/v1/push_quickreply"
+IMAGE_CAROUSEL = "/bot-message/api/v1/image-carousel"
+GETLISTROOM = "/manage/api/v1/getlistroom"
+
+ENDPOINTS = (PUSH_MESSAGE, BROADCAST, QUICKREPLY, IMAGE_CAROUSEL, GETLISTROOM)
+
+
+def _listroom_payload(friends: int) -> bytes:
+    return json.dumps(
+        {
+            "status": "success",
+            "list_friend": [
+                {"one_id": f"U{i}", "display_name": f"User {i}", "user_id": f"u{i}"}
+                for i in range(friends)
+            ],
+            "list_group": [{"group_id": f"G{i}", "group_name": f"Group {i}"} for i in range(10)],
+        }
+    ).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubOneChatServer"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, body, headers = self.server.answer(self.path)
+        if self.server.latency:
+            time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class StubOneChatServer(ThreadingHTTPServer):
+    """Threaded stub server; see the module docstring."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        friends: int = 1000,
+    ):
+        """Bind the server.
+
+        Parameters:
+        - latency: Seconds added to every response.
+        - jitter: Extra uniformly random seconds (0..jitter) per response.
+        - error_rate: Fraction of requests answered with `error_status`.
+        - error_status: Status used for injected errors (429 adds Retry-After: 0).
+        - friends: Number of friends returned by getlistroom.
+        """
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._ok = json.dumps({"status": "success"}).encode()
+        self._error = json.dumps({"status": "fail", "message": "injected error"}).encode()
+        self._listroom = _listroom_payload(friends)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def total_requests(self) -> int:
+        """Return the number of requests answered so far."""
+        with self._lock:
+            return sum(self.counts.values())
+
+    def answer(self, path: str) -> Tuple[int, bytes, Dict[str, str]]:
+        """Return the status, body and extra headers for a request to `path`."""
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+        if path not in ENDPOINTS:
+            return 404, json.dumps({"message": "not found"}).encode(), {}
+        if self.error_rate and random.random() < self.error_rate:
+            headers = {"Retry-After": "0"} if self.error_status == 429 else {}
+            return self.error_status, self._error, headers
+        return 200, self._listroom if path == GETLISTROOM else self._ok, {}
+
+
+def start_stub_server(**options: Any) -> StubOneChatServer:
+    """Start a :class:`StubOneChatServer` on a background thread and return it."""
+    server = StubOneChatServer(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+    server = StubOneChatServer(
+        args.host,
+        args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    print(f"Stub OneChat API listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
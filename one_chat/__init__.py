@@ -1,11 +1,126 @@
-from typing import List, Optional, Union
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Iterable, List, Mapping, Optional, Tuple, Union
 
 # one_chat/__init__.py
-from .one_chat import OneChat
+from .bulk import DEFAULT_BULK_WORKERS
+
+if TYPE_CHECKING:
+    from .async_client import AsyncOneChat
+    from .campaign import Campaign
+    from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+    from .client_pool import ClientPool
+    from .codec import JSONCodec, OrjsonCodec
+    from .directory import Directory, DirectoryDiff
+    from .dispatcher import CampaignDispatcher
+    from .hooks import Hooks, RequestEvent
+    from .idempotency import DuplicateSendError, SendDeduplicator
+    from .metrics import Metrics
+    from .one_chat import OneChat
+    from .outbox import Outbox
+    from .prepared import PreparedMessage
+    from .rate_limit import RateLimiter, SharedRateLimiter
+    from .retry import RetryBudget, RetryPolicy
+    from .scheduler import Scheduler
+    from .transport import PoolStats, Transport
+    from .upload_cache import UploadCache
 
 __version__ = "0.4.2"
 
-ONE_CHAT_INSTANCE: Optional[OneChat] = None
+# Public classes and the submodule defining each. They are imported on first
+# attribute access (PEP 562), so ``import one_chat`` does not pay for requests,
+# aiohttp or sqlite3 until the code actually uses them.
+_LAZY_ATTRIBUTES = {
+    "AsyncOneChat": "async_client",
+    "Campaign": "campaign",
+    "CampaignDispatcher": "dispatcher",
+    "CircuitBreaker": "circuit_breaker",
+    "CircuitBreakerRegistry": "circuit_breaker",
+    "CircuitOpenError": "circuit_breaker",
+    "ClientPool": "client_pool",
+    "Directory": "directory",
+    "DirectoryDiff": "directory",
+    "DuplicateSendError": "idempotency",
+    "Hooks": "hooks",
+    "JSONCodec": "codec",
+    "Metrics": "metrics",
+    "OneChat": "one_chat",
+    "OrjsonCodec": "codec",
+    "Outbox": "outbox",
+    "PoolStats": "transport",
+    "PreparedMessage": "prepared",
+    "RateLimiter": "rate_limit",
+    "RequestEvent": "hooks",
+    "RetryBudget": "retry",
+    "RetryPolicy": "retry",
+    "Scheduler": "scheduler",
+    "SendDeduplicator": "idempotency",
+    "SharedRateLimiter": "rate_limit",
+    "Transport": "transport",
+    "UploadCache": "upload_cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+__all__ = [
+    "AsyncOneChat",
+    "Campaign",
+    "CampaignDispatcher",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "CircuitOpenError",
+    "ClientPool",
+    "Directory",
+    "DirectoryDiff",
+    "DuplicateSendError",
+    "Hooks",
+    "JSONCodec",
+    "Metrics",
+    "OneChat",
+    "OrjsonCodec",
+    "Outbox",
+    "PoolStats",
+    "PreparedMessage",
+    "RateLimiter",
+    "RequestEvent",
+    "RetryBudget",
+    "RetryPolicy",
+    "Scheduler",
+    "SendDeduplicator",
+    "SharedRateLimiter",
+    "Transport",
+    "UploadCache",
+    "init",
+    "init_pool",
+    "send_message",
+    "send_template",
+    "send_file",
+    "send_webview",
+    "broadcast_message",
+    "broadcast_bulk",
+    "send_location",
+    "send_sticker",
+    "send_quickreply",
+    "send_image_carousel",
+    "fetch_friends_and_groups",
+    "list_all_friends",
+    "list_friend_ids",
+    "list_all_groups",
+    "list_group_ids",
+]
+
+ONE_CHAT_INSTANCE: Optional[Union["OneChat", "ClientPool"]] = None
 DEFAULT_TO: Optional[str] = None
 DEFAULT_BOT_ID: Optional[str] = None
 
@@ -17,11 +132,32 @@ def init(authorization_token: str, to: Optional[str] = None, bot_id: Optional[st
     if not provided explicitly.
     """
     global ONE_CHAT_INSTANCE, DEFAULT_TO, DEFAULT_BOT_ID
+    from .one_chat import OneChat
+
     ONE_CHAT_INSTANCE = OneChat(authorization_token)
     DEFAULT_TO = to
     DEFAULT_BOT_ID = bot_id
 
 
+def init_pool(
+    bots: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+    to: Optional[str] = None,
+    bot_id: Optional[str] = None,
+    **options: Any,
+):
+    """Initialize a global :class:`ClientPool` for several (bot_id, token) pairs.
+
+    Wrapper functions then route each call to the client of its `bot_id`;
+    `options` are passed to :class:`ClientPool`.
+    """
+    global ONE_CHAT_INSTANCE, DEFAULT_TO, DEFAULT_BOT_ID
+    from .client_pool import ClientPool
+
+    ONE_CHAT_INSTANCE = ClientPool(bots, **options)
+    DEFAULT_TO = to
+    DEFAULT_BOT_ID = bot_id
+
+
 def send_message(
     to: Optional[str] = None,
     bot_id: Optional[str] = None,
@@ -153,6 +289,33 @@ def broadcast_message(
     return ONE_CHAT_INSTANCE.broadcast_message(bot_id, to, message)
 
 
+def broadcast_bulk(
+    bot_id: Optional[str] = None,
+    to: Optional[Iterable[str]] = None,
+    message: Optional[str] = None,
+    max_workers: int = DEFAULT_BULK_WORKERS,
+):
+    """Broadcast a message to any number of recipients using the global client.
+
+    Recipients are de-duplicated and sent in parallel chunks of 100; see
+    :meth:`BroadcastSender.broadcast_bulk` for the aggregated result format.
+    """
+    if ONE_CHAT_INSTANCE is None:
+        raise Exception(
+            "OneChat is not initialized. Call init(authorization_token, to, bot_id) first."
+        )
+
+    bot_id = bot_id or DEFAULT_BOT_ID
+
+    if to is None or not bot_id:
+        raise ValueError(
+            "Both 'to' and 'bot_id' must be provided either during "
+            "initialization or when calling this method."
+        )
+
+    return ONE_CHAT_INSTANCE.broadcast_bulk(bot_id, to, message, max_workers)
+
+
 def send_location(
     to: Optional[str] = None,
     bot_id: Optional[str] = None,
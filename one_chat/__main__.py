@@ -0,0 +1,5 @@
+# one_chat/__main__.py
+
+from .cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,562 @@
+# one_chat/async_client.py
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None  # type: ignore[assignment]
+
+from .circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from .codec import JSONCodec, get_codec
+from .directory import Directory
+from .hooks import (
+    CONNECTION_ACQUIRED,
+    ERROR,
+    HEADERS_SENT,
+    JSON_DECODED,
+    RESPONSE_RECEIVED,
+    Hooks,
+)
+from .idempotency import DUPLICATE, DuplicateSendError, SendDeduplicator, request_key
+from .metrics import ERROR_STATUS, Metrics
+from .prepared import PreparedMessage, prepare_message
+from .rate_limit import RateLimiter, endpoint_name, parse_retry_after
+from .retry import RetryPolicy
+from .singleflight import AsyncSingleFlight
+
+API_BASE_URL = "https://chat-api.one.th"
+MESSAGE_PATH = "/message/api/v1/push_message"
+BROADCAST_PATH = "/bc_msg/api/v1/broadcast_group"
+QUICKREPLY_PATH = "/message/api/v1/push_quickreply"
+IMAGE_CAROUSEL_PATH = "/bot-message/api/v1/image-carousel"
+GETLISTROOM_PATH = "/manage/api/v1/getlistroom"
+
+# Endpoint path for each method a PreparedMessage can be built for.
+PREPARED_PATHS = {
+    "send_message": MESSAGE_PATH,
+    "send_template": MESSAGE_PATH,
+    "send_sticker": MESSAGE_PATH,
+    "send_quickreply": QUICKREPLY_PATH,
+    "send_image_carousel": IMAGE_CAROUSEL_PATH,
+}
+
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+
+def _hooks_trace_config() -> "aiohttp.TraceConfig":
+    """Build an aiohttp TraceConfig forwarding connection events to :class:`Hooks`.
+
+    Each request passes its :class:`~one_chat.hooks.RequestContext` as
+    ``trace_request_ctx``.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def forward(name: str, **attributes: Any) -> Any:
+        async def callback(session: Any, trace_ctx: Any, params: Any) -> None:
+            context = trace_ctx.trace_request_ctx
+            if context is not None:
+                context.emit(name, **attributes)
+
+        return callback
+
+    trace_config.on_connection_reuseconn.append(forward(CONNECTION_ACQUIRED, reused=True))
+    trace_config.on_connection_create_end.append(forward(CONNECTION_ACQUIRED, reused=False))
+    trace_config.on_request_headers_sent.append(forward(HEADERS_SENT))
+    return trace_config
+
+
+class AsyncOneChat:
+    """asyncio counterpart of :class:`OneChat` built on an aiohttp connection pool.
+
+    Every coroutine mirrors the synchronous facade method of the same name and
+    returns the same dict shapes. A per-client semaphore caps the number of
+    requests in flight. Requires the optional ``aiohttp`` dependency
+    (``pip install one-chat-api[async]``).
+    """
+
+    def __init__(
+        self,
+        authorization_token: str,
+        base_url: str = API_BASE_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        metrics: Optional[Metrics] = None,
+        hooks: Optional[Hooks] = None,
+        json_codec: Union[None, str, JSONCodec] = None,
+        deduplicator: Optional[SendDeduplicator] = None,
+    ):
+        """Initialize an async OneChat client.
+
+        Parameters:
+        - authorization_token: The Bearer token (with or without the
+          leading "Bearer ").
+        - base_url: API origin, overridable for testing.
+        - max_concurrency: Maximum requests in flight for this client.
+        - pool_maxsize: Maximum pooled connections kept open.
+        - idle_timeout: Seconds an idle keep-alive connection is kept.
+        - rate_limiter: Optional :class:`RateLimiter` pacing requests per
+          (bot_id, endpoint); may be shared with synchronous clients.
+        - retry_policy: Optional :class:`RetryPolicy` for all calls; without
+          one each call is attempted exactly once.
+        - circuit_breakers: Optional :class:`CircuitBreakerRegistry`; calls to
+          an endpoint whose circuit is open fail fast.
+        - metrics: Optional :class:`Metrics` recording latency, request and response
+          bytes, errors and retries per endpoint.
+        - hooks: Optional :class:`Hooks` receiving request lifecycle events.
+        - json_codec: :class:`JSONCodec` or "orjson"/"json" for request and
+          response bodies; defaults to orjson when installed.
+        - deduplicator: Optional :class:`SendDeduplicator` dropping sends
+          identical to (or sharing the ``idempotency_key=`` of) one accepted
+          within its window; may be shared with synchronous clients.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncOneChat requires aiohttp. Install it with: pip install one-chat-api[async]"
+            )
+        if authorization_token.startswith("Bearer "):
+            authorization_token = authorization_token.replace("Bearer ", "", 1)
+        self.authorization_token = authorization_token
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.circuit_breakers = circuit_breakers
+        self.metrics = metrics
+        self.hooks = hooks
+        self.json_codec = get_codec(json_codec)
+        self.deduplicator = deduplicator
+        self.headers = {
+            "Authorization": f"Bearer {authorization_token}",
+            "Content-Type": "application/json",
+        }
+        self._flight = AsyncSingleFlight()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Create the pooled session lazily, inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize, keepalive_timeout=self.idle_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(sock_connect=5, sock_read=15),
+                trace_configs=[_hooks_trace_config()] if self.hooks is not None else None,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _post(
+        self,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        error_status: Optional[str] = None,
+        bot_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """POST to `path`, returning JSON on 200 or a normalized error dict.
+
+        `error_status` forces the status of normalized errors (the broadcast
+        endpoint always reports "fail"); otherwise the server's status is kept.
+        `bot_id` keys the rate limiter and defaults to the JSON payload's.
+        A callable `data` is invoked per attempt so retries get a fresh body.
+        With a deduplicator, a send whose key (from `idempotency_key`, else
+        the encoded body) was accepted within its window returns a
+        "duplicate" result without being sent.
+        """
+        url = self.base_url + path
+        if bot_id is None and json is not None:
+            bot_id = json.get("bot_id")
+        request_bytes = None
+        if json is not None:
+            # Encoded once with the codec and reused by every attempt.
+            try:
+                data = self.json_codec.dumps(json)
+            except (TypeError, ValueError) as e:
+                return {"status": "fail", "message": f"Request failed: {e}"}
+            request_bytes = len(data)
+        deduplicator = self.deduplicator
+        key = None
+        if deduplicator is not None:
+            key = request_key(url, data, idempotency_key)
+        if deduplicator is None or key is None:
+            return await self._post_attempts(
+                url, data, headers, error_status, bot_id, request_bytes
+            )
+        if not deduplicator.begin(key):
+            error = DuplicateSendError(
+                f"Duplicate send to '{endpoint_name(url)}' suppressed (key {key.hex()})."
+            )
+            if self.metrics is not None:
+                self.metrics.record_error(endpoint_name(url), error)
+            return {"status": DUPLICATE, "message": str(error)}
+        try:
+            return await self._post_attempts(
+                url, data, headers, error_status, bot_id, request_bytes, key
+            )
+        finally:
+            deduplicator.release(key)
+
+    async def _post_attempts(
+        self,
+        url: str,
+        data: Any,
+        headers: Optional[Dict[str, str]],
+        error_status: Optional[str],
+        bot_id: Optional[str],
+        request_bytes: Optional[int],
+        key: Optional[bytes] = None,
+    ) -> Dict[str, Any]:
+        """Send `data` to `url`, retrying as the retry policy allows.
+
+        `key` is committed to the deduplicator once the API answers 200.
+        """
+        session = self._get_session()
+        assert self._semaphore is not None
+        self.retry_policy.record_request()
+        breaker = self.circuit_breakers.get(url) if self.circuit_breakers is not None else None
+        metrics = self.metrics
+        endpoint = endpoint_name(url)
+        hooks = self.hooks
+        request_id = hooks.new_request_id() if hooks is not None else 0
+
+        attempt = 1
+        while True:
+            context = hooks.start(request_id, attempt, url, bot_id) if hooks is not None else None
+            if breaker is not None and not breaker.allow():
+                error = CircuitOpenError(f"Circuit open for '{breaker.name}'; failing fast.")
+                if metrics is not None:
+                    metrics.record_error(endpoint, error)
+                if context is not None:
+                    context.emit(ERROR, error=error)
+                return {"status": "fail", "message": f"Request failed: {str(error)}"}
+            # An allowed call must record an outcome or hand its half-open probe back.
+            settled = False
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    if self.rate_limiter is not None:
+                        await self.rate_limiter.acquire_async(bot_id, url)
+                    started = time.perf_counter()
+                    async with session.post(
+                        url,
+                        headers=headers if headers is not None else self.headers,
+                        data=data() if callable(data) else data,
+                        trace_request_ctx=context,
+                    ) as response:
+                        if metrics is not None or context is not None:
+                            body = await response.read()
+                        if metrics is not None:
+                            metrics.observe(
+                                endpoint,
+                                str(response.status),
+                                time.perf_counter() - started,
+                                request_bytes=request_bytes,
+                                response_bytes=len(body),
+                            )
+                        if context is not None:
+                            context.emit(RESPONSE_RECEIVED, status=response.status, bytes=len(body))
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        if breaker is not None:
+                            if response.status >= 500:
+                                breaker.record_failure()
+                            else:
+                                breaker.record_success()
+                            settled = True
+                        if self.rate_limiter is not None:
+                            self.rate_limiter.on_response(bot_id, url, response.status, retry_after)
+                        if response.status == 200:
+                            if key is not None and self.deduplicator is not None:
+                                self.deduplicator.commit(key)
+                            try:
+                                result = await response.json(
+                                    content_type=None, loads=self.json_codec.loads
+                                )
+                            except (ValueError, aiohttp.ContentTypeError) as e:
+                                return {"status": "fail", "message": f"Request failed: {e}"}
+                            if context is not None:
+                                context.emit(JSON_DECODED)
+                            return result
+                        delay = self.retry_policy.next_delay(
+                            attempt, status_code=response.status, retry_after=retry_after
+                        )
+                        if delay is None:
+                            return await self._handle_error(response, error_status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if breaker is not None:
+                    breaker.record_failure(timeout=isinstance(e, asyncio.TimeoutError))
+                    settled = True
+                if metrics is not None:
+                    metrics.observe(endpoint, ERROR_STATUS, time.perf_counter() - started)
+                    metrics.record_error(endpoint, e)
+                if context is not None:
+                    context.emit(ERROR, error=e)
+                retryable = isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+                delay = self.retry_policy.next_delay(attempt) if retryable else None
+                if delay is None:
+                    return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            finally:
+                if breaker is not None and not settled:
+                    breaker.release_probe()
+
+            if metrics is not None:
+                metrics.record_retry(endpoint)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _handle_error(
+        self, response: "aiohttp.ClientResponse", error_status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Normalize API error responses to a consistent structure."""
+        try:
+            error_response = await response.json(content_type=None, loads=self.json_codec.loads)
+            return {
+                "status": error_status or error_response.get("status", "fail"),
+                "message": error_response.get("message", "Unknown error occurred."),
+            }
+        except ValueError:
+            return {"status": "fail", "message": "Invalid response from the server."}
+
+    async def send_message(
+        self,
+        to: str,
+        bot_id: str,
+        message: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a plain text message to a user."""
+        payload = {"to": to, "bot_id": bot_id, "type": "text", "message": message}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(MESSAGE_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def send_template(
+        self,
+        to: str,
+        bot_id: str,
+        template: Optional[list],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a template message (elements payload)."""
+        payload = {"to": to, "bot_id": bot_id, "type": "template", "elements": template}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(MESSAGE_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def send_file(
+        self,
+        to: str,
+        bot_id: str,
+        file_path: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Upload and send a file as multipart form data."""
+        if file_path is None:
+            return {"status": "fail", "message": "file_path is required"}
+
+        headers = {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
+        with open(file_path, "rb") as file:
+
+            def build_form() -> "aiohttp.FormData":
+                file.seek(0)
+                form = aiohttp.FormData()
+                form.add_field("to", to)
+                form.add_field("bot_id", bot_id)
+                form.add_field("type", "file")
+                if custom_notification:
+                    form.add_field("custom_notification", custom_notification)
+                form.add_field("file", file, filename=file_path)
+                return form
+
+            return await self._post(
+                MESSAGE_PATH,
+                data=build_form,
+                headers=headers,
+                bot_id=bot_id,
+                idempotency_key=idempotency_key,
+            )
+
+    async def send_webview(
+        self,
+        to: str,
+        bot_id: str,
+        url: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a webview (URL) message after basic protocol validation."""
+        if not url or not re.match(r"^(http|https)://", url):
+            return {
+                "status": "fail",
+                "message": "Please specify a protocol (http or https) in the URL.",
+            }
+        payload = {"to": to, "bot_id": bot_id, "type": "web", "url": url}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(MESSAGE_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def broadcast_message(
+        self,
+        bot_id: str,
+        to: List[str],
+        message: Optional[str],
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Broadcast a message to up to 100 recipients."""
+        if not isinstance(to, list):
+            return {"status": "fail", "message": "parameter 'to' must be a list of user IDs."}
+
+        if len(to) > 100:
+            return {"status": "fail", "message": "parameter to out of range."}
+
+        payload = {"bot_id": bot_id, "to": to, "message": message}
+        return await self._post(
+            BROADCAST_PATH, json=payload, error_status="fail", idempotency_key=idempotency_key
+        )
+
+    async def send_location(
+        self,
+        to: str,
+        bot_id: str,
+        latitude: Optional[str],
+        longitude: Optional[str],
+        address: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a location payload with coordinates and address."""
+        payload = {
+            "to": to,
+            "bot_id": bot_id,
+            "type": "location",
+            "latitude": latitude,
+            "longitude": longitude,
+            "address": address,
+            "custom_notification": custom_notification,
+        }
+        return await self._post(MESSAGE_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def send_sticker(
+        self,
+        to: str,
+        bot_id: str,
+        sticker_id: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a sticker by sticker ID."""
+        payload = {"to": to, "bot_id": bot_id, "type": "sticker", "sticker_id": sticker_id}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(MESSAGE_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def send_quickreply(
+        self,
+        to: str,
+        bot_id: str,
+        message: Optional[str],
+        quick_reply: Optional[list],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send a message with quick reply buttons."""
+        payload = {"to": to, "bot_id": bot_id, "message": message, "quick_reply": quick_reply}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(QUICKREPLY_PATH, json=payload, idempotency_key=idempotency_key)
+
+    async def send_image_carousel(
+        self,
+        to: str,
+        bot_id: str,
+        elements: Optional[list],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send an image carousel composed of provided elements."""
+        payload = {"to": to, "bot_id": bot_id, "elements": elements}
+        if custom_notification:
+            payload["custom_notification"] = custom_notification
+        return await self._post(IMAGE_CAROUSEL_PATH, json=payload, idempotency_key=idempotency_key)
+
+    def prepare(self, method: str, bot_id: str, *args: Any, **kwargs: Any) -> PreparedMessage:
+        """Validate and serialize a payload once; see :meth:`OneChat.prepare`."""
+        return prepare_message(method, bot_id, self.json_codec, *args, **kwargs)
+
+    async def send_prepared(
+        self, prepared: PreparedMessage, to: str, custom_notification: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send a :class:`PreparedMessage` to `to`."""
+        return await self._post(
+            PREPARED_PATHS[prepared.method],
+            data=prepared.body(to, custom_notification),
+            bot_id=prepared.bot_id,
+        )
+
+    async def fetch_friends_and_groups(self, bot_id: str) -> Dict[str, Any]:
+        """Fetch lists of friends and groups for the given bot.
+
+        Concurrent calls for the same bot_id share one request and response.
+        """
+        return await self._flight.do(
+            bot_id, lambda: self._post(GETLISTROOM_PATH, json={"bot_id": bot_id})
+        )
+
+    async def fetch_directory(self, bot_id: str) -> Directory:
+        """Return an indexed :class:`Directory`; raises ValueError if the fetch failed."""
+        return Directory.from_response(await self.fetch_friends_and_groups(bot_id))
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Return how many getlistroom fetches ran and how many were coalesced."""
+        return self._flight.stats()
+
+    async def list_all_friends(self, bot_id: str) -> List[Dict[str, Any]]:
+        """Return full friend objects as provided by the API."""
+        response = await self.fetch_friends_and_groups(bot_id)
+        if response.get("status") == "success":
+            return response.get("list_friend", [])
+        return []
+
+    async def list_friend_ids(self, bot_id: str) -> List[str]:
+        """Return a list of friend One IDs only."""
+        return [friend["one_id"] for friend in await self.list_all_friends(bot_id)]
+
+    async def list_all_groups(self, bot_id: str) -> List[Dict[str, Any]]:
+        """Return full group objects as provided by the API."""
+        response = await self.fetch_friends_and_groups(bot_id)
+        if response.get("status") == "success":
+            return response.get("list_group", [])
+        return []
+
+    async def list_group_ids(self, bot_id: str) -> List[str]:
+        """Return a list of group IDs only."""
+        return [group["group_id"] for group in await self.list_all_groups(bot_id)]
+
+    async def close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self) -> "AsyncOneChat":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
@@ -1,27 +1,39 @@
 # one_chat/broadcast_sender.py
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+from .bulk import DEFAULT_BULK_WORKERS, chunked, dedupe, imap_bounded
+from .idempotency import DELIVERED_STATUSES
+from .transport import Transport, failure_result
+
 DEFAULT_TIMEOUT = (5, 15)
+MAX_BROADCAST_RECIPIENTS = 100
 
 
 class BroadcastSender:
     """Send broadcast messages to multiple recipients."""
 
-    def __init__(self, authorization_token: str):
-        """Initialize with Bearer token (with/without prefix)."""
+    def __init__(self, authorization_token: str, transport: Optional[Transport] = None):
+        """Initialize with Bearer token (with/without prefix) and optional shared transport."""
         if authorization_token.startswith("Bearer "):
             authorization_token = authorization_token.replace("Bearer ", "", 1)
         self.authorization_token = authorization_token
+        self.transport = transport or Transport()
         self.base_url = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
         self.headers = {
             "Authorization": f"Bearer {self.authorization_token}",
             "Content-Type": "application/json",
         }
 
-    def broadcast_message(self, bot_id: str, to: List[str], message: Optional[str]) -> dict:
+    def broadcast_message(
+        self,
+        bot_id: str,
+        to: List[str],
+        message: Optional[str],
+        idempotency_key: Optional[str] = None,
+    ) -> dict:
         """Broadcast a message to up to 100 user IDs in `to`.
 
         Returns the API response JSON or a normalized error.
@@ -29,27 +41,89 @@ class BroadcastSender:
         if not isinstance(to, list):
             return {"status": "fail", "message": "parameter 'to' must be a list of user IDs."}
 
-        if len(to) > 100:
+        if len(to) > MAX_BROADCAST_RECIPIENTS:
             return {"status": "fail", "message": "parameter to out of range."}
 
         payload = {"bot_id": bot_id, "to": to, "message": message}
 
         try:
-            response = requests.post(
-                self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.base_url,
+                headers=self.headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
+
+    def broadcast_bulk(
+        self,
+        bot_id: str,
+        to: Iterable[str],
+        message: Optional[str],
+        max_workers: int = DEFAULT_BULK_WORKERS,
+        chunk_size: int = MAX_BROADCAST_RECIPIENTS,
+    ) -> Dict[str, Any]:
+        """Broadcast a message to any number of user IDs.
+
+        Recipients are de-duplicated (keeping order), split into chunks of at
+        most `chunk_size` (capped at the API limit of 100) and sent through
+        :meth:`broadcast_message` on up to `max_workers` threads.
+
+        Returns an aggregated dict: ``status`` is "success" when every chunk
+        was delivered (a chunk the deduplicator reports as a duplicate
+        counts), "partial" when some were and "fail" otherwise; ``chunks``
+        lists each chunk's index, recipients and API response in order, and
+        ``succeeded`` / ``failed`` hold chunk indices.
+        """
+        if isinstance(to, str):
+            return {"status": "fail", "message": "parameter 'to' must be a list of user IDs."}
+
+        recipients = dedupe(to)
+        if not recipients:
+            return {"status": "fail", "message": "parameter 'to' must not be empty."}
+
+        size = max(1, min(chunk_size, MAX_BROADCAST_RECIPIENTS))
+        indexed = list(enumerate(chunked(recipients, size)))
+
+        def send(item: Tuple[int, List[str]]) -> dict:
+            return self.broadcast_message(bot_id, item[1], message)
+
+        chunks: List[Dict[str, Any]] = [{} for _ in indexed]
+        for (index, chunk), response in imap_bounded(send, indexed, max_workers):
+            chunks[index] = {"index": index, "to": chunk, "response": response}
+
+        succeeded = [
+            c["index"] for c in chunks if c["response"].get("status") in DELIVERED_STATUSES
+        ]
+        failed = [
+            c["index"] for c in chunks if c["response"].get("status") not in DELIVERED_STATUSES
+        ]
+        if not failed:
+            status = "success"
+        elif succeeded:
+            status = "partial"
+        else:
+            status = "fail"
+
+        return {
+            "status": status,
+            "total_recipients": len(recipients),
+            "chunks": chunks,
+            "succeeded": succeeded,
+            "failed": failed,
+        }
 
     def _handle_error(self, response: requests.Response) -> dict:
         """Normalize API error responses for consistency."""
         try:
-            error_response = response.json()
+            error_response = self.transport.decode_json(response)
             return {
                 "status": "fail",
                 "message": error_response.get("message", "Unknown error occurred."),
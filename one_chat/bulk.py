@@ -0,0 +1,55 @@
+# one_chat/bulk.py
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, TypeVar
+
+# Default number of broadcast chunks sent in parallel by broadcast_bulk.
+DEFAULT_BULK_WORKERS = 4
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def dedupe(items: Iterable[str]) -> List[str]:
+    """Return `items` without duplicates, keeping first-seen order."""
+    return list(dict.fromkeys(items))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of at most `size` items."""
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_bounded(
+    func: Callable[[T], R], items: Iterable[T], max_workers: int
+) -> Iterator[Tuple[T, R]]:
+    """Run `func` over `items` on a thread pool, yielding `(item, result)` as each completes.
+
+    At most ``2 * max_workers`` calls are submitted ahead of completion, so
+    huge or lazy iterables are consumed incrementally instead of being turned
+    into one future per item up front.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    iterator = iter(items)
+    window = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Dict[Future, T] = {}
+        for item in islice(iterator, window):
+            pending[executor.submit(func, item)] = item
+        while pending:
+            done: Set[Future]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                yield item, future.result()
+            for item in islice(iterator, len(done)):
+                pending[executor.submit(func, item)] = item
@@ -0,0 +1,78 @@
+# one_chat/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Entries older than `ttl` but younger than ``ttl + stale_ttl`` are still
+    returned, flagged as stale, so callers can serve them while refreshing in
+    the background (stale-while-revalidate).
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128, stale_ttl: float = 0.0):
+        """Create an empty cache.
+
+        Parameters:
+        - ttl: Seconds an entry is fresh.
+        - maxsize: Maximum number of entries; the least recently used entry
+          is evicted beyond it.
+        - stale_ttl: Extra seconds an expired entry may still be served stale.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._entries: OrderedDict[Hashable, Tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Tuple[Optional[V], Optional[str]]:
+        """Return ``(value, FRESH | STALE)``, or ``(None, None)`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1], FRESH
+                if age <= self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    return entry[1], STALE
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None, None
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Store `value` as fresh, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop `key`, or every entry when `key` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
@@ -0,0 +1,218 @@
+# one_chat/campaign.py
+
+import hashlib
+import json
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .broadcast_sender import MAX_BROADCAST_RECIPIENTS
+from .bulk import DEFAULT_BULK_WORKERS, chunked, dedupe, imap_bounded
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import OneChat
+
+JOURNAL_MAGIC = b"OCJ1"
+_HEADER_SIZE = len(JOURNAL_MAGIC) + 32  # magic + SHA-256 campaign fingerprint
+_RECORD = struct.Struct("<IB")  # chunk index, outcome
+
+ACKED = 1
+FAILED = 2
+
+
+def campaign_fingerprint(
+    bot_id: str, recipients: List[str], message: Optional[str], chunk_size: int
+) -> bytes:
+    """Return a SHA-256 digest identifying a campaign's exact chunk layout."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([bot_id, message, chunk_size]).encode("utf-8"))
+    for recipient in recipients:
+        digest.update(b"\0" + recipient.encode("utf-8"))
+    return digest.digest()
+
+
+def _read_journal(path: str, fingerprint: bytes) -> Tuple[Set[int], Set[int], int]:
+    """Return the acked and failed chunk indices in `path` and its valid length.
+
+    A missing file, or one cut short while its header was being written,
+    has no records and a valid length of 0. Nothing is written; the valid
+    length tells the caller whether a torn trailing record should be cut off.
+    """
+    acked: Set[int] = set()
+    failed: Set[int] = set()
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER_SIZE:
+        return acked, failed, 0
+    with open(path, "rb") as file:
+        header = file.read(_HEADER_SIZE)
+        if header != JOURNAL_MAGIC + fingerprint:
+            raise ValueError(
+                f"Journal {path!r} belongs to a different campaign "
+                "(recipients, message, bot_id or chunk size changed)."
+            )
+        data = file.read()
+    usable = len(data) - len(data) % _RECORD.size
+    for index, outcome in _RECORD.iter_unpack(data[:usable]):
+        if outcome == ACKED:
+            acked.add(index)
+            failed.discard(index)
+        elif index not in acked:
+            failed.add(index)
+    return acked, failed, _HEADER_SIZE + usable
+
+
+class CampaignJournal:
+    """Append-only binary log of chunk outcomes for one campaign.
+
+    The file starts with a magic tag and the campaign fingerprint, followed
+    by fixed 5-byte records ``(chunk index, outcome)``. Records are only ever
+    appended and flushed to the OS, never rewritten, so logging a chunk costs
+    one small ``write()``. A record torn by a crash is dropped on reopen.
+    """
+
+    def __init__(self, path: str, fingerprint: bytes):
+        """Open or create the journal at `path`.
+
+        Raises ValueError if the file belongs to a different campaign.
+        """
+        self.path = path
+        self.acked, self.failed, size = _read_journal(path, fingerprint)
+        if size:
+            if size != os.path.getsize(path):
+                with open(path, "r+b") as file:
+                    file.truncate(size)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(JOURNAL_MAGIC + fingerprint)
+            self._file.flush()
+
+    def record(self, index: int, acked: bool) -> None:
+        """Append the outcome of chunk `index`."""
+        self._file.write(_RECORD.pack(index, ACKED if acked else FAILED))
+        self._file.flush()
+        if acked:
+            self.acked.add(index)
+            self.failed.discard(index)
+        else:
+            self.failed.add(index)
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
+
+
+class Campaign:
+    """Resumable broadcast of one message to any number of recipients.
+
+    Recipients are de-duplicated and split into chunks exactly like
+    :meth:`BroadcastSender.broadcast_bulk`; each chunk's outcome is appended
+    to a :class:`CampaignJournal` as soon as it completes. Running the same
+    campaign again with the same journal skips every acknowledged chunk and
+    re-sends only those that failed or never ran. Changing the recipients,
+    message, bot_id or chunk size is detected via the journal fingerprint.
+
+    Each chunk is sent with an ``idempotency_key`` made of the fingerprint
+    and chunk index, so with a deduplicator on the client a chunk that went
+    out just before a crash, but was never journaled, is not delivered
+    twice; its "duplicate" result counts as acknowledged.
+    """
+
+    def __init__(
+        self,
+        client: OneChat,
+        bot_id: str,
+        to: Iterable[str],
+        message: Optional[str],
+        journal_path: str,
+        chunk_size: int = MAX_BROADCAST_RECIPIENTS,
+        max_workers: int = DEFAULT_BULK_WORKERS,
+    ):
+        """Prepare the campaign; nothing is sent until :meth:`run`.
+
+        Raises ValueError if `to` is a string or empty.
+
+        Parameters:
+        - client: Facade whose ``broadcast_message`` sends each chunk.
+        - bot_id, to, message: As for ``broadcast_message``.
+        - journal_path: File recording chunk progress.
+        - chunk_size: Recipients per request (capped at the API limit of 100).
+        - max_workers: Chunks sent concurrently.
+        """
+        if isinstance(to, str):
+            raise ValueError("parameter 'to' must be a list of user IDs.")
+        self.client = client
+        self.bot_id = bot_id
+        self.message = message
+        self.journal_path = journal_path
+        self.chunk_size = max(1, min(chunk_size, MAX_BROADCAST_RECIPIENTS))
+        self.max_workers = max_workers
+        self.recipients = dedupe(to)
+        if not self.recipients:
+            raise ValueError("parameter 'to' must not be empty.")
+        self.fingerprint = campaign_fingerprint(bot_id, self.recipients, message, self.chunk_size)
+
+    @property
+    def total_chunks(self) -> int:
+        """Number of chunks the recipients are split into."""
+        return -(-len(self.recipients) // self.chunk_size)
+
+    def progress(self) -> Dict[str, int]:
+        """Return chunk counts recorded in the journal so far, without sending.
+
+        The journal is only read; a campaign that never ran reports zero
+        progress and no file is created.
+        """
+        acked, failed, _ = _read_journal(self.journal_path, self.fingerprint)
+        return {"total_chunks": self.total_chunks, "acked": len(acked), "failed": len(failed)}
+
+    def run(self) -> Dict[str, Any]:
+        """Send every chunk not yet acknowledged and return a summary.
+
+        ``status`` is "success" once every chunk of the campaign has been
+        acknowledged (in this or an earlier run), "partial" when some are
+        still outstanding and "fail" when none are acknowledged. ``skipped``
+        counts chunks acknowledged by earlier runs; ``failed`` maps chunk
+        indices that failed in this run to their API responses.
+        """
+        journal = CampaignJournal(self.journal_path, self.fingerprint)
+        skipped = len(journal.acked)
+        pending = (
+            (index, chunk)
+            for index, chunk in enumerate(chunked(self.recipients, self.chunk_size))
+            if index not in journal.acked
+        )
+
+        def send(item: Tuple[int, List[str]]) -> dict:
+            index, chunk = item
+            key = f"campaign:{self.fingerprint.hex()}:{index}"
+            return self.client.broadcast_message(
+                self.bot_id, chunk, self.message, idempotency_key=key
+            )
+
+        sent = 0
+        failed: Dict[int, dict] = {}
+        try:
+            for (index, _), response in imap_bounded(send, pending, self.max_workers):
+                acked = response.get("status") in DELIVERED_STATUSES
+                journal.record(index, acked)
+                if acked:
+                    sent += 1
+                else:
+                    failed[index] = response
+        finally:
+            journal.close()
+
+        acked_total = len(journal.acked)
+        if acked_total == self.total_chunks:
+            status = "success"
+        elif acked_total:
+            status = "partial"
+        else:
+            status = "fail"
+        return {
+            "status": status,
+            "total_recipients": len(self.recipients),
+            "total_chunks": self.total_chunks,
+            "sent": sent,
+            "skipped": skipped,
+            "failed": failed,
+        }
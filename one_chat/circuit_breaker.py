@@ -0,0 +1,206 @@
+# one_chat/circuit_breaker.py
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import requests
+
+from .rate_limit import endpoint_name
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+StateListener = Callable[[str, str, str], None]
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending when an endpoint's circuit is open.
+
+    It subclasses :class:`requests.exceptions.RequestException` so senders
+    turn it into their usual ``{"status": "fail", ...}`` result.
+    """
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single endpoint.
+
+    Closed: calls flow and outcomes are tracked in a sliding window of the
+    last `window_size` calls. The circuit opens when at least
+    `minimum_calls` were recorded and the failure rate reaches
+    `failure_rate_threshold`, or after `consecutive_timeouts` timeouts in a
+    row.
+
+    Open: calls fail immediately with :class:`CircuitOpenError` until
+    `open_timeout` seconds have passed.
+
+    Half-open: up to `half_open_max_calls` probe calls are let through; if
+    they all succeed the circuit closes, and any failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 20,
+        window_size: int = 50,
+        consecutive_timeouts: int = 5,
+        open_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        """Create a closed breaker; see the class docstring for parameters."""
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.consecutive_timeouts = consecutive_timeouts
+        self.open_timeout = open_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.listeners: List[StateListener] = []
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._timeouts_in_row = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            return self._state
+
+    def _transition(self, new_state: str) -> Optional[Tuple[str, str]]:
+        """Switch state under the lock; return ``(old, new)`` if it changed."""
+        old_state = self._state
+        if old_state == new_state:
+            return None
+        self._state = new_state
+        self._outcomes.clear()
+        self._timeouts_in_row = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        return old_state, new_state
+
+    def _notify(self, change: Optional[Tuple[str, str]]) -> None:
+        if change is None:
+            return
+        for listener in list(self.listeners):
+            listener(self.name, *change)
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed, claiming a probe slot when half-open."""
+        changed = None
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_timeout:
+                    return False
+                changed = self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_calls:
+                    allowed = False
+                else:
+                    self._probes_in_flight += 1
+                    allowed = True
+            else:
+                allowed = True
+        self._notify(changed)
+        return allowed
+
+    def record_success(self) -> None:
+        """Record a call that reached the server and got a non-5xx answer."""
+        changed = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    changed = self._transition(CLOSED)
+            else:
+                self._outcomes.append(False)
+                self._timeouts_in_row = 0
+        self._notify(changed)
+
+    def record_failure(self, timeout: bool = False) -> None:
+        """Record a failed call (exception or 5xx); `timeout` marks timeouts."""
+        changed = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                changed = self._transition(OPEN)
+            elif self._state == CLOSED:
+                self._outcomes.append(True)
+                self._timeouts_in_row = self._timeouts_in_row + 1 if timeout else 0
+                if self._timeouts_in_row >= self.consecutive_timeouts or (
+                    len(self._outcomes) >= self.minimum_calls
+                    and self._failure_rate() >= self.failure_rate_threshold
+                ):
+                    changed = self._transition(OPEN)
+        self._notify(changed)
+
+    def release_probe(self) -> None:
+        """Give back a probe slot claimed by :meth:`allow` without recording an outcome.
+
+        Call it when an allowed call ends without reaching a verdict
+        (cancelled, or failed before or after the request for reasons that
+        say nothing about the endpoint), so a half-open circuit does not
+        run out of probe slots for good.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def _failure_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the state, window failure rate and recorded call count."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "failure_rate": self._failure_rate(),
+                "calls": len(self._outcomes),
+                "consecutive_timeouts": self._timeouts_in_row,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one :class:`CircuitBreaker` per endpoint name.
+
+    Keyword arguments are passed to every breaker it creates; listeners
+    registered with :meth:`on_state_change` are attached to all of them.
+    """
+
+    def __init__(self, **breaker_options: Any):
+        """Create an empty registry; `breaker_options` configure new breakers."""
+        self.breaker_options = breaker_options
+        self.listeners: List[StateListener] = []
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Return the breaker for the endpoint of `url`, creating it if needed."""
+        name = endpoint_name(url)
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.breaker_options)
+                breaker.listeners = self.listeners
+            return breaker
+
+    def on_state_change(self, listener: StateListener) -> None:
+        """Call ``listener(endpoint, old_state, new_state)`` on every transition.
+
+        Listeners run on the thread that triggered the transition and should
+        return quickly.
+        """
+        self.listeners.append(listener)
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of every breaker keyed by endpoint name."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
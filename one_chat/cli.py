@@ -0,0 +1,367 @@
+# one_chat/cli.py
+
+import argparse
+import csv
+import inspect
+import json
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .bulk import imap_bounded
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import DEFAULT_SEND_WORKERS, PER_RECIPIENT_METHODS, OneChat
+from .rate_limit import TokenBucket
+from .retry import RetryPolicy
+from .transport import DEFAULT_POOL_MAXSIZE
+
+# Arguments that take lists of objects; CSV cells and --set values for them hold JSON.
+JSON_ARGUMENTS = ("template", "quick_reply", "elements")
+
+# Facade arguments a row may not set (they are not plain values or are fixed by the CLI).
+_RESERVED_ARGUMENTS = ("self", "to", "bot_id", "chunk_size", "use_mmap", "progress")
+
+# Latency histogram bounds: 0.1 ms to ~2 min in 5% steps, so percentiles are within 5%.
+_BOUNDS = tuple(0.0001 * 1.05**i for i in range(290))
+
+
+class Row(NamedTuple):
+    """One input record turned into a call, or the reason it cannot be sent."""
+
+    line: int
+    to: Optional[str]
+    bot_id: Optional[str]
+    kwargs: Dict[str, Any]
+    error: Optional[str] = None
+
+
+class LatencyHistogram:
+    """Constant-memory latency histogram with ~5% resolution percentiles."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        """Return the upper bound (seconds) of the bucket holding the `q`-th percentile."""
+        if not self.count:
+            return 0.0
+        rank, seen = math.ceil(self.count * q / 100), 0
+        for bound, count in zip(_BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class LiveStats:
+    """Thread-safe counters for a running send, reported every interval and at the end."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = self._window_started = time.monotonic()
+        self.succeeded = self.failed = self.invalid = 0
+        self.total = LatencyHistogram()
+        self._window = LatencyHistogram()
+        self._window_sent = 0
+
+    def record(self, ok: bool, seconds: Optional[float]) -> None:
+        """Count one result; `seconds` is None for rows that were never sent."""
+        with self._lock:
+            if seconds is None:
+                self.invalid += 1
+                return
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.total.add(seconds)
+            self._window.add(seconds)
+            self._window_sent += 1
+
+    def report(self) -> str:
+        """Return a progress line for the interval since the previous report."""
+        with self._lock:
+            now = time.monotonic()
+            window, sent = self._window, self._window_sent
+            rate = sent / max(now - self._window_started, 1e-9)
+            self._window, self._window_sent, self._window_started = LatencyHistogram(), 0, now
+            return (
+                f"[{now - self.started:7.1f}s] sent {self.succeeded + self.failed}"
+                f" (ok {self.succeeded}, failed {self.failed}, invalid {self.invalid})"
+                f" | {rate:.1f} req/s | {_percentiles(window)}"
+            )
+
+    def summary(self) -> str:
+        """Return the final totals line for the whole run."""
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            sent = self.succeeded + self.failed
+            return (
+                f"done in {elapsed:.1f}s: sent {sent} (ok {self.succeeded}, failed {self.failed},"
+                f" invalid {self.invalid}) | {sent / max(elapsed, 1e-9):.1f} req/s"
+                f" | {_percentiles(self.total)}"
+            )
+
+
+def _percentiles(histogram: LatencyHistogram) -> str:
+    return " ".join(f"p{q} {histogram.percentile(q) * 1000:.1f}ms" for q in (50, 90, 99))
+
+
+def call_arguments(method: str) -> Tuple[List[str], List[str]]:
+    """Return the (required, optional) argument names a row may give for `method`."""
+    required, optional = [], []
+    for name, parameter in inspect.signature(getattr(OneChat, method)).parameters.items():
+        if name in _RESERVED_ARGUMENTS:
+            continue
+        if parameter.default is inspect.Parameter.empty:
+            required.append(name)
+        else:
+            optional.append(name)
+    return required, optional
+
+
+def iter_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+    """Stream ``(line_number, record)`` pairs from a CSV or JSONL file ("-" is stdin).
+
+    The format is taken from `fmt`, else from the extension (``.jsonl``,
+    ``.ndjson`` and ``.json`` are JSONL, anything else CSV). A JSONL line
+    that is not valid JSON is yielded as a ``ValueError`` record.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+    fh = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for number, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError as e:
+                    yield number, ValueError(f"invalid JSON: {e}")
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def build_rows(
+    records: Iterator[Tuple[int, Any]],
+    method: str,
+    bot_id: Optional[str],
+    defaults: Dict[str, Any],
+) -> Iterator[Row]:
+    """Turn records into :class:`Row` calls for `method`.
+
+    Each record needs a ``to`` field and may override ``bot_id`` and any
+    argument of `method`; missing arguments fall back to `defaults`. Empty
+    CSV cells count as missing, and cells of :data:`JSON_ARGUMENTS` are
+    parsed as JSON. Unknown fields are ignored.
+    """
+    required, optional = call_arguments(method)
+    for line, record in records:
+        if isinstance(record, Exception):
+            yield Row(line, None, bot_id, {}, str(record))
+            continue
+        if not isinstance(record, dict):
+            yield Row(line, None, bot_id, {}, "record is not an object")
+            continue
+        record = {k: v for k, v in record.items() if k is not None and v not in ("", None)}
+        to = record.get("to")
+        kwargs = {
+            name: record.get(name, defaults.get(name))
+            for name in required + optional
+            if name in record or name in defaults
+        }
+        error = None
+        try:
+            for name in JSON_ARGUMENTS:
+                value = kwargs.get(name)
+                if isinstance(value, str):
+                    kwargs[name] = json.loads(value)
+        except ValueError as e:
+            error = f"invalid JSON in {name!r}: {e}"
+        missing = [name for name in required if name not in kwargs]
+        row_bot = record.get("bot_id", bot_id)
+        if not to:
+            error = "missing 'to'"
+        elif not row_bot:
+            error = "missing 'bot_id'"
+        elif missing:
+            error = f"missing {', '.join(repr(name) for name in missing)}"
+        yield Row(line, to and str(to), row_bot, kwargs, error)
+
+
+class ResultWriter:
+    """Writes one result per recipient as JSONL, or as CSV when the path ends in .csv."""
+
+    FIELDS = ("line", "to", "status", "latency_ms", "response")
+
+    def __init__(self, path: str):
+        self._fh: IO[str] = open(path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._fh) if path.endswith(".csv") else None
+        if self._csv is not None:
+            self._csv.writerow(self.FIELDS)
+
+    def write(self, row: Row, response: dict, seconds: Optional[float]) -> None:
+        latency = round(seconds * 1000, 3) if seconds is not None else None
+        status = response.get("status", "fail") if isinstance(response, dict) else "fail"
+        if self._csv is not None:
+            self._csv.writerow((row.line, row.to, status, latency, json.dumps(response)))
+        else:
+            result = dict(zip(self.FIELDS, (row.line, row.to, status, latency, response)))
+            self._fh.write(json.dumps(result) + "\n")
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _parse_set(values: List[str]) -> Dict[str, Any]:
+    defaults: Dict[str, Any] = {}
+    for item in values:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--set expects KEY=VALUE, got {item!r}")
+        defaults[name] = value
+    return defaults
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m one_chat",
+        description="Send to every recipient in a CSV or JSONL file.",
+        epilog=(
+            "Each record needs a 'to' field and may set 'bot_id' and any argument of the "
+            "chosen method (e.g. 'message', 'sticker_id', 'template' as JSON)."
+        ),
+    )
+    parser.add_argument("input", help="CSV or JSONL file of recipients ('-' for stdin)")
+    parser.add_argument(
+        "--format", choices=("csv", "jsonl"), help="input format (default: by extension)"
+    )
+    parser.add_argument("--method", default="send_message", choices=PER_RECIPIENT_METHODS)
+    parser.add_argument("--token", help="API token (default: $ONECHAT_TOKEN)")
+    parser.add_argument("--bot-id", help="bot ID for rows without one (default: $ONECHAT_BOT_ID)")
+    parser.add_argument("--message", help="default 'message' for rows without one")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="default value for a method argument; repeatable",
+    )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_SEND_WORKERS)
+    parser.add_argument("--rate", type=float, help="maximum sends per second (default: unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="sends allowed at once under --rate")
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=1,
+        help=(
+            "attempts per send (default: 1); higher values retry timeouts and 5xx, which can "
+            "deliver a message twice"
+        ),
+    )
+    parser.add_argument("--results", help="write per-recipient results (.jsonl or .csv)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between reports")
+    parser.add_argument("--quiet", action="store_true", help="only print the final summary")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, client: Optional[OneChat] = None) -> int:
+    """Run the bulk sender; return 0 when every row was sent successfully, else 1.
+
+    `client` replaces the one built from ``--token``/``--concurrency``/``--retries``.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    token = args.token or os.environ.get("ONECHAT_TOKEN")
+    if client is None and not token:
+        parser.error("an API token is required (--token or ONECHAT_TOKEN)")
+    if args.input != "-" and not os.path.isfile(args.input):
+        parser.error(f"input file not found: {args.input}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.retries < 1:
+        parser.error("--retries must be at least 1")
+    try:
+        defaults = _parse_set(args.set)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.message is not None:
+        defaults.setdefault("message", args.message)
+
+    own_client = client is None
+    if client is None:
+        client = OneChat(
+            str(token),
+            pool_maxsize=max(DEFAULT_POOL_MAXSIZE, args.concurrency),
+            retry_policy=RetryPolicy(max_attempts=args.retries),
+        )
+    send = getattr(client, args.method)
+    bucket = TokenBucket(args.rate, max(1, args.burst)) if args.rate else None
+    bucket_lock = threading.Lock()
+    stats = LiveStats()
+    writer = ResultWriter(args.results) if args.results else None
+
+    def dispatch(row: Row) -> Tuple[dict, Optional[float]]:
+        if row.error is not None:
+            return {"status": "fail", "message": f"Invalid row: {row.error}"}, None
+        if bucket is not None:
+            with bucket_lock:
+                delay = bucket.reserve(time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+        started = time.perf_counter()
+        try:
+            response = send(row.to, row.bot_id, **row.kwargs)
+        except Exception as e:
+            response = {"status": "fail", "message": f"Send failed: {e}"}
+        return response, time.perf_counter() - started
+
+    finished = threading.Event()
+
+    def reporter() -> None:
+        while not finished.wait(args.interval):
+            print(stats.report(), file=sys.stderr, flush=True)
+
+    if not args.quiet:
+        threading.Thread(target=reporter, daemon=True).start()
+
+    rows = build_rows(
+        iter_records(args.input, args.format),
+        args.method,
+        args.bot_id or os.environ.get("ONECHAT_BOT_ID"),
+        defaults,
+    )
+    interrupted = False
+    try:
+        for row, (response, seconds) in imap_bounded(dispatch, rows, args.concurrency):
+            ok = isinstance(response, dict) and response.get("status") in DELIVERED_STATUSES
+            stats.record(ok, seconds)
+            if writer is not None:
+                writer.write(row, response, seconds)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        finished.set()
+        if writer is not None:
+            writer.close()
+        if own_client:
+            client.close()
+    print(stats.summary(), file=sys.stderr, flush=True)
+    if interrupted:
+        return 130
+    return 0 if not (stats.failed or stats.invalid) else 1
@@ -0,0 +1,365 @@
+# one_chat/client_pool.py
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .bulk import DEFAULT_BULK_WORKERS, dedupe
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import DEFAULT_SEND_WORKERS, PER_RECIPIENT_METHODS, OneChat
+from .rate_limit import RateLimiter
+
+# Facade methods routed by bot_id, and the position of bot_id in their arguments.
+ROUTED_METHODS = {
+    **{method: 1 for method in PER_RECIPIENT_METHODS},
+    "prepare": 1,
+    "send_many": 2,
+    "broadcast_message": 0,
+    "broadcast_bulk": 0,
+    "fetch_friends_and_groups": 0,
+    "fetch_directory": 0,
+    "invalidate_friends_and_groups": 0,
+    "list_all_friends": 0,
+    "list_friend_ids": 0,
+    "list_all_groups": 0,
+    "list_group_ids": 0,
+}
+
+# Endpoint whose rate budget weighs each bot when sharding a method's recipients.
+SHARD_ENDPOINTS = {
+    "send_quickreply": "push_quickreply",
+    "send_image_carousel": "image-carousel",
+    "broadcast_bulk": "broadcast_group",
+}
+
+_DONE = object()
+
+
+def shard_recipients(
+    recipients: Iterable[str],
+    weights: Mapping[str, float],
+    audiences: Optional[Mapping[str, Collection[str]]] = None,
+) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Split de-duplicated `recipients` across bots in proportion to `weights`.
+
+    Each recipient goes to the bot, among those whose audience contains it
+    (all bots when `audiences` is ``None``), with the lowest load relative
+    to its weight. Returns ``(shards, unreachable)``.
+    """
+    bots = list(weights)
+    loads = dict.fromkeys(bots, 0)
+    shards: Dict[str, List[str]] = {bot_id: [] for bot_id in bots}
+    unreachable: List[str] = []
+    for to in dedupe(recipients):
+        candidates = (
+            bots
+            if audiences is None
+            else [bot_id for bot_id in bots if to in audiences.get(bot_id, ())]
+        )
+        if not candidates:
+            unreachable.append(to)
+            continue
+        chosen = min(candidates, key=lambda bot_id: (loads[bot_id] + 1) / weights[bot_id])
+        loads[chosen] += 1
+        shards[chosen].append(to)
+    return {bot_id: ids for bot_id, ids in shards.items() if ids}, unreachable
+
+
+class ClientPool:
+    """A set of :class:`OneChat` clients, one per bot, routed by bot_id.
+
+    Each ``bot_id -> token`` pair gets its own client, so its own keep-alive
+    connection pool, retry budget and (by default) :class:`RateLimiter`.
+    Facade methods such as ``send_message(to, bot_id, ...)`` or
+    ``broadcast_bulk(bot_id, ...)`` are forwarded to the client of that
+    bot_id, so a pool can stand in for a single ``OneChat``.
+
+    :meth:`shard` splits a recipient set across the bots allowed to reach
+    each recipient, in proportion to each bot's rate budget, and
+    :meth:`send_sharded` / :meth:`broadcast_sharded` send every shard from
+    its own bot in parallel, so aggregate throughput grows with the number
+    of bots.
+    """
+
+    def __init__(
+        self,
+        bots: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        bot_rates: Optional[Mapping[str, Dict[str, Tuple[float, int]]]] = None,
+        rate_limit: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        **client_options: Any,
+    ):
+        """Create one client per bot.
+
+        Parameters:
+        - bots: Mapping of bot_id to authorization token, or ``(bot_id,
+          token)`` pairs. Several bots may share a token.
+        - rates: Endpoint budgets (see :class:`RateLimiter`) for every bot.
+        - bot_rates: Per-bot_id budgets merged over `rates`.
+        - rate_limit: Give each bot its own :class:`RateLimiter`; pass
+          ``False`` to send unpaced.
+        - rate_limiter: One limiter for every client instead (its buckets
+          are still per bot_id), e.g. a :class:`SharedRateLimiter` shared
+          with other processes; `rates` and `bot_rates` are then ignored.
+        - client_options: Further :class:`OneChat` arguments (pool sizes,
+          retry policy, metrics, hooks, ...) applied to every client.
+          ``transport`` is rejected, since each bot needs its own.
+        """
+        if "transport" in client_options:
+            raise ValueError("ClientPool builds one transport per bot.")
+        pairs = list(bots.items() if isinstance(bots, Mapping) else bots)
+        if not pairs:
+            raise ValueError("ClientPool needs at least one (bot_id, token) pair.")
+        self.clients: Dict[str, OneChat] = {}
+        for bot_id, token in pairs:
+            if not bot_id or not token:
+                raise ValueError("Each bot needs a bot_id and an authorization token.")
+            if bot_id in self.clients:
+                raise ValueError(f"Duplicate bot_id {bot_id!r}.")
+            limiter = rate_limiter
+            if limiter is None and rate_limit:
+                limiter = RateLimiter({**(rates or {}), **(bot_rates or {}).get(bot_id, {})})
+            self.clients[bot_id] = OneChat(token, rate_limiter=limiter, **client_options)
+
+    @property
+    def bot_ids(self) -> List[str]:
+        """Bot IDs in the order they were added."""
+        return list(self.clients)
+
+    def client(self, bot_id: str) -> OneChat:
+        """Return the client for `bot_id`; raises ValueError for an unknown bot."""
+        try:
+            return self.clients[bot_id]
+        except KeyError:
+            raise ValueError(f"No client for bot_id {bot_id!r} in this pool.") from None
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        position = ROUTED_METHODS.get(name)
+        if position is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        def routed(*args: Any, **kwargs: Any) -> Any:
+            bot_id = args[position] if len(args) > position else kwargs.get("bot_id", "")
+            return getattr(self.client(bot_id), name)(*args, **kwargs)
+
+        routed.__name__ = name
+        return routed
+
+    def send_prepared(self, prepared: Any, to: str, custom_notification: Optional[str] = None):
+        """Send a prepared message through the client of its bot."""
+        return self.client(prepared.bot_id).send_prepared(prepared, to, custom_notification)
+
+    def _weight(self, bot_id: str, endpoint: str) -> float:
+        limiter = self.clients[bot_id].transport.rate_limiter
+        if limiter is None:
+            return 1.0
+        return limiter.budget(bot_id, endpoint)[0]
+
+    def audiences(self, bot_ids: Optional[Iterable[str]] = None) -> Dict[str, FrozenSet[str]]:
+        """Fetch the friend and group IDs each bot can reach, for :meth:`shard`.
+
+        Directories are fetched in parallel, one request per bot (served
+        from the friends cache when ``friends_cache_ttl`` is set). A bot
+        whose fetch fails gets an empty audience.
+        """
+        bots = list(bot_ids) if bot_ids is not None else self.bot_ids
+
+        def reachable(bot_id: str) -> FrozenSet[str]:
+            try:
+                directory = self.client(bot_id).fetch_directory(bot_id)
+            except ValueError:
+                return frozenset()
+            return directory.friend_ids() | directory.group_ids()
+
+        with ThreadPoolExecutor(max_workers=max(1, len(bots))) as executor:
+            return dict(zip(bots, executor.map(reachable, bots)))
+
+    def shard(
+        self,
+        recipients: Iterable[str],
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+        method: str = "send_message",
+    ) -> Tuple[Dict[str, List[str]], List[str]]:
+        """Assign each recipient to one bot allowed to reach it.
+
+        Recipients are de-duplicated. A bot is eligible for a recipient when
+        `audiences` is not given, or when the recipient is in that bot's
+        audience (see :meth:`audiences`). Each recipient goes to the eligible
+        bot with the lowest load relative to its rate budget for `method`'s
+        endpoint, so shards are proportional to the bots' budgets (and round
+        robin when the budgets are equal).
+
+        Returns ``(shards, unreachable)``: a dict of bot_id to recipients,
+        and the recipients no bot can reach.
+        """
+        bots = list(bot_ids) if bot_ids is not None else self.bot_ids
+        for bot_id in bots:
+            self.client(bot_id)
+        endpoint = SHARD_ENDPOINTS.get(method, "push_message")
+        weights = {bot_id: self._weight(bot_id, endpoint) for bot_id in bots}
+        return shard_recipients(recipients, weights, audiences)
+
+    def send_sharded(
+        self,
+        method: str,
+        recipients: Iterable[str],
+        *args: Any,
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+        max_workers: int = DEFAULT_SEND_WORKERS,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Optional[str], str, dict]]:
+        """Send one payload to many recipients, sharded across bots.
+
+        Recipients are split with :meth:`shard`; each bot then runs
+        :meth:`OneChat.send_many` over its shard with `max_workers` threads
+        on its own connection pool and rate budget. ``(bot_id, recipient,
+        response)`` triples are yielded as sends complete, across all bots.
+        Unreachable recipients are yielded first with a bot_id of ``None``
+        and a "fail" response. Closing the generator early (``break`` or
+        ``.close()``) stops the remaining sends; it returns once the sends
+        already in flight have finished.
+
+        Example::
+
+            for bot_id, to, resp in pool.send_sharded("send_sticker", ids, "STK1"):
+                ...
+        """
+        if method not in PER_RECIPIENT_METHODS:
+            raise ValueError(
+                f"send_sharded does not support {method!r}; use one of "
+                f"{', '.join(PER_RECIPIENT_METHODS)}."
+            )
+        shards, unreachable = self.shard(recipients, bot_ids, audiences, method)
+        return self._stream_shards(shards, unreachable, method, args, kwargs, max_workers)
+
+    def _stream_shards(
+        self,
+        shards: Dict[str, List[str]],
+        unreachable: List[str],
+        method: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        max_workers: int,
+    ) -> Iterator[Tuple[Optional[str], str, dict]]:
+        for to in unreachable:
+            yield None, to, {"status": "fail", "message": "No bot in the pool can reach this user."}
+
+        # Bounded so producers stay close to the consumer; `stopped` ends them early.
+        results: queue.Queue[Any] = queue.Queue(maxsize=2 * max_workers * max(1, len(shards)))
+        stopped = threading.Event()
+
+        def unsent(ids: List[str]) -> Iterator[str]:
+            for to in ids:
+                if stopped.is_set():
+                    return
+                yield to
+
+        def run(bot_id: str, ids: List[str]) -> None:
+            # Always post exactly one terminator, or the consumer waits forever.
+            outcome: Any = _DONE
+            try:
+                sends = self.clients[bot_id].send_many(
+                    method, unsent(ids), bot_id, *args, max_workers=max_workers, **kwargs
+                )
+                for to, response in sends:
+                    results.put((bot_id, to, response))
+            except BaseException as e:
+                outcome = e
+            finally:
+                results.put(outcome)
+
+        remaining = len(shards)
+        try:
+            for bot_id, ids in shards.items():
+                threading.Thread(target=run, args=(bot_id, ids), daemon=True).start()
+            while remaining:
+                item = results.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, BaseException):
+                    remaining -= 1
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Abandoned or failed: stop new sends and drain until the producers
+            # have finished the sends already in flight and exited.
+            stopped.set()
+            while remaining:
+                item = results.get()
+                if item is _DONE or isinstance(item, BaseException):
+                    remaining -= 1
+
+    def broadcast_sharded(
+        self,
+        recipients: Iterable[str],
+        message: Optional[str],
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+        max_workers: int = DEFAULT_BULK_WORKERS,
+    ) -> Dict[str, Any]:
+        """Broadcast a message to many recipients, sharded across bots.
+
+        Each bot sends its shard with :meth:`OneChat.broadcast_bulk` (in
+        parallel with the other bots). Returns ``status`` ("success",
+        "partial" or "fail" over all bots), ``bots`` mapping each bot_id to
+        its ``broadcast_bulk`` result, and the ``unreachable`` recipients.
+        """
+        shards, unreachable = self.shard(recipients, bot_ids, audiences, "broadcast_bulk")
+
+        def broadcast(item: Tuple[str, List[str]]) -> Dict[str, Any]:
+            bot_id, ids = item
+            return self.clients[bot_id].broadcast_bulk(bot_id, ids, message, max_workers)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(shards))) as executor:
+            results = dict(zip(shards, executor.map(broadcast, shards.items())))
+
+        statuses = {result.get("status") for result in results.values()}
+        if unreachable:
+            statuses.add("fail")
+        if statuses <= DELIVERED_STATUSES:
+            status = "success"
+        elif statuses & (DELIVERED_STATUSES | {"partial"}):
+            status = "partial"
+        else:
+            status = "fail"
+        return {"status": status, "bots": results, "unreachable": unreachable}
+
+    def pool_stats(self) -> Dict[str, dict]:
+        """Return connection pool counters per bot_id."""
+        return {bot_id: client.pool_stats() for bot_id, client in self.clients.items()}
+
+    def rate_limit_stats(self) -> Dict[str, dict]:
+        """Return rate limiter statistics per bot_id (empty dicts when disabled)."""
+        return {bot_id: client.rate_limit_stats() for bot_id, client in self.clients.items()}
+
+    def close(self) -> None:
+        """Close every client's pooled connections."""
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ClientPool(bot_ids={self.bot_ids!r})"
@@ -0,0 +1,71 @@
+# one_chat/codec.py
+
+import json
+from typing import Any, Optional, Union
+
+
+class JSONCodec:
+    """Encodes request payloads to bytes and decodes response bodies.
+
+    The default implementation uses the stdlib :mod:`json` module, emitting
+    compact UTF-8 (no ASCII escaping, so Thai text is 3 bytes per character
+    instead of 6). Subclass it, or pass any object with the same ``dumps``
+    and ``loads`` methods, to plug in another library.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize `obj` to a UTF-8 JSON body."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Parse a JSON body; raises ``ValueError`` when it is not valid JSON."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """:class:`JSONCodec` backed by orjson (``pip install one-chat-api[orjson]``)."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        """Import orjson; raises ``ImportError`` when it is not installed."""
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+_default: Optional[JSONCodec] = None
+
+
+def get_codec(codec: Union[None, str, JSONCodec] = None) -> JSONCodec:
+    """Resolve a codec choice to a :class:`JSONCodec` instance.
+
+    ``None`` or ``"auto"`` picks orjson when it is installed and the stdlib
+    codec otherwise; ``"orjson"`` and ``"json"`` force one; any other object
+    is returned as is.
+    """
+    global _default
+    if codec is None or codec == "auto":
+        if _default is None:
+            try:
+                _default = OrjsonCodec()
+            except ImportError:
+                _default = JSONCodec()
+        return _default
+    if codec == "orjson":
+        return OrjsonCodec()
+    if codec == "json":
+        return JSONCodec()
+    if isinstance(codec, str):
+        raise ValueError(f"Unknown JSON codec {codec!r}; use 'auto', 'orjson' or 'json'.")
+    return codec
@@ -0,0 +1,141 @@
+# one_chat/directory.py
+
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+FRIEND_NAME_KEYS = ("display_name", "name")
+GROUP_NAME_KEYS = ("group_name", "name")
+
+
+class DirectoryDiff(NamedTuple):
+    """IDs added and removed between two :class:`Directory` snapshots."""
+
+    added_friends: FrozenSet[str]
+    removed_friends: FrozenSet[str]
+    added_groups: FrozenSet[str]
+    removed_groups: FrozenSet[str]
+
+    @property
+    def is_empty(self) -> bool:
+        """True when both snapshots contain the same friends and groups."""
+        return not (
+            self.added_friends or self.removed_friends or self.added_groups or self.removed_groups
+        )
+
+
+def _index(
+    entries: Sequence[Dict[str, Any]], id_key: str, name_keys: Tuple[str, ...]
+) -> Tuple[Dict[str, int], Dict[str, Tuple[int, ...]]]:
+    """Map IDs to positions, and case-folded names to tuples of positions."""
+    by_id: Dict[str, int] = {}
+    by_name: Dict[str, List[int]] = {}
+    for position, entry in enumerate(entries):
+        entry_id = entry.get(id_key)
+        if entry_id is not None:
+            by_id[entry_id] = position
+        for key in name_keys:
+            name = entry.get(key)
+            if name:
+                by_name.setdefault(str(name).casefold(), []).append(position)
+                break
+    return by_id, {name: tuple(positions) for name, positions in by_name.items()}
+
+
+class Directory:
+    """Read-only, indexed view of a bot's friends and groups.
+
+    Built from a getlistroom response, it keeps the API's entry dicts once in
+    tuples and indexes them by position: one_id and group_id lookups and
+    case-insensitive display-name lookups are O(1) dict hits instead of list
+    scans. Two snapshots can be compared with :meth:`diff` to sync changes
+    incrementally.
+    """
+
+    __slots__ = (
+        "_friends",
+        "_groups",
+        "_friend_ids",
+        "_group_ids",
+        "_friend_names",
+        "_group_names",
+    )
+
+    def __init__(
+        self,
+        friends: Sequence[Dict[str, Any]] = (),
+        groups: Sequence[Dict[str, Any]] = (),
+    ):
+        """Index `friends` (by "one_id") and `groups` (by "group_id")."""
+        self._friends = tuple(friends)
+        self._groups = tuple(groups)
+        self._friend_ids, self._friend_names = _index(self._friends, "one_id", FRIEND_NAME_KEYS)
+        self._group_ids, self._group_names = _index(self._groups, "group_id", GROUP_NAME_KEYS)
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "Directory":
+        """Build a directory from a ``fetch_friends_and_groups`` response.
+
+        Raises ValueError for failed responses, so a failed fetch is never
+        mistaken for an empty friend list.
+        """
+        if response.get("status") != "success":
+            message = response.get("message", "Unknown error occurred.")
+            raise ValueError(f"Cannot build directory from failed response: {message}")
+        return cls(response.get("list_friend", []), response.get("list_group", []))
+
+    def friend(self, one_id: str) -> Optional[Dict[str, Any]]:
+        """Return the friend entry with `one_id`, or None."""
+        position = self._friend_ids.get(one_id)
+        return self._friends[position] if position is not None else None
+
+    def group(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """Return the group entry with `group_id`, or None."""
+        position = self._group_ids.get(group_id)
+        return self._groups[position] if position is not None else None
+
+    def friends_named(self, name: str) -> List[Dict[str, Any]]:
+        """Return friends whose display name matches `name` (case-insensitive)."""
+        return [self._friends[p] for p in self._friend_names.get(name.casefold(), ())]
+
+    def groups_named(self, name: str) -> List[Dict[str, Any]]:
+        """Return groups whose name matches `name` (case-insensitive)."""
+        return [self._groups[p] for p in self._group_names.get(name.casefold(), ())]
+
+    @property
+    def friends(self) -> Tuple[Dict[str, Any], ...]:
+        """All friend entries in API order."""
+        return self._friends
+
+    @property
+    def groups(self) -> Tuple[Dict[str, Any], ...]:
+        """All group entries in API order."""
+        return self._groups
+
+    def friend_ids(self) -> FrozenSet[str]:
+        """Return the set of friend One IDs."""
+        return frozenset(self._friend_ids)
+
+    def group_ids(self) -> FrozenSet[str]:
+        """Return the set of group IDs."""
+        return frozenset(self._group_ids)
+
+    def diff(self, newer: "Directory") -> DirectoryDiff:
+        """Return IDs added and removed going from this snapshot to `newer`."""
+        old_friends = self._friend_ids.keys()
+        new_friends = newer._friend_ids.keys()
+        old_groups = self._group_ids.keys()
+        new_groups = newer._group_ids.keys()
+        return DirectoryDiff(
+            added_friends=frozenset(new_friends - old_friends),
+            removed_friends=frozenset(old_friends - new_friends),
+            added_groups=frozenset(new_groups - old_groups),
+            removed_groups=frozenset(old_groups - new_groups),
+        )
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._friend_ids or entry_id in self._group_ids
+
+    def __len__(self) -> int:
+        return len(self._friends) + len(self._groups)
+
+    def __repr__(self) -> str:
+        return f"Directory(friends={len(self._friends)}, groups={len(self._groups)})"
@@ -0,0 +1,311 @@
+# one_chat/dispatcher.py
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice, zip_longest
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .broadcast_sender import MAX_BROADCAST_RECIPIENTS
+from .bulk import chunked, imap_bounded
+from .client_pool import SHARD_ENDPOINTS, ClientPool, shard_recipients
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import DEFAULT_SEND_WORKERS, PER_RECIPIENT_METHODS
+from .rate_limit import DEFAULT_RATE, SharedRateLimiter
+
+# Recipients per task handed to a worker process.
+DEFAULT_BATCH_SIZE = 500
+
+BROADCAST = "broadcast_message"
+
+# Per-process pool built by _start_worker in each worker.
+_worker_pool: Optional[ClientPool] = None
+
+
+def _start_worker(
+    bots: List[Tuple[str, str]], limiter: SharedRateLimiter, client_options: Dict[str, Any]
+) -> None:
+    global _worker_pool
+    _worker_pool = ClientPool(bots, rate_limiter=limiter, **client_options)
+
+
+def _run_batch(
+    bot_id: str,
+    method: str,
+    items: List[Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    threads: int,
+) -> Tuple[int, List[Tuple[Any, dict]], dict]:
+    """Send one batch in a worker; return its pid, results and rate limit totals."""
+    if _worker_pool is None:
+        raise RuntimeError("Worker process was not initialized.")
+    client = _worker_pool.client(bot_id)
+    if method == BROADCAST:
+
+        def broadcast(chunk: List[str]) -> dict:
+            return client.broadcast_message(bot_id, chunk, *args, **kwargs)
+
+        results = list(imap_bounded(broadcast, items, threads))
+    else:
+        results = list(
+            client.send_many(method, items, bot_id, *args, max_workers=threads, **kwargs)
+        )
+    stats = client.rate_limit_stats()
+    return os.getpid(), results, {key: value for key, value in stats.items() if key != "buckets"}
+
+
+def _tasks(bot_id: str, batches: Iterable[List[Any]]) -> Iterator[Tuple[str, List[Any]]]:
+    return ((bot_id, batch) for batch in batches)
+
+
+def _interleave(batches: Iterable[Iterable[Any]]) -> Iterator[Any]:
+    """Yield from each iterable in turn, so every bot's batches start early."""
+    missing = object()
+    for group in zip_longest(*batches, fillvalue=missing):
+        yield from (batch for batch in group if batch is not missing)
+
+
+class CampaignDispatcher:
+    """Send a large campaign from a pool of worker processes.
+
+    A single process tops out on payload building, TLS and JSON work under
+    the GIL. The dispatcher shards recipients across bots (like
+    :meth:`ClientPool.shard`), cuts each shard into batches and runs them
+    on a :class:`~concurrent.futures.ProcessPoolExecutor`. Every worker
+    holds its own :class:`ClientPool` (own connection pools), while one
+    :class:`SharedRateLimiter` keeps all workers together within each bot's
+    budget. Batch results stream back to the parent as they complete and
+    are merged into :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        bots: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        processes: Optional[int] = None,
+        rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        bot_rates: Optional[Mapping[str, Dict[str, Tuple[float, int]]]] = None,
+        default_rate: Tuple[float, int] = DEFAULT_RATE,
+        threads_per_process: int = DEFAULT_SEND_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        mp_context: Any = None,
+        **client_options: Any,
+    ):
+        """Configure the dispatcher; worker processes start on first use.
+
+        Parameters:
+        - bots: Mapping of bot_id to token, or ``(bot_id, token)`` pairs.
+        - processes: Worker processes; defaults to ``os.cpu_count()``.
+        - rates, bot_rates, default_rate: Global budgets per bot shared by
+          all workers (see :class:`SharedRateLimiter`).
+        - threads_per_process: Concurrent sends inside each worker.
+        - batch_size: Recipients per task sent to a worker.
+        - mp_context: :mod:`multiprocessing` context (or start method name)
+          for the workers.
+        - client_options: Further :class:`OneChat` arguments for the
+          workers' clients; they must be picklable.
+        """
+        import multiprocessing
+
+        self.bots = list(bots.items() if isinstance(bots, Mapping) else bots)
+        if not self.bots:
+            raise ValueError("CampaignDispatcher needs at least one (bot_id, token) pair.")
+        if batch_size < 1 or threads_per_process < 1:
+            raise ValueError("batch_size and threads_per_process must be at least 1")
+        self.processes = processes or os.cpu_count() or 1
+        self.threads_per_process = threads_per_process
+        self.batch_size = batch_size
+        self.client_options = client_options
+        if mp_context is None or isinstance(mp_context, str):
+            mp_context = multiprocessing.get_context(mp_context)
+        self.mp_context = mp_context
+        self.rate_limiter = SharedRateLimiter(
+            [bot_id for bot_id, _ in self.bots],
+            rates,
+            default_rate,
+            bot_rates,
+            context=mp_context,
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats: Dict[str, Any] = {
+            "sent": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "unreachable": 0,
+            "bots": {},
+            "workers": {},
+        }
+        self._worker_waits: Dict[int, dict] = {}
+
+    @property
+    def bot_ids(self) -> List[str]:
+        """Bot IDs in the order they were added."""
+        return [bot_id for bot_id, _ in self.bots]
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=self.mp_context,
+                initializer=_start_worker,
+                initargs=(self.bots, self.rate_limiter, self.client_options),
+            )
+        return self._executor
+
+    def shard(
+        self,
+        recipients: Iterable[str],
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+        method: str = "send_message",
+    ) -> Tuple[Dict[str, List[str]], List[str]]:
+        """Split recipients across bots by budget and audience, like :meth:`ClientPool.shard`."""
+        bots = list(bot_ids) if bot_ids is not None else self.bot_ids
+        unknown = set(bots) - set(self.bot_ids)
+        if unknown:
+            raise ValueError(f"Unknown bot_id(s) {sorted(unknown)!r} for this dispatcher.")
+        endpoint = SHARD_ENDPOINTS.get(method, "push_message")
+        weights = {bot_id: self.rate_limiter.budget(bot_id, endpoint)[0] for bot_id in bots}
+        return shard_recipients(recipients, weights, audiences)
+
+    def send(
+        self,
+        method: str,
+        recipients: Iterable[str],
+        *args: Any,
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[Optional[str], str, dict]]:
+        """Send one payload to every recipient from the worker processes.
+
+        `method` and `args`/`kwargs` are as for :meth:`OneChat.send_many`.
+        ``(bot_id, recipient, response)`` triples are yielded as batches
+        complete; unreachable recipients come first with a bot_id of
+        ``None`` and a "fail" response.
+
+        Example::
+
+            with CampaignDispatcher({"B1": token1, "B2": token2}) as dispatcher:
+                for bot_id, to, resp in dispatcher.send("send_message", ids, "Hi"):
+                    ...
+        """
+        if method not in PER_RECIPIENT_METHODS:
+            raise ValueError(
+                f"CampaignDispatcher.send does not support {method!r}; use one of "
+                f"{', '.join(PER_RECIPIENT_METHODS)}."
+            )
+        shards, unreachable = self.shard(recipients, bot_ids, audiences, method)
+        tasks = _interleave(
+            _tasks(bot_id, chunked(ids, self.batch_size)) for bot_id, ids in shards.items()
+        )
+        return self._dispatch(method, tasks, unreachable, args, kwargs)
+
+    def broadcast(
+        self,
+        recipients: Iterable[str],
+        message: Optional[str],
+        bot_ids: Optional[Iterable[str]] = None,
+        audiences: Optional[Mapping[str, Collection[str]]] = None,
+    ) -> Iterator[Tuple[Optional[str], List[str], dict]]:
+        """Broadcast `message` in 100-recipient chunks from the worker processes.
+
+        Yields ``(bot_id, chunk, response)`` per broadcast_group call as
+        batches complete; unreachable recipients come first as one chunk
+        with a bot_id of ``None``.
+        """
+        shards, unreachable = self.shard(recipients, bot_ids, audiences, "broadcast_bulk")
+        chunks_per_batch = max(1, self.batch_size // MAX_BROADCAST_RECIPIENTS)
+        tasks = _interleave(
+            _tasks(bot_id, chunked(chunked(ids, MAX_BROADCAST_RECIPIENTS), chunks_per_batch))
+            for bot_id, ids in shards.items()
+        )
+        return self._dispatch(
+            BROADCAST, tasks, [unreachable] if unreachable else [], (message,), {}
+        )
+
+    def _dispatch(
+        self,
+        method: str,
+        tasks: Iterator[Tuple[str, List[Any]]],
+        unreachable: List[Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Iterator[Tuple[Optional[str], Any, dict]]:
+        failure = {"status": "fail", "message": "No bot can reach this user."}
+        for item in unreachable:
+            self._stats["unreachable"] += len(item) if isinstance(item, list) else 1
+            yield None, item, dict(failure)
+
+        executor = self._pool()
+        pending: Dict[Future, str] = {}
+
+        def submit(count: int) -> None:
+            for bot_id, items in islice(tasks, count):
+                future = executor.submit(
+                    _run_batch, bot_id, method, items, args, kwargs, self.threads_per_process
+                )
+                pending[future] = bot_id
+
+        submit(2 * self.processes)
+        while pending:
+            done: Set[Future]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                bot_id = pending.pop(future)
+                pid, results, waits = future.result()
+                self._merge(bot_id, pid, results, waits)
+                for item, response in results:
+                    yield bot_id, item, response
+            submit(len(done))
+
+    def _merge(self, bot_id: str, pid: int, results: List[Tuple[Any, dict]], waits: dict) -> None:
+        succeeded = sum(response.get("status") in DELIVERED_STATUSES for _, response in results)
+        for counters in (
+            self._stats,
+            self._stats["bots"].setdefault(bot_id, {"sent": 0, "succeeded": 0, "failed": 0}),
+            self._stats["workers"].setdefault(pid, {"sent": 0, "succeeded": 0, "failed": 0}),
+        ):
+            counters["sent"] += len(results)
+            counters["succeeded"] += succeeded
+            counters["failed"] += len(results) - succeeded
+        self._worker_waits[pid] = waits
+
+    def stats(self) -> Dict[str, Any]:
+        """Return merged counters: totals, per bot_id, per worker pid and rate limit waits.
+
+        Counts are per request: a broadcast chunk counts once.
+        """
+        rate_limit = {
+            name: sum(waits.get(name, 0) for waits in self._worker_waits.values())
+            for name in ("acquired", "waited", "wait_seconds", "throttled")
+        }
+        return {
+            **self._stats,
+            "bots": {bot_id: dict(c) for bot_id, c in self._stats["bots"].items()},
+            "workers": {pid: dict(c) for pid, c in self._stats["workers"].items()},
+            "rate_limit": rate_limit,
+        }
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "CampaignDispatcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
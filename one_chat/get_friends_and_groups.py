@@ -1,40 +1,139 @@
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional, Set
 
 # one_chat/friend_and_group_manager.py
 import requests
 
+from .cache import STALE, TTLCache
+from .directory import Directory
+from .singleflight import SingleFlight
+from .transport import Transport
+
 DEFAULT_TIMEOUT = (5, 15)
+DEFAULT_CACHE_MAXSIZE = 128
 
 
 class FriendAndGroupManager:
-    """Fetch and extract friend/group information for a bot."""
+    """Fetch and extract friend/group information for a bot.
+
+    With `cache_ttl` set, successful getlistroom responses are cached per
+    bot_id, so the four ``list_*`` helpers (and repeated fetches) are served
+    from one fetched snapshot until it expires. Concurrent fetches for the
+    same bot_id are coalesced into a single request whether or not caching is
+    enabled. Cached and coalesced responses are shared; treat them as
+    read-only.
+    """
 
-    def __init__(self, authorization_token: str):
-        """Initialize with Bearer token (with/without prefix)."""
+    def __init__(
+        self,
+        authorization_token: str,
+        transport: Optional[Transport] = None,
+        cache_ttl: Optional[float] = None,
+        cache_maxsize: int = DEFAULT_CACHE_MAXSIZE,
+        stale_ttl: float = 0.0,
+    ):
+        """Initialize with Bearer token (with/without prefix) and optional shared transport.
+
+        Parameters:
+        - cache_ttl: Seconds a fetched snapshot stays fresh; ``None``
+          disables caching.
+        - cache_maxsize: Maximum number of bot_ids kept (LRU eviction).
+        - stale_ttl: Seconds past `cache_ttl` during which the stale snapshot
+          is still returned while a background refresh runs.
+        """
         if authorization_token.startswith("Bearer "):
             authorization_token = authorization_token.replace("Bearer ", "", 1)
         self.authorization_token = authorization_token
+        self.transport = transport or Transport()
         self.base_url = "https://chat-api.one.th/manage/api/v1/getlistroom"
         self.headers = {
             "Authorization": f"Bearer {self.authorization_token}",
             "Content-Type": "application/json",
         }
+        self.cache: Optional[TTLCache[Dict[str, Any]]] = (
+            TTLCache(cache_ttl, cache_maxsize, stale_ttl) if cache_ttl is not None else None
+        )
+        self._flight = SingleFlight()
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
 
     def fetch_friends_and_groups(self, bot_id: str) -> Dict[str, Any]:
-        """Call the API to fetch friends and groups for the given `bot_id`."""
+        """Fetch friends and groups for the given `bot_id`.
+
+        Served from the cache when enabled and fresh; a stale snapshot is
+        returned immediately while a background refresh is started.
+        """
+        if self.cache is not None:
+            cached, state = self.cache.get(bot_id)
+            if cached is not None:
+                if state == STALE:
+                    self._refresh_in_background(bot_id)
+                return cached
+        return self._load(bot_id)
+
+    def invalidate(self, bot_id: Optional[str] = None) -> None:
+        """Drop the cached snapshot for `bot_id`, or for every bot when None."""
+        if self.cache is not None:
+            self.cache.invalidate(bot_id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters, or an empty dict when caching is off."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Return how many fetches ran and how many were coalesced onto them."""
+        return self._flight.stats()
+
+    def _load(self, bot_id: str) -> Dict[str, Any]:
+        """Fetch through the single-flight group and cache a successful response."""
+
+        def fetch_and_store() -> Dict[str, Any]:
+            response = self._fetch(bot_id)
+            if self.cache is not None and response.get("status") == "success":
+                self.cache.set(bot_id, response)
+            return response
+
+        return self._flight.do(bot_id, fetch_and_store)
+
+    def _refresh_in_background(self, bot_id: str) -> None:
+        """Start at most one background refresh per bot_id."""
+        with self._refresh_lock:
+            if bot_id in self._refreshing:
+                return
+            self._refreshing.add(bot_id)
+
+        def refresh() -> None:
+            try:
+                self._load(bot_id)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(bot_id)
+
+        threading.Thread(target=refresh, name=f"one-chat-refresh-{bot_id}", daemon=True).start()
+
+    def _fetch(self, bot_id: str) -> Dict[str, Any]:
+        """Call the getlistroom API for `bot_id`, bypassing the cache."""
         payload = {"bot_id": bot_id}
         try:
-            response = requests.post(
+            response = self.transport.post(
                 self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
             return {"status": "fail", "message": f"Request failed: {str(e)}"}
 
+    def fetch_directory(self, bot_id: str) -> Directory:
+        """Return an indexed :class:`Directory` of the bot's friends and groups.
+
+        Uses the same (possibly cached) snapshot as the list helpers. Raises
+        ValueError if the fetch failed.
+        """
+        return Directory.from_response(self.fetch_friends_and_groups(bot_id))
+
     def list_all_friends(self, bot_id: str) -> List[Dict[str, Any]]:
         """Return friend objects under the "list_friend" key, or an empty list."""
         try:
@@ -78,7 +177,7 @@ class FriendAndGroupManager:
     def _handle_error(self, response: requests.Response) -> dict:
         """Normalize API error responses to a consistent structure."""
         try:
-            error_response = response.json()
+            error_response = self.transport.decode_json(response)
             return {
                 "status": error_response.get("status", "fail"),
                 "message": error_response.get("message", "Unknown error occurred."),
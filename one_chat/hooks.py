@@ -0,0 +1,140 @@
+# one_chat/hooks.py
+
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .rate_limit import endpoint_name
+
+REQUEST_START = "request_start"
+CONNECTION_ACQUIRED = "connection_acquired"
+HEADERS_SENT = "headers_sent"
+RESPONSE_RECEIVED = "response_received"
+JSON_DECODED = "json_decoded"
+ERROR = "error"
+
+EVENTS = (
+    REQUEST_START,
+    CONNECTION_ACQUIRED,
+    HEADERS_SENT,
+    RESPONSE_RECEIVED,
+    JSON_DECODED,
+    ERROR,
+)
+
+
+class RequestEvent(NamedTuple):
+    """One step in the lifecycle of an API call.
+
+    `request_id` is shared by every attempt of one logical call and
+    `attempt` counts from 1, so retries show up as separate waterfalls.
+    `elapsed` is seconds since the attempt's ``request_start``.
+    """
+
+    name: str
+    request_id: int
+    attempt: int
+    endpoint: str
+    bot_id: Optional[str]
+    timestamp: float
+    elapsed: float
+    attributes: Dict[str, Any]
+
+
+Listener = Callable[[RequestEvent], None]
+
+
+class RequestContext:
+    """Identifies one attempt of a call and emits its events."""
+
+    __slots__ = ("hooks", "request_id", "attempt", "url", "endpoint", "bot_id", "started")
+
+    def __init__(
+        self, hooks: "Hooks", request_id: int, attempt: int, url: str, bot_id: Optional[str]
+    ):
+        self.hooks = hooks
+        self.request_id = request_id
+        self.attempt = attempt
+        self.url = url
+        self.endpoint = endpoint_name(url)
+        self.bot_id = bot_id
+        self.started = time.perf_counter()
+
+    def emit(self, name: str, **attributes: Any) -> None:
+        """Fire event `name` with extra `attributes` to the registered listeners."""
+        self.hooks.emit(
+            RequestEvent(
+                name,
+                self.request_id,
+                self.attempt,
+                self.endpoint,
+                self.bot_id,
+                time.time(),
+                time.perf_counter() - self.started,
+                attributes,
+            )
+        )
+
+
+class Hooks:
+    """Registry of request lifecycle listeners.
+
+    Events, in order for a successful attempt: ``request_start``,
+    ``connection_acquired`` (``reused``: keep-alive hit), ``headers_sent``,
+    ``response_received`` (``status``, ``bytes``) and ``json_decoded``. A
+    failed attempt fires ``error`` (``error``: the exception) instead of
+    ``response_received``.
+
+    Listeners run synchronously on the thread (or event loop) making the
+    call, so they should be quick and must not raise.
+    """
+
+    def __init__(self) -> None:
+        """Create a registry with no listeners."""
+        self._listeners: Dict[str, List[Listener]] = {name: [] for name in EVENTS}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def on(self, event: str, listener: Listener) -> None:
+        """Call ``listener(event)`` for `event`, or for every event when `event` is "*"."""
+        names = EVENTS if event == "*" else (event,)
+        for name in names:
+            if name not in self._listeners:
+                raise ValueError(f"Unknown event {event!r}; use one of {', '.join(EVENTS)} or '*'.")
+        with self._lock:
+            for name in names:
+                self._listeners[name].append(listener)
+
+    def emit(self, event: RequestEvent) -> None:
+        """Deliver `event` to its listeners."""
+        for listener in self._listeners[event.name]:
+            listener(event)
+
+    def new_request_id(self) -> int:
+        """Return a fresh id for one logical call (shared by its retries)."""
+        with self._lock:
+            return next(self._ids)
+
+    def start(
+        self, request_id: int, attempt: int, url: str, bot_id: Optional[str]
+    ) -> RequestContext:
+        """Begin an attempt: fire ``request_start`` and return its context."""
+        context = RequestContext(self, request_id, attempt, url, bot_id)
+        context.emit(REQUEST_START, url=url)
+        return context
+
+
+# The attempt being sent on this thread, so the connection pool can report
+# connection_acquired / headers_sent for it.
+_local = threading.local()
+
+
+def current_context() -> Optional[RequestContext]:
+    """Return the :class:`RequestContext` of the attempt running on this thread."""
+    return getattr(_local, "context", None)
+
+
+def set_current_context(context: Optional[RequestContext]) -> None:
+    """Set (or clear, with None) the attempt running on this thread."""
+    _local.context = context
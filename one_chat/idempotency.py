@@ -0,0 +1,223 @@
+# one_chat/idempotency.py
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+import requests
+
+from .rate_limit import endpoint_name
+
+# Endpoints that only read data; repeating them is harmless, so they are never suppressed.
+READ_ENDPOINTS = frozenset({"getlistroom"})
+
+# Result status of a send suppressed as a duplicate: the message already went out.
+DUPLICATE = "duplicate"
+# Result statuses meaning the recipients have the message.
+DELIVERED_STATUSES = frozenset({"success", DUPLICATE})
+
+
+class DuplicateSendError(requests.exceptions.RequestException):
+    """Raised instead of sending a request already sent within the dedupe window.
+
+    It subclasses :class:`requests.exceptions.RequestException`; senders
+    turn it into a ``{"status": "duplicate", ...}`` result.
+    """
+
+
+def request_key(
+    url: str, body: Optional[bytes], idempotency_key: Optional[str] = None
+) -> Optional[bytes]:
+    """Return the deduplication key of a send, or ``None`` when it has none.
+
+    The key is a 16-byte BLAKE2b digest of the endpoint URL and either the
+    caller's explicit `idempotency_key` or the encoded JSON body, which
+    holds the bot_id, the recipient(s) and the payload. Body keys match
+    exactly when two calls would deliver the same message to the same
+    recipients from the same bot with the same JSON codec; an explicit key
+    stays stable across codecs and also covers multipart uploads. Read
+    endpoints, and sends with neither key nor byte body, have no key.
+    """
+    if endpoint_name(url) in READ_ENDPOINTS:
+        return None
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16)
+    if idempotency_key is not None:
+        digest.update(b"\1")
+        digest.update(idempotency_key.encode("utf-8"))
+    elif isinstance(body, bytes):
+        digest.update(b"\0")
+        digest.update(body)
+    else:
+        return None
+    return digest.digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte keys.
+
+    The `hashes` bit positions are derived from the key itself by double
+    hashing (the key is already a uniform digest), so adding or testing a
+    key costs no further hashing.
+    """
+
+    __slots__ = ("bits", "size", "hashes")
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        """Size the filter for `capacity` keys at `false_positive_rate`."""
+        if capacity < 1 or not 0 < false_positive_rate < 1:
+            raise ValueError("capacity must be positive and false_positive_rate in (0, 1)")
+        size = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.size = max(8, size)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key: bytes) -> List[int]:
+        """Return the bit positions of `key` (shared by filters of the same size)."""
+        size = self.size
+        h1 = int.from_bytes(key[:8], "little") % size
+        h2 = int.from_bytes(key[8:16], "little") % size or 1
+        return [position % size for position in range(h1, h1 + self.hashes * h2, h2)]
+
+    def add(self, key: bytes, positions: Optional[List[int]] = None) -> None:
+        """Add `key` (or its precomputed `positions`) to the filter."""
+        bits = self.bits
+        for position in positions if positions is not None else self.positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def contains(self, key: bytes, positions: Optional[List[int]] = None) -> bool:
+        """Return True when `key` (or its precomputed `positions`) may be in the filter."""
+        bits = self.bits
+        for position in positions if positions is not None else self.positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.contains(key)
+
+
+class SendDeduplicator:
+    """Sliding-window duplicate suppression for sends.
+
+    Keys of accepted sends are kept for `window` seconds in a ring of
+    `buckets` Bloom filters, each covering ``window / buckets`` seconds: new
+    keys go to the newest filter, lookups check them all, and the oldest is
+    dropped as time moves on, so memory stays fixed however many sends
+    pass. A Bloom filter can report a false positive (at about
+    `false_positive_rate` while traffic stays within `capacity` keys per
+    window), which would drop a genuine message. Set `exact_size` to keep
+    an exact LRU of the most recent keys as well; a key is then only
+    suppressed when the LRU confirms it, and the filters just let new keys
+    skip the LRU lookup.
+
+    Keys are also held in an exact in-flight set from :meth:`begin` until
+    :meth:`commit` (the API accepted the request) or :meth:`release` (it
+    failed), so a concurrent duplicate is suppressed while a failed send
+    can be tried again.
+    """
+
+    def __init__(
+        self,
+        window: float = 3600.0,
+        buckets: int = 6,
+        capacity: int = 100_000,
+        false_positive_rate: float = 1e-6,
+        exact_size: int = 0,
+    ):
+        """Create an empty deduplicator; see the class docstring for parameters."""
+        if window <= 0 or buckets < 1 or exact_size < 0:
+            raise ValueError("window must be positive, buckets at least 1, exact_size >= 0")
+        self.window = window
+        self.buckets = buckets
+        self.exact_size = exact_size
+        self._bucket_capacity = max(1, math.ceil(capacity / buckets))
+        self._bucket_fpr = false_positive_rate / buckets
+        self._span = window / buckets
+        self._filters: Deque[BloomFilter] = deque()
+        self._filter_started = 0.0
+        self._exact: OrderedDict[bytes, float] = OrderedDict()
+        # In-flight keys and their filter bit positions, reused by commit().
+        self._in_flight: Dict[bytes, List[int]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "checked": 0,
+            "suppressed": 0,
+            "suppressed_in_flight": 0,
+            "unconfirmed_bloom_hits": 0,
+            "committed": 0,
+            "released": 0,
+        }
+
+    def _rotate(self, now: float) -> None:
+        if self._filters and now - self._filter_started < self._span:
+            return
+        elapsed = int((now - self._filter_started) // self._span) if self._filters else 1
+        for _ in range(min(elapsed, self.buckets)):
+            self._filters.appendleft(BloomFilter(self._bucket_capacity, self._bucket_fpr))
+            if len(self._filters) > self.buckets:
+                self._filters.pop()
+        self._filter_started = now
+
+    def _seen(self, key: bytes, positions: List[int], now: float) -> bool:
+        if not any(bloom.contains(key, positions) for bloom in self._filters):
+            return False
+        if not self.exact_size:
+            return True
+        sent_at = self._exact.get(key)
+        if sent_at is not None and now - sent_at < self.window:
+            self._exact.move_to_end(key)
+            return True
+        self._counters["unconfirmed_bloom_hits"] += 1
+        return False
+
+    def begin(self, key: bytes) -> bool:
+        """Reserve `key` for sending; return False when it is a duplicate to drop."""
+        with self._lock:
+            now = time.monotonic()
+            self._rotate(now)
+            self._counters["checked"] += 1
+            if key in self._in_flight:
+                self._counters["suppressed"] += 1
+                self._counters["suppressed_in_flight"] += 1
+                return False
+            positions = self._filters[0].positions(key)
+            if self._seen(key, positions, now):
+                self._counters["suppressed"] += 1
+                return False
+            self._in_flight[key] = positions
+            return True
+
+    def commit(self, key: bytes) -> None:
+        """Record `key` as sent, so repeats within the window are suppressed."""
+        with self._lock:
+            positions = self._in_flight.pop(key, None)
+            if positions is None:
+                return
+            now = time.monotonic()
+            self._rotate(now)
+            self._filters[0].add(key, positions)
+            if self.exact_size:
+                self._exact[key] = now
+                self._exact.move_to_end(key)
+                while len(self._exact) > self.exact_size:
+                    self._exact.popitem(last=False)
+            self._counters["committed"] += 1
+
+    def release(self, key: bytes) -> None:
+        """Forget an in-flight `key` whose send failed; a no-op after :meth:`commit`."""
+        with self._lock:
+            if self._in_flight.pop(key, None) is not None:
+                self._counters["released"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return suppression counters, the in-flight count and memory used by the filters."""
+        with self._lock:
+            return {
+                **self._counters,
+                "in_flight": len(self._in_flight),
+                "exact_entries": len(self._exact),
+                "filter_bytes": sum(len(bloom.bits) for bloom in self._filters),
+            }
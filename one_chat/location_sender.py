@@ -2,17 +2,20 @@ from typing import Optional
 
 import requests
 
+from .transport import Transport, failure_result
+
 DEFAULT_TIMEOUT = (5, 15)
 
 
 class LocationSender:
     """Send location payloads via the message API."""
 
-    def __init__(self, authorization_token: str):
-        """Initialize with Bearer token (with/without prefix)."""
+    def __init__(self, authorization_token: str, transport: Optional[Transport] = None):
+        """Initialize with Bearer token (with/without prefix) and optional shared transport."""
         if authorization_token.startswith("Bearer "):
             authorization_token = authorization_token.replace("Bearer ", "", 1)
         self.authorization_token = authorization_token
+        self.transport = transport or Transport()
         self.url = "https://chat-api.one.th/message/api/v1/push_message"
 
     def send_location(
@@ -23,6 +26,7 @@ class LocationSender:
         longitude: Optional[str],
         address: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> dict:
         """Send a location with latitude/longitude and optional address."""
         headers = {
@@ -41,21 +45,25 @@ class LocationSender:
         }
 
         try:
-            response = requests.post(
-                self.url, headers=headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.url,
+                headers=headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
 
     def _handle_error(self, response: requests.Response) -> dict:
         """Normalize error responses to a consistent format."""
         try:
-            error_response = response.json()
+            error_response = self.transport.decode_json(response)
             return {
                 "status": error_response.get("status", "fail"),
                 "message": error_response.get("message", "Unknown error occurred."),
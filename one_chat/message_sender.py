@@ -3,6 +3,10 @@ from typing import Optional
 
 import requests
 
+from .multipart import DEFAULT_CHUNK_SIZE, MultipartEncoder, ProgressCallback
+from .transport import Transport, failure_result
+from .upload_cache import UploadCache
+
 DEFAULT_TIMEOUT = (5, 15)
 
 
@@ -12,14 +16,23 @@ class MessageSender:
     Handles sending text, templates, files, and webviews via OneChat message API.
     """
 
-    def __init__(self, authorization_token: str):
+    def __init__(
+        self,
+        authorization_token: str,
+        transport: Optional[Transport] = None,
+        upload_cache: Optional[UploadCache] = None,
+    ):
         """Create a MessageSender with the given token.
 
-        Accepts tokens with or without the leading "Bearer ".
+        Accepts tokens with or without the leading "Bearer ". Pass a shared
+        `transport` to reuse pooled connections across senders, and an
+        `upload_cache` to read each unchanged file only once across sends.
         """
         if authorization_token.startswith("Bearer "):
             authorization_token = authorization_token.replace("Bearer ", "", 1)
         self.authorization_token = authorization_token
+        self.transport = transport or Transport()
+        self.upload_cache = upload_cache
         self.base_url = "https://chat-api.one.th/message/api/v1/push_message"
         self.headers = {
             "Authorization": f"Bearer {authorization_token}",
@@ -32,6 +45,7 @@ class MessageSender:
         bot_id: str,
         message: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> dict:
         """Send a text message.
 
@@ -40,6 +54,8 @@ class MessageSender:
         - bot_id: Bot ID sending the message.
         - message: The message text.
         - custom_notification: Optional notification override.
+        - idempotency_key: Optional key identifying this send to the
+          transport's deduplicator in place of the encoded body.
 
         Returns a response dict from the OneChat API or a normalized error.
         """
@@ -48,16 +64,20 @@ class MessageSender:
             payload["custom_notification"] = custom_notification
 
         try:
-            response = requests.post(
-                self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.base_url,
+                headers=self.headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
 
     def send_template(
         self,
@@ -65,6 +85,7 @@ class MessageSender:
         bot_id: str,
         template: Optional[list],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> dict:
         """Send a template message with elements payload.
 
@@ -75,16 +96,20 @@ class MessageSender:
             payload["custom_notification"] = custom_notification
 
         try:
-            response = requests.post(
-                self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.base_url,
+                headers=self.headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
 
     def send_file(
         self,
@@ -92,10 +117,18 @@ class MessageSender:
         bot_id: str,
         file_path: Optional[str],
         custom_notification: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        idempotency_key: Optional[str] = None,
     ) -> dict:
         """Upload and send a file.
 
-        Reads the file at `file_path` and sends it as multipart form data.
+        Streams the file at `file_path` as multipart form data in `chunk_size`
+        pieces, so large files are never held in memory. `use_mmap` reads it
+        through a memory map, and `progress` is called as
+        ``progress(bytes_sent, total_bytes)`` while the body is sent. With an
+        upload cache configured, small enough files are served from memory.
         """
         data = {
             "to": to,
@@ -106,31 +139,35 @@ class MessageSender:
         if custom_notification:
             data["custom_notification"] = custom_notification
 
-        headers = {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
-
         if file_path is None:
             return {"status": "fail", "message": "file_path is required"}
 
-        with open(file_path, "rb") as file:
-            files = {
-                "file": (file_path, file),
-            }
+        body = MultipartEncoder(
+            data,
+            "file",
+            file_path,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+            progress=progress,
+            content=self.upload_cache.get(file_path) if self.upload_cache else None,
+        )
+        headers = dict(self.headers, **{"Content-Type": body.content_type})
+
+        try:
+            response = self.transport.post(
+                self.base_url,
+                headers=headers,
+                data=body,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
+            )
 
-            try:
-                response = requests.post(
-                    self.base_url,
-                    headers=headers,
-                    data=data,
-                    files=files,
-                    timeout=DEFAULT_TIMEOUT,
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return self._handle_error(response)
-            except requests.exceptions.RequestException as e:
-                return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            if response.status_code == 200:
+                return self.transport.decode_json(response)
+            else:
+                return self._handle_error(response)
+        except requests.exceptions.RequestException as e:
+            return failure_result(e)
 
     def send_webview(
         self,
@@ -138,6 +175,7 @@ class MessageSender:
         bot_id: str,
         url: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a webview message containing a URL.
 
@@ -160,21 +198,25 @@ class MessageSender:
             payload["custom_notification"] = custom_notification
 
         try:
-            response = requests.post(
-                self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.base_url,
+                headers=self.headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
 
     def _handle_error(self, response: requests.Response) -> dict:
         """Normalize API error responses to a consistent structure."""
         try:
-            error_response = response.json()
+            error_response = self.transport.decode_json(response)
             return {
                 "status": error_response.get("status", "fail"),
                 "message": error_response.get("message", "Unknown error occurred."),
@@ -0,0 +1,180 @@
+# one_chat/metrics.py
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ERROR_STATUS = "error"
+
+
+class _Histogram:
+    """Fixed-bucket histogram; `counts` has one extra slot for +Inf."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * (size + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+def _labels(**labels: str) -> str:
+    body = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """In-process request metrics for the transport and async client.
+
+    Records, per endpoint (the last URL path segment, e.g. "push_message"):
+
+    - a latency histogram per HTTP status (``"error"`` for calls that raised),
+    - request and response body bytes,
+    - exceptions by class name,
+    - retries.
+
+    Read it with :meth:`snapshot` or export it with :meth:`to_prometheus`.
+    Updates take one lock and a bisect over the bucket bounds; clients built
+    without a ``Metrics`` skip instrumentation entirely.
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, namespace: str = "one_chat"
+    ):
+        """Create empty metrics with latency `buckets` (ascending upper bounds)."""
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every metric."""
+        with self._lock:
+            self._latency: Dict[Tuple[str, str], _Histogram] = {}
+            self._request_bytes: Dict[str, int] = {}
+            self._response_bytes: Dict[str, int] = {}
+            self._errors: Dict[Tuple[str, str], int] = {}
+            self._retries: Dict[str, int] = {}
+
+    def observe(
+        self,
+        endpoint: str,
+        status: str,
+        seconds: float,
+        request_bytes: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+    ) -> None:
+        """Record one completed (or failed, with status "error") request."""
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._latency.get((endpoint, status))
+            if histogram is None:
+                histogram = self._latency[(endpoint, status)] = _Histogram(len(self.buckets))
+            histogram.counts[slot] += 1
+            histogram.total += seconds
+            histogram.count += 1
+            if request_bytes is not None:
+                self._request_bytes[endpoint] = self._request_bytes.get(endpoint, 0) + request_bytes
+            if response_bytes is not None:
+                self._response_bytes[endpoint] = (
+                    self._response_bytes.get(endpoint, 0) + response_bytes
+                )
+
+    def record_error(self, endpoint: str, error: BaseException) -> None:
+        """Count an exception raised while calling `endpoint`, by class name."""
+        key = (endpoint, type(error).__name__)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_retry(self, endpoint: str) -> None:
+        """Count a retry of a call to `endpoint`."""
+        with self._lock:
+            self._retries[endpoint] = self._retries.get(endpoint, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as plain dicts keyed by endpoint.
+
+        ``latency[endpoint][status]`` holds ``count``, ``sum`` and
+        cumulative ``buckets`` (upper bound -> count, ``"+Inf"`` last).
+        """
+        with self._lock:
+            latency: Dict[str, Dict[str, Any]] = {}
+            for (endpoint, status), histogram in self._latency.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    buckets["+Inf" if bound == float("inf") else bound] = cumulative
+                latency.setdefault(endpoint, {})[status] = {
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "buckets": buckets,
+                }
+            errors: Dict[str, Dict[str, int]] = {}
+            for (endpoint, name), count in self._errors.items():
+                errors.setdefault(endpoint, {})[name] = count
+            return {
+                "latency": latency,
+                "request_bytes": dict(self._request_bytes),
+                "response_bytes": dict(self._response_bytes),
+                "errors": errors,
+                "retries": dict(self._retries),
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        ns = self.namespace
+        lines: List[str] = [
+            f"# HELP {ns}_request_duration_seconds Latency of API calls.",
+            f"# TYPE {ns}_request_duration_seconds histogram",
+        ]
+        for endpoint, statuses in sorted(snap["latency"].items()):
+            for status, data in sorted(statuses.items()):
+                for bound, count in data["buckets"].items():
+                    le = bound if bound == "+Inf" else _number(bound)
+                    labels = _labels(endpoint=endpoint, status=status, le=le)
+                    lines.append(f"{ns}_request_duration_seconds_bucket{labels} {count}")
+                labels = _labels(endpoint=endpoint, status=status)
+                lines.append(f"{ns}_request_duration_seconds_sum{labels} {_number(data['sum'])}")
+                lines.append(f"{ns}_request_duration_seconds_count{labels} {data['count']}")
+
+        for name, help_text, key in (
+            ("request_bytes_total", "Request body bytes sent.", "request_bytes"),
+            ("response_bytes_total", "Response body bytes received.", "response_bytes"),
+            ("retries_total", "Retried API calls.", "retries"),
+        ):
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for endpoint, value in sorted(snap[key].items()):
+                lines.append(f"{ns}_{name}{_labels(endpoint=endpoint)} {value}")
+
+        lines.append(f"# HELP {ns}_errors_total Exceptions raised by API calls.")
+        lines.append(f"# TYPE {ns}_errors_total counter")
+        for endpoint, classes in sorted(snap["errors"].items()):
+            for error, count in sorted(classes.items()):
+                lines.append(f"{ns}_errors_total{_labels(endpoint=endpoint, error=error)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def body_size(body: Any) -> Optional[int]:
+    """Return the byte size of a prepared request body, if it can be known cheaply."""
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        return None
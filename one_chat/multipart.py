@@ -0,0 +1,126 @@
+# one_chat/multipart.py
+
+import mmap
+import os
+import uuid
+from typing import Callable, Dict, Iterator, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _quote(value: str) -> str:
+    """Escape a multipart header parameter the way browsers (and urllib3) do."""
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartEncoder:
+    """Stream a multipart/form-data body with one file part.
+
+    The form fields and part headers are encoded up front (a few hundred
+    bytes); the file itself is read lazily in `chunk_size` pieces while the
+    body is being sent, so memory use does not grow with the file size. With
+    `use_mmap` the file is memory-mapped and sliced straight from the page
+    cache instead of going through buffered ``read()`` calls.
+
+    When the file's bytes are already in memory (see
+    :class:`~one_chat.upload_cache.UploadCache`), pass them as `content` and
+    the body is sliced from them without touching the disk.
+
+    The encoder has a length, so requests sends it with a Content-Length
+    header rather than chunked encoding, and it can be iterated again (for
+    retries); each iteration re-opens the file unless `content` was given.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_field: str,
+        file_path: str,
+        filename: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        boundary: Optional[str] = None,
+        content: Optional[bytes] = None,
+    ):
+        """Prepare the body; raises OSError if `file_path` cannot be stat'ed.
+
+        Parameters:
+        - fields: Plain form fields, sent before the file.
+        - file_field: Form field name of the file part.
+        - file_path: Path of the file to stream.
+        - filename: Filename reported to the server (defaults to `file_path`).
+        - chunk_size: Bytes read (or sliced) per chunk.
+        - use_mmap: Memory-map the file instead of reading it.
+        - progress: Called as ``progress(bytes_sent, total_bytes)`` after
+          every chunk handed to the socket.
+        - boundary: Multipart boundary (random by default).
+        - content: The file's bytes, if already loaded; `file_path` is then
+          only used as the reported filename.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.fields = fields
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.progress = progress
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.content = content
+        self.file_size = len(content) if content is not None else os.path.getsize(file_path)
+
+        delimiter = f"--{self.boundary}\r\n"
+        parts = [
+            f'{delimiter}Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ]
+        parts.append(
+            f"{delimiter}Content-Disposition: form-data; "
+            f'name="{_quote(file_field)}"; filename="{_quote(filename or file_path)}"\r\n\r\n'
+        )
+        self._head = "".join(parts).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+    def __len__(self) -> int:
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def _file_chunks(self) -> Iterator[bytes]:
+        if self.content is not None:
+            for offset in range(0, self.file_size, self.chunk_size):
+                yield self.content[offset : offset + self.chunk_size]
+            return
+        with open(self.file_path, "rb") as file:
+            if self.use_mmap and self.file_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, self.file_size, self.chunk_size):
+                        yield mapped[offset : offset + self.chunk_size]
+            else:
+                while True:
+                    chunk = file.read(self.chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        total = len(self)
+        sent = 0
+        yield self._head
+        sent += len(self._head)
+        if self.progress is not None:
+            self.progress(sent, total)
+        for chunk in self._file_chunks():
+            yield chunk
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress(sent, total)
+        yield self._tail
+        sent += len(self._tail)
+        if self.progress is not None:
+            self.progress(sent, total)
+
+    def read_all(self) -> bytes:
+        """Return the whole body as bytes (for tests and small files)."""
+        return b"".join(self)
@@ -1,13 +1,101 @@
-from typing import List, Optional
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
 
 # one_chat/one_chat.py
-from .broadcast_sender import BroadcastSender
-from .get_friends_and_groups import FriendAndGroupManager
-from .image_carousel_sender import ImageCarouselSender
-from .location_sender import LocationSender
-from .message_sender import MessageSender
-from .quickreply_sender import QuickReplySender
-from .sticker_sender import StickerSender
+from .bulk import DEFAULT_BULK_WORKERS, imap_bounded
+from .circuit_breaker import CircuitBreakerRegistry
+from .codec import JSONCodec
+from .hooks import Hooks
+from .idempotency import SendDeduplicator
+from .metrics import Metrics
+from .multipart import DEFAULT_CHUNK_SIZE, ProgressCallback
+from .prepared import PreparedMessage, post_prepared, prepare_message
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .transport import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    Transport,
+)
+from .upload_cache import UploadCache
+
+if TYPE_CHECKING:
+    from .broadcast_sender import BroadcastSender
+    from .directory import Directory
+    from .get_friends_and_groups import FriendAndGroupManager
+    from .image_carousel_sender import ImageCarouselSender
+    from .location_sender import LocationSender
+    from .message_sender import MessageSender
+    from .quickreply_sender import QuickReplySender
+    from .sticker_sender import StickerSender
+
+T = TypeVar("T")
+
+DEFAULT_SEND_WORKERS = 8
+
+# Facade methods that take (to, bot_id, ...) and can be fanned out by send_many.
+PER_RECIPIENT_METHODS = (
+    "send_message",
+    "send_template",
+    "send_file",
+    "send_webview",
+    "send_location",
+    "send_sticker",
+    "send_quickreply",
+    "send_image_carousel",
+)
+
+# Sender attribute handling each method a PreparedMessage can be built for.
+PREPARED_SENDERS = {
+    "send_message": "message_sender",
+    "send_template": "message_sender",
+    "send_sticker": "message_sender",
+    "send_quickreply": "quick_reply_sender",
+    "send_image_carousel": "image_carousel_sender",
+}
+
+
+class _lazy(Generic[T]):
+    """Build a facade component on first access and cache it on the instance.
+
+    A non-data descriptor: once the value is stored in the instance
+    ``__dict__`` it shadows the descriptor, so later reads are plain
+    attribute lookups. The first build runs under the instance's lock so
+    concurrent first calls share one component.
+    """
+
+    def __init__(self, build: Callable[[Any], T]):
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> "_lazy[T]": ...
+
+    @overload
+    def __get__(self, instance: object, owner: type) -> T: ...
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        with instance._lazy_lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.build(instance)
+            return instance.__dict__[self.name]
 
 
 class OneChat:
@@ -18,20 +106,188 @@ class OneChat:
     replies, image carousels, broadcasting messages, and listing friends/groups.
     """
 
-    def __init__(self, authorization_token: str):
+    def __init__(
+        self,
+        authorization_token: str,
+        transport: Optional[Transport] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        friends_cache_ttl: Optional[float] = None,
+        friends_cache_stale_ttl: float = 0.0,
+        upload_cache_bytes: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+        hooks: Optional[Hooks] = None,
+        json_codec: Union[None, str, JSONCodec] = None,
+        deduplicator: Optional[SendDeduplicator] = None,
+    ):
         """Initialize a OneChat client.
 
+        All senders share one pooled :class:`Transport`, so consecutive calls
+        reuse keep-alive connections to the API. Each sender is created (and
+        its module imported) on first use.
+
         Parameters:
         - authorization_token: The Bearer token (with or without the
           leading "Bearer ").
+        - transport: Optional pre-built transport to share; when given, the
+          pool arguments below are ignored, and passing any of
+          `rate_limiter`, `retry_policy`, `circuit_breakers`, `metrics`,
+          `hooks`, `json_codec` or `deduplicator` raises ``ValueError``
+          (configure them on the transport instead).
+        - pool_connections: Number of per-host connection pools to cache.
+        - pool_maxsize: Maximum keep-alive connections kept per host.
+        - idle_timeout: Seconds before an idle pooled connection is evicted
+          (``None`` keeps idle connections indefinitely).
+        - rate_limiter: Optional :class:`RateLimiter` pacing requests per
+          (bot_id, endpoint); disabled by default.
+        - retry_policy: Optional :class:`RetryPolicy` shared by all senders;
+          without one each call is attempted exactly once. The message
+          endpoints are not idempotent, so retries are opt-in.
+        - circuit_breakers: Optional :class:`CircuitBreakerRegistry` giving
+          each endpoint a breaker that fails fast during outages.
+        - friends_cache_ttl: Seconds to cache friend/group lists per bot_id;
+          ``None`` (default) always fetches.
+        - friends_cache_stale_ttl: Seconds past the TTL during which a stale
+          list is served while refreshing in the background.
+        - upload_cache_bytes: Size of the :class:`UploadCache` used by
+          ``send_file``; ``None`` (default) reads the file on every send.
+        - metrics: Optional :class:`Metrics` collecting per-endpoint latency
+          histograms, byte counts, errors and retries.
+        - hooks: Optional :class:`Hooks` receiving request lifecycle events
+          (start, connection acquired, headers sent, response, JSON, error).
+        - json_codec: :class:`JSONCodec` or "orjson"/"json" for request and
+          response bodies; defaults to orjson when installed.
+        - deduplicator: Optional :class:`SendDeduplicator` dropping a send
+          identical (same endpoint, bot_id, recipient(s) and payload) to one
+          accepted within its window, or sharing its ``idempotency_key=``; it
+          returns a "duplicate" result instead.
         """
-        self.message_sender = MessageSender(authorization_token)
-        self.broadcast_sender = BroadcastSender(authorization_token)
-        self.location_sender = LocationSender(authorization_token)
-        self.sticker_sender = StickerSender(authorization_token)
-        self.quick_reply_sender = QuickReplySender(authorization_token)
-        self.image_carousel_sender = ImageCarouselSender(authorization_token)
-        self.friends_and_groups = FriendAndGroupManager(authorization_token)
+        if transport is not None:
+            transport_options = {
+                "rate_limiter": rate_limiter,
+                "retry_policy": retry_policy,
+                "circuit_breakers": circuit_breakers,
+                "metrics": metrics,
+                "hooks": hooks,
+                "json_codec": json_codec,
+                "deduplicator": deduplicator,
+            }
+            given = sorted(name for name, value in transport_options.items() if value is not None)
+            if given:
+                raise ValueError(
+                    f"{', '.join(given)} cannot be combined with transport=; "
+                    "configure them on the transport instead."
+                )
+        self.transport = transport or Transport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            idle_timeout=idle_timeout,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            circuit_breakers=circuit_breakers,
+            metrics=metrics,
+            hooks=hooks,
+            json_codec=json_codec,
+            deduplicator=deduplicator,
+        )
+        self.upload_cache = (
+            UploadCache(upload_cache_bytes) if upload_cache_bytes is not None else None
+        )
+        self._authorization_token = authorization_token
+        self._friends_cache_ttl = friends_cache_ttl
+        self._friends_cache_stale_ttl = friends_cache_stale_ttl
+        self._lazy_lock = threading.Lock()
+
+    @_lazy
+    def message_sender(self) -> "MessageSender":
+        from .message_sender import MessageSender
+
+        return MessageSender(
+            self._authorization_token, self.transport, upload_cache=self.upload_cache
+        )
+
+    @_lazy
+    def broadcast_sender(self) -> "BroadcastSender":
+        from .broadcast_sender import BroadcastSender
+
+        return BroadcastSender(self._authorization_token, self.transport)
+
+    @_lazy
+    def location_sender(self) -> "LocationSender":
+        from .location_sender import LocationSender
+
+        return LocationSender(self._authorization_token, self.transport)
+
+    @_lazy
+    def sticker_sender(self) -> "StickerSender":
+        from .sticker_sender import StickerSender
+
+        return StickerSender(self._authorization_token, self.transport)
+
+    @_lazy
+    def quick_reply_sender(self) -> "QuickReplySender":
+        from .quickreply_sender import QuickReplySender
+
+        return QuickReplySender(self._authorization_token, self.transport)
+
+    @_lazy
+    def image_carousel_sender(self) -> "ImageCarouselSender":
+        from .image_carousel_sender import ImageCarouselSender
+
+        return ImageCarouselSender(self._authorization_token, self.transport)
+
+    @_lazy
+    def friends_and_groups(self) -> "FriendAndGroupManager":
+        from .get_friends_and_groups import FriendAndGroupManager
+
+        return FriendAndGroupManager(
+            self._authorization_token,
+            self.transport,
+            cache_ttl=self._friends_cache_ttl,
+            stale_ttl=self._friends_cache_stale_ttl,
+        )
+
+    def pool_stats(self) -> dict:
+        """Return connection pool reuse counters from the shared transport."""
+        return self.transport.pool_stats()
+
+    def rate_limit_stats(self) -> dict:
+        """Return rate limiter wait statistics, or an empty dict when disabled."""
+        if self.transport.rate_limiter is None:
+            return {}
+        return self.transport.rate_limiter.stats()
+
+    def retry_stats(self) -> dict:
+        """Return retry counters from the shared retry policy, if any."""
+        if self.transport.retry_policy is None:
+            return {}
+        return self.transport.retry_policy.stats()
+
+    def circuit_states(self) -> dict:
+        """Return per-endpoint circuit breaker snapshots, if breakers are enabled."""
+        if self.transport.circuit_breakers is None:
+            return {}
+        return self.transport.circuit_breakers.states()
+
+    def dedupe_stats(self) -> dict:
+        """Return duplicate suppression counters, or an empty dict when disabled."""
+        if self.transport.deduplicator is None:
+            return {}
+        return self.transport.deduplicator.stats()
+
+    def metrics_snapshot(self) -> dict:
+        """Return request metrics from the shared transport, or an empty dict when disabled."""
+        if self.transport.metrics is None:
+            return {}
+        return self.transport.metrics.snapshot()
+
+    def close(self) -> None:
+        """Close pooled connections held by the shared transport."""
+        self.transport.close()
 
     def send_message(
         self,
@@ -39,6 +295,7 @@ class OneChat:
         bot_id: str,
         message: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a plain text message to a user.
 
@@ -47,8 +304,13 @@ class OneChat:
         - bot_id: Bot ID performing the send.
         - message: Text content to send.
         - custom_notification: Optional custom notification text.
+        - idempotency_key: Optional caller key identifying this send to the
+          deduplicator in place of the encoded body; every ``send_*`` and
+          ``broadcast_message`` call accepts it.
         """
-        return self.message_sender.send_message(to, bot_id, message, custom_notification)
+        return self.message_sender.send_message(
+            to, bot_id, message, custom_notification, idempotency_key
+        )
 
     def send_template(
         self,
@@ -56,12 +318,15 @@ class OneChat:
         bot_id: str,
         template: Optional[list],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a template message (elements payload).
 
         Parameters mirror :meth:`MessageSender.send_template`.
         """
-        return self.message_sender.send_template(to, bot_id, template, custom_notification)
+        return self.message_sender.send_template(
+            to, bot_id, template, custom_notification, idempotency_key
+        )
 
     def send_file(
         self,
@@ -69,25 +334,64 @@ class OneChat:
         bot_id: str,
         file_path: Optional[str],
         custom_notification: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        idempotency_key: Optional[str] = None,
     ):
-        """Upload and send a file to a user.
+        """Upload and send a file to a user, streaming it from disk.
 
         Parameters mirror :meth:`MessageSender.send_file`.
         """
-        return self.message_sender.send_file(to, bot_id, file_path, custom_notification)
+        return self.message_sender.send_file(
+            to,
+            bot_id,
+            file_path,
+            custom_notification,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+            progress=progress,
+            idempotency_key=idempotency_key,
+        )
 
     def send_webview(
-        self, to: str, bot_id: str, url: Optional[str], custom_notification: Optional[str] = None
+        self,
+        to: str,
+        bot_id: str,
+        url: Optional[str],
+        custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a webview (URL) message after basic protocol validation."""
-        return self.message_sender.send_webview(to, bot_id, url, custom_notification)
+        return self.message_sender.send_webview(
+            to, bot_id, url, custom_notification, idempotency_key
+        )
 
-    def broadcast_message(self, bot_id: str, to: List[str], message: Optional[str]):
+    def broadcast_message(
+        self,
+        bot_id: str,
+        to: List[str],
+        message: Optional[str],
+        idempotency_key: Optional[str] = None,
+    ):
         """Broadcast a message to up to 100 recipients.
 
         Parameters mirror :meth:`BroadcastSender.broadcast_message`.
         """
-        return self.broadcast_sender.broadcast_message(bot_id, to, message)
+        return self.broadcast_sender.broadcast_message(bot_id, to, message, idempotency_key)
+
+    def broadcast_bulk(
+        self,
+        bot_id: str,
+        to: Iterable[str],
+        message: Optional[str],
+        max_workers: int = DEFAULT_BULK_WORKERS,
+    ):
+        """Broadcast a message to any number of recipients in parallel 100-ID chunks.
+
+        Parameters mirror :meth:`BroadcastSender.broadcast_bulk`.
+        """
+        return self.broadcast_sender.broadcast_bulk(bot_id, to, message, max_workers)
 
     def send_location(
         self,
@@ -97,10 +401,11 @@ class OneChat:
         longitude: Optional[str],
         address: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a location payload with coordinates and address."""
         return self.location_sender.send_location(
-            to, bot_id, latitude, longitude, address, custom_notification
+            to, bot_id, latitude, longitude, address, custom_notification, idempotency_key
         )
 
     def send_sticker(
@@ -109,9 +414,12 @@ class OneChat:
         bot_id: str,
         sticker_id: Optional[str],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a sticker by sticker ID."""
-        return self.sticker_sender.send_sticker(to, bot_id, sticker_id, custom_notification)
+        return self.sticker_sender.send_sticker(
+            to, bot_id, sticker_id, custom_notification, idempotency_key
+        )
 
     def send_quickreply(
         self,
@@ -120,10 +428,11 @@ class OneChat:
         message: Optional[str],
         quick_reply: Optional[list],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send a message with quick reply buttons."""
         return self.quick_reply_sender.send_quickreply(
-            to, bot_id, message, quick_reply, custom_notification
+            to, bot_id, message, quick_reply, custom_notification, idempotency_key
         )
 
     def send_image_carousel(
@@ -132,16 +441,107 @@ class OneChat:
         bot_id: str,
         elements: Optional[list],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
         """Send an image carousel composed of provided elements."""
         return self.image_carousel_sender.send_image_carousel(
-            to, bot_id, elements, custom_notification
+            to, bot_id, elements, custom_notification, idempotency_key
         )
 
+    def send_many(
+        self,
+        method: str,
+        recipients: Iterable[str],
+        bot_id: str,
+        *args: Any,
+        max_workers: int = DEFAULT_SEND_WORKERS,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[str, dict]]:
+        """Send the same payload to many recipients concurrently.
+
+        `method` names a per-recipient facade method (e.g. "send_template" or
+        "send_sticker"); `args`/`kwargs` are its arguments after `to` and
+        `bot_id`. Sends run on up to `max_workers` threads sharing the pooled
+        transport, and ``(recipient, response)`` pairs are yielded as each
+        send completes, so results stream back in completion order.
+
+        Example::
+
+            for to, resp in client.send_many("send_sticker", ids, bot_id, "STK1"):
+                ...
+        """
+        if method not in PER_RECIPIENT_METHODS:
+            raise ValueError(
+                f"send_many does not support {method!r}; use one of "
+                f"{', '.join(PER_RECIPIENT_METHODS)}."
+            )
+        if "idempotency_key" in kwargs:
+            raise ValueError("send_many cannot share one idempotency_key across recipients.")
+        send = getattr(self, method)
+
+        def call(to: str) -> dict:
+            return send(to, bot_id, *args, **kwargs)
+
+        return imap_bounded(call, recipients, max_workers)
+
+    def prepare(self, method: str, bot_id: str, *args: Any, **kwargs: Any) -> PreparedMessage:
+        """Validate and serialize a payload once for sending to many recipients.
+
+        `method` is one of "send_message", "send_template", "send_sticker",
+        "send_quickreply" or "send_image_carousel"; `args`/`kwargs` are its
+        arguments after `to` and `bot_id` (without `custom_notification`).
+        Raises ``ValueError`` for an unsupported method or an empty
+        template, quick reply or element list.
+
+        Example::
+
+            carousel = client.prepare("send_image_carousel", bot_id, elements)
+            for to in recipients:
+                client.send_prepared(carousel, to)
+        """
+        return prepare_message(method, bot_id, self.transport.json_codec, *args, **kwargs)
+
+    def send_prepared(
+        self, prepared: PreparedMessage, to: str, custom_notification: Optional[str] = None
+    ) -> dict:
+        """Send a :class:`PreparedMessage` to `to`; returns what the send method would."""
+        sender = getattr(self, PREPARED_SENDERS[prepared.method])
+        return post_prepared(sender, prepared.body(to, custom_notification), prepared.bot_id)
+
+    def send_prepared_many(
+        self,
+        prepared: PreparedMessage,
+        recipients: Iterable[str],
+        max_workers: int = DEFAULT_SEND_WORKERS,
+        custom_notification: Optional[str] = None,
+    ) -> Iterator[Tuple[str, dict]]:
+        """Send a :class:`PreparedMessage` to many recipients, like :meth:`send_many`."""
+
+        def call(to: str) -> dict:
+            return self.send_prepared(prepared, to, custom_notification)
+
+        return imap_bounded(call, recipients, max_workers)
+
     def fetch_friends_and_groups(self, bot_id: str):
         """Fetch lists of friends and groups for the given bot."""
         return self.friends_and_groups.fetch_friends_and_groups(bot_id)
 
+    def fetch_directory(self, bot_id: str) -> "Directory":
+        """Return an indexed :class:`Directory` of friends and groups for the bot."""
+        return self.friends_and_groups.fetch_directory(bot_id)
+
+    def coalesce_stats(self) -> dict:
+        """Return counters of getlistroom fetches executed vs. coalesced."""
+        return self.friends_and_groups.coalesce_stats()
+
+    def upload_cache_stats(self) -> dict:
+        """Return upload cache hit/miss counters, or an empty dict when disabled."""
+        return self.upload_cache.stats() if self.upload_cache is not None else {}
+
+    def invalidate_friends_and_groups(self, bot_id: Optional[str] = None) -> None:
+        """Drop cached friend/group lists for `bot_id` (or all bots)."""
+        self.friends_and_groups.invalidate(bot_id)
+
     def list_all_friends(self, bot_id: str):
         """Return full friend objects as provided by the API."""
         return self.friends_and_groups.list_all_friends(bot_id)
@@ -0,0 +1,342 @@
+# one_chat/outbox.py
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, cast
+
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import PER_RECIPIENT_METHODS, OneChat
+
+OUTBOX_METHODS = PER_RECIPIENT_METHODS + ("broadcast_message",)
+
+DEFAULT_OUTBOX_WORKERS = 4
+DEFAULT_OUTBOX_BATCH_SIZE = 50
+
+# First wait before retrying a journal write that failed (e.g. database is locked).
+JOURNAL_RETRY_DELAY = 0.05
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_state ON outbox (state, id);
+"""
+
+
+class Outbox:
+    """Durable queue of OneChat sends backed by a local SQLite journal.
+
+    :meth:`enqueue` records a facade call (``send_*`` or
+    ``broadcast_message``) and returns its id once the row is committed.
+    Background workers claim pending rows in batches, call the facade, and
+    mark each row delivered (the API answered ``"success"``, or the
+    client's deduplicator reported a ``"duplicate"`` already sent) or
+    failed, storing the response.
+
+    A journal serves one process at a time: the outbox holds an exclusive
+    lock on the file until :meth:`close`, and opening it elsewhere raises
+    ``RuntimeError``. Rows that were in flight when the process died are
+    therefore safe to return to pending when the outbox is reopened, so
+    delivery is at-least-once: a send that
+    completed just before a crash may be repeated, unless the client has a
+    deduplicator and the call carries an ``idempotency_key``.
+
+    The journal runs in WAL mode with ``synchronous=NORMAL`` so each enqueue
+    costs one small append rather than a full fsync.
+    """
+
+    def __init__(
+        self,
+        client: OneChat,
+        path: str,
+        workers: int = DEFAULT_OUTBOX_WORKERS,
+        batch_size: int = DEFAULT_OUTBOX_BATCH_SIZE,
+        poll_interval: float = 0.5,
+        autostart: bool = True,
+    ):
+        """Open (or create) the journal at `path` and recover unfinished items.
+
+        Parameters:
+        - client: The :class:`OneChat` facade used for delivery.
+        - path: SQLite database file.
+        - workers: Number of delivery threads.
+        - batch_size: Rows a worker claims (and acknowledges) per transaction.
+        - poll_interval: Seconds an idle worker waits before re-checking the
+          journal (enqueues wake workers immediately).
+        - autostart: Start the workers right away.
+        """
+        if workers < 1 or batch_size < 1:
+            raise ValueError("workers and batch_size must be at least 1")
+        self.client = client
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        try:
+            # Hold the file lock for the outbox's lifetime: recovery below
+            # assumes no other process is delivering from this journal.
+            self._db.execute("PRAGMA locking_mode=EXCLUSIVE")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._db.close()
+            raise RuntimeError(
+                f"Outbox journal {path!r} is in use by another process ({e})."
+            ) from e
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        # Notified by workers after each acknowledged batch; join() waits on it.
+        self._acked = threading.Condition()
+        self._journal_errors = 0
+        self.last_error: Optional[sqlite3.Error] = None
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+        with self._lock:
+            self.recovered = self._db.execute(
+                "UPDATE outbox SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT)
+            ).rowcount
+        if autostart:
+            self.start()
+
+    def enqueue(self, method: str, *args: Any, **kwargs: Any) -> int:
+        """Journal ``client.<method>(*args, **kwargs)`` and return the item id.
+
+        Arguments must be JSON-serialisable.
+        """
+        return self.enqueue_many([(method, args, kwargs)])[0]
+
+    def enqueue_many(self, calls: Iterable[Tuple[str, Sequence[Any], Dict[str, Any]]]) -> List[int]:
+        """Journal many ``(method, args, kwargs)`` calls in one transaction."""
+        now = time.time()
+        rows = []
+        for method, args, kwargs in calls:
+            if method not in OUTBOX_METHODS:
+                raise ValueError(
+                    f"Outbox does not support {method!r}; use one of {', '.join(OUTBOX_METHODS)}."
+                )
+            rows.append((method, json.dumps([list(args), kwargs]), PENDING, now))
+        ids: List[int] = []
+        with self._transaction():
+            for row in rows:
+                cursor = self._db.execute(
+                    "INSERT INTO outbox (method, payload, state, enqueued_at) VALUES (?, ?, ?, ?)",
+                    row,
+                )
+                ids.append(cast(int, cursor.lastrowid))
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return ids
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the block as one SQLite transaction under the connection lock."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._db.execute("COMMIT")
+            except BaseException:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                raise
+
+    def start(self) -> None:
+        """Start the delivery workers (no-op if already running)."""
+        if self._threads:
+            return
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"one-chat-outbox-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _claim(self) -> List[Tuple[int, str, str]]:
+        """Mark up to `batch_size` pending rows in flight and return them."""
+        with self._transaction():
+            rows = self._db.execute(
+                "SELECT id, method, payload FROM outbox WHERE state = ? ORDER BY id LIMIT ?",
+                (PENDING, self.batch_size),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE outbox SET state = ?, attempts = attempts + 1 WHERE id = ?",
+                [(IN_FLIGHT, row[0]) for row in rows],
+            )
+        return rows
+
+    def _deliver(self, method: str, payload: str) -> Tuple[str, Dict[str, Any]]:
+        args, kwargs = json.loads(payload)
+        try:
+            response = getattr(self.client, method)(*args, **kwargs)
+        except Exception as e:
+            return FAILED, {"status": "fail", "message": f"Delivery failed: {e}"}
+        if isinstance(response, dict) and response.get("status") in DELIVERED_STATUSES:
+            return DELIVERED, response
+        return FAILED, response
+
+    def _record_error(self, error: sqlite3.Error) -> None:
+        with self._acked:
+            self._journal_errors += 1
+            self.last_error = error
+
+    def _ack(self, acks: List[Tuple[str, float, str, int]]) -> None:
+        """Store delivery outcomes, retrying with backoff while the journal write fails.
+
+        Once the outbox is stopping it gives up after one failed attempt; the
+        rows stay in flight and are recovered when the outbox is reopened.
+        """
+        delay = JOURNAL_RETRY_DELAY
+        while True:
+            try:
+                with self._transaction():
+                    self._db.executemany(
+                        "UPDATE outbox SET state = ?, finished_at = ?, response = ? WHERE id = ?",
+                        acks,
+                    )
+                break
+            except sqlite3.Error as e:
+                self._record_error(e)
+                if self._stopping:
+                    return
+                time.sleep(delay)
+                delay = min(2 * delay, self.poll_interval)
+        with self._acked:
+            self._acked.notify_all()
+
+    def _work(self) -> None:
+        while not self._stopping:
+            try:
+                rows = self._claim()
+            except sqlite3.Error as e:
+                self._record_error(e)
+                rows = []
+            if not rows:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+                continue
+            acks = []
+            for item_id, method, payload in rows:
+                state, response = self._deliver(method, payload)
+                acks.append((state, time.time(), json.dumps(response, default=str), item_id))
+            self._ack(acks)
+
+    def _depth(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE state IN (?, ?)", (PENDING, IN_FLIGHT)
+            ).fetchone()[0]
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is pending or in flight; return False on timeout.
+
+        Workers wake the caller after each acknowledged batch; the queue
+        depth is also re-checked at least every `poll_interval`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._acked:
+            while self._depth():
+                wait = self.poll_interval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._acked.wait(wait)
+        return True
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the workers, first draining the queue when `drain` is True.
+
+        Items still pending stay in the journal and are delivered after the
+        outbox is reopened or restarted.
+        """
+        if drain and self._threads:
+            self.join(timeout)
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def close(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the workers and close the journal."""
+        self.stop(drain, timeout)
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def status(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Return the state, attempt count and stored response of an item."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT method, state, attempts, response FROM outbox WHERE id = ?", (item_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        method, state, attempts, response = row
+        return {
+            "method": method,
+            "state": state,
+            "attempts": attempts,
+            "response": json.loads(response) if response is not None else None,
+        }
+
+    def retry_failed(self) -> int:
+        """Return failed items to pending; returns how many were requeued."""
+        with self._lock:
+            count = self._db.execute(
+                "UPDATE outbox SET state = ?, finished_at = NULL WHERE state = ?",
+                (PENDING, FAILED),
+            ).rowcount
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return count
+
+    def purge(self) -> int:
+        """Delete delivered items from the journal; returns how many were removed."""
+        with self._lock:
+            return self._db.execute("DELETE FROM outbox WHERE state = ?", (DELIVERED,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-state counts, queue depth and lag.
+
+        ``depth`` is pending plus in-flight items and ``lag_seconds`` is the
+        age of the oldest of them (0 when the queue is empty).
+        ``journal_errors`` counts failed claim or acknowledgement writes,
+        which workers retry; the latest is kept in :attr:`last_error`.
+        """
+        with self._lock:
+            counts = dict(self._db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state"))
+            oldest = self._db.execute(
+                "SELECT MIN(enqueued_at) FROM outbox WHERE state IN (?, ?)", (PENDING, IN_FLIGHT)
+            ).fetchone()[0]
+        stats = {state: counts.get(state, 0) for state in (PENDING, IN_FLIGHT, DELIVERED, FAILED)}
+        stats["depth"] = stats[PENDING] + stats[IN_FLIGHT]
+        stats["lag_seconds"] = max(0.0, time.time() - oldest) if oldest is not None else 0.0
+        stats["journal_errors"] = self._journal_errors
+        return stats
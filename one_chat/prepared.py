@@ -0,0 +1,118 @@
+# one_chat/prepared.py
+
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .codec import JSONCodec
+from .transport import failure_result
+
+DEFAULT_TIMEOUT = (5, 15)
+
+
+def _require_list(name: str, value: Any) -> list:
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"{name} must be a non-empty list.")
+    return value
+
+
+def _message(message: Optional[str]) -> Dict[str, Any]:
+    return {"type": "text", "message": message}
+
+
+def _template(template: Optional[list]) -> Dict[str, Any]:
+    return {"type": "template", "elements": _require_list("template", template)}
+
+
+def _sticker(sticker_id: Optional[str]) -> Dict[str, Any]:
+    return {"type": "sticker", "sticker_id": sticker_id}
+
+
+def _quickreply(message: Optional[str], quick_reply: Optional[list]) -> Dict[str, Any]:
+    return {"message": message, "quick_reply": _require_list("quick_reply", quick_reply)}
+
+
+def _image_carousel(elements: Optional[list]) -> Dict[str, Any]:
+    return {"elements": _require_list("elements", elements)}
+
+
+# Builders of the per-method payload minus "to", "bot_id" and
+# "custom_notification"; their arguments mirror the facade method's.
+PAYLOAD_BUILDERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "send_message": _message,
+    "send_template": _template,
+    "send_sticker": _sticker,
+    "send_quickreply": _quickreply,
+    "send_image_carousel": _image_carousel,
+}
+
+
+class PreparedMessage:
+    """A send payload validated and serialized once, for many recipients.
+
+    The static part (bot_id and the method's content) is encoded to bytes
+    when the message is prepared. :meth:`body` then only encodes `to` (and
+    an optional `custom_notification`) and joins the pieces, so a fan-out
+    loop does no dict building or re-serialization per recipient.
+    Create one with :meth:`OneChat.prepare`.
+    """
+
+    __slots__ = ("method", "bot_id", "payload", "_codec", "_tail")
+
+    def __init__(self, method: str, bot_id: str, payload: Dict[str, Any], codec: JSONCodec):
+        """Serialize `payload` (without "to") for `method` with `codec`."""
+        if not bot_id:
+            raise ValueError("bot_id is required.")
+        self.method = method
+        self.bot_id = bot_id
+        self.payload = payload
+        self._codec = codec
+        # b',"bot_id":...}' -- the encoded object minus its opening brace.
+        self._tail = b"," + codec.dumps(dict(bot_id=bot_id, **payload))[1:]
+
+    def body(self, to: str, custom_notification: Optional[str] = None) -> bytes:
+        """Return the JSON request body for recipient `to`."""
+        dumps = self._codec.dumps
+        if custom_notification:
+            return b"".join(
+                (
+                    b'{"to":',
+                    dumps(to),
+                    b',"custom_notification":',
+                    dumps(custom_notification),
+                    self._tail,
+                )
+            )
+        return b"".join((b'{"to":', dumps(to), self._tail))
+
+    def __repr__(self) -> str:
+        return f"PreparedMessage({self.method!r}, bot_id={self.bot_id!r})"
+
+
+def prepare_message(
+    method: str, bot_id: str, codec: JSONCodec, *args: Any, **kwargs: Any
+) -> PreparedMessage:
+    """Build a :class:`PreparedMessage` for `method` from its arguments after `to`/`bot_id`."""
+    builder = PAYLOAD_BUILDERS.get(method)
+    if builder is None:
+        raise ValueError(f"Cannot prepare {method!r}; use one of {', '.join(PAYLOAD_BUILDERS)}.")
+    return PreparedMessage(method, bot_id, builder(*args, **kwargs), codec)
+
+
+def post_prepared(sender: Any, body: bytes, bot_id: str) -> dict:
+    """POST a prepared `body` through `sender`'s transport, URL and error handling."""
+    try:
+        response = sender.transport.post(
+            sender.base_url,
+            bot_id=bot_id,
+            headers=sender.headers,
+            data=body,
+            timeout=DEFAULT_TIMEOUT,
+        )
+
+        if response.status_code == 200:
+            return sender.transport.decode_json(response)
+        else:
+            return sender._handle_error(response)
+    except requests.exceptions.RequestException as e:
+        return failure_result(e)
@@ -3,17 +3,20 @@ from typing import Optional
 # one_chat/quickreply_sender.py
 import requests
 
+from .transport import Transport, failure_result
+
 DEFAULT_TIMEOUT = (5, 15)
 
 
 class QuickReplySender:
     """Send messages with quick-reply options."""
 
-    def __init__(self, authorization_token: str):
-        """Initialize with Bearer token (with/without prefix)."""
+    def __init__(self, authorization_token: str, transport: Optional[Transport] = None):
+        """Initialize with Bearer token (with/without prefix) and optional shared transport."""
         if authorization_token.startswith("Bearer "):
             authorization_token = authorization_token.replace("Bearer ", "", 1)
         self.authorization_token = authorization_token
+        self.transport = transport or Transport()
         self.base_url = "https://chat-api.one.th/message/api/v1/push_quickreply"
         self.headers = {
             "Authorization": f"Bearer {authorization_token}",
@@ -27,6 +30,7 @@ class QuickReplySender:
         message: Optional[str],
         quick_reply: Optional[list],
         custom_notification: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> dict:
         """Send a message with a set of quick-reply buttons."""
         payload = {
@@ -39,21 +43,25 @@ class QuickReplySender:
             payload["custom_notification"] = custom_notification
 
         try:
-            response = requests.post(
-                self.base_url, headers=self.headers, json=payload, timeout=DEFAULT_TIMEOUT
+            response = self.transport.post(
+                self.base_url,
+                headers=self.headers,
+                json=payload,
+                timeout=DEFAULT_TIMEOUT,
+                idempotency_key=idempotency_key,
             )
 
             if response.status_code == 200:
-                return response.json()
+                return self.transport.decode_json(response)
             else:
                 return self._handle_error(response)
         except requests.exceptions.RequestException as e:
-            return {"status": "fail", "message": f"Request failed: {str(e)}"}
+            return failure_result(e)
 
     def _handle_error(self, response: requests.Response) -> dict:
         """Normalize API error responses for consistency."""
         try:
-            error_response = response.json()
+            error_response = self.transport.decode_json(response)
             return {
                 "status": error_response.get("status", "fail"),
                 "message": error_response.get("message", "Unknown error occurred."),
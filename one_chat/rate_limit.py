@@ -0,0 +1,303 @@
+# one_chat/rate_limit.py
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+# Requests per second and burst size per endpoint (last URL path segment).
+# The API does not publish its limits; these are conservative starting points.
+DEFAULT_ENDPOINT_RATES: Dict[str, Tuple[float, int]] = {
+    "push_message": (20.0, 20),
+    "broadcast_group": (5.0, 5),
+    "push_quickreply": (20.0, 20),
+    "image-carousel": (10.0, 10),
+    "getlistroom": (2.0, 2),
+}
+DEFAULT_RATE: Tuple[float, int] = (10.0, 10)
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def endpoint_name(url: str) -> str:
+    """Return the endpoint name (last path segment) of an API URL."""
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    :meth:`reserve` always takes a token, letting the balance go negative,
+    and returns how long the caller must wait for that token to exist. Callers
+    are therefore spaced exactly ``1 / rate`` apart once the burst is spent,
+    whether they sleep in a thread or await in an event loop.
+
+    When the server throttles, the effective rate is halved and recovers
+    additively on each successful response (AIMD).
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """Create a full bucket refilling at `rate` tokens/second up to `capacity`."""
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity: float = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return the delay in seconds before using it."""
+        self._refill(now)
+        self.tokens -= 1.0
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(delay, self.blocked_until - now)
+
+    def throttle(self, now: float, retry_after: Optional[float]) -> None:
+        """React to a throttling response: drain, pause and halve the rate."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.rate = max(self.base_rate / 16, self.rate / 2)
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+        self.blocked_until = max(self.blocked_until, now + pause)
+
+    def recover(self) -> None:
+        """Additively restore the rate after a successful response."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+class RateLimiter:
+    """Client-side rate limiter with one token bucket per (bot_id, endpoint URL).
+
+    Thread-safe, and usable from asyncio through :meth:`acquire_async`.
+    Budgets are looked up by endpoint name in `rates`, falling back to
+    `default_rate`.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_rate: Tuple[float, int] = DEFAULT_RATE,
+    ):
+        """Create a limiter.
+
+        Parameters:
+        - rates: Mapping of endpoint name (e.g. "push_message") to
+          ``(requests_per_second, burst)``; merged over the defaults.
+        - default_rate: Budget for endpoints missing from `rates`.
+        """
+        self.rates = dict(DEFAULT_ENDPOINT_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.default_rate = default_rate
+        self._buckets: Dict[Tuple[Optional[str], str], TokenBucket] = {}
+        self._waits: Dict[Tuple[Optional[str], str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, bot_id: Optional[str], endpoint: str) -> Tuple[float, int]:
+        """Return the ``(requests_per_second, burst)`` budget of a bot's endpoint."""
+        return self.rates.get(endpoint, self.default_rate)
+
+    def _new_bucket(self, key: Tuple[Optional[str], str]) -> TokenBucket:
+        return TokenBucket(*self.budget(key[0], endpoint_name(key[1])))
+
+    def _bucket(self, key: Tuple[Optional[str], str]) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = self._new_bucket(key)
+            self._waits[key] = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "throttled": 0}
+        return bucket
+
+    def reserve(self, bot_id: Optional[str], url: str) -> float:
+        """Reserve a slot for one request and return the delay to wait first."""
+        key = (bot_id, url)
+        with self._lock:
+            delay = self._bucket(key).reserve(time.monotonic())
+            waits = self._waits[key]
+            waits["acquired"] += 1
+            if delay > 0:
+                waits["waited"] += 1
+                waits["wait_seconds"] += delay
+        return delay
+
+    def acquire(self, bot_id: Optional[str], url: str) -> float:
+        """Block the calling thread until a request may be sent; return the wait."""
+        delay = self.reserve(bot_id, url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, bot_id: Optional[str], url: str) -> float:
+        """Coroutine version of :meth:`acquire` that awaits instead of sleeping."""
+        import asyncio  # imported on first use so the sync client never loads it
+
+        delay = self.reserve(bot_id, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def on_response(
+        self, bot_id: Optional[str], url: str, status_code: int, retry_after: Optional[float]
+    ) -> None:
+        """Feed a response status back so throttling slows the bucket down."""
+        key = (bot_id, url)
+        with self._lock:
+            bucket = self._bucket(key)
+            if status_code in THROTTLE_STATUS_CODES:
+                bucket.throttle(time.monotonic(), retry_after)
+                self._waits[key]["throttled"] += 1
+            elif status_code < 400:
+                bucket.recover()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return wait statistics overall and per ``"bot_id endpoint"`` bucket."""
+        with self._lock:
+            buckets = {
+                f"{key[0]} {endpoint_name(key[1])}": dict(waits, rate=self._buckets[key].rate)
+                for key, waits in self._waits.items()
+            }
+        totals = {
+            name: sum(b[name] for b in buckets.values())
+            for name in ("acquired", "waited", "wait_seconds", "throttled")
+        }
+        return {**totals, "buckets": buckets}
+
+
+class _SharedField:
+    """Bucket attribute stored in a slot of a shared array."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def __get__(self, bucket: Any, owner: type) -> float:
+        return bucket._state[bucket._offset + self.index]
+
+    def __set__(self, bucket: Any, value: float) -> None:
+        bucket._state[bucket._offset + self.index] = value
+
+
+class SharedTokenBucket(TokenBucket):
+    """:class:`TokenBucket` whose state lives in a shared-memory array.
+
+    Every process mapping the same array sees one bucket. Callers must hold
+    the lock guarding the array, as :class:`SharedRateLimiter` does.
+    """
+
+    FIELDS = 6
+
+    base_rate = _SharedField(0)
+    rate = _SharedField(1)
+    capacity = _SharedField(2)
+    tokens = _SharedField(3)
+    updated = _SharedField(4)
+    blocked_until = _SharedField(5)
+
+    def __init__(self, state: Any, slot: int):
+        self._state = state
+        self._offset = slot * self.FIELDS
+
+
+# Endpoint name of the per-bot shared bucket used for endpoints without a budget.
+OTHER_ENDPOINTS = "*"
+
+
+class SharedRateLimiter(RateLimiter):
+    """:class:`RateLimiter` whose budgets are shared by several processes.
+
+    One bucket per (bot_id, endpoint with a budget), plus one per bot for any
+    other endpoint, is allocated up front in a shared-memory array guarded
+    by a process-shared lock. Processes that receive the limiter as a
+    ``Process`` or pool-initializer argument all draw from the same per-bot
+    budgets, so N workers together send at the configured rate rather than
+    N times it. Buckets rely on :func:`time.monotonic` being system-wide, as
+    it is on Linux, macOS and Windows. Wait statistics stay per process.
+    """
+
+    def __init__(
+        self,
+        bot_ids: Iterable[str],
+        rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_rate: Tuple[float, int] = DEFAULT_RATE,
+        bot_rates: Optional[Mapping[str, Dict[str, Tuple[float, int]]]] = None,
+        context: Any = None,
+    ):
+        """Create shared buckets for `bot_ids`.
+
+        Parameters:
+        - bot_ids: Bots the limiter paces; others get process-local buckets.
+        - rates, default_rate: As for :class:`RateLimiter`.
+        - bot_rates: Per-bot_id budgets merged over `rates`.
+        - context: :mod:`multiprocessing` context the worker processes are
+          started with; defaults to the global one.
+        """
+        import multiprocessing  # imported on first use so plain clients never load it
+
+        super().__init__(rates, default_rate)
+        self.bot_rates = {bot_id: dict(budgets) for bot_id, budgets in (bot_rates or {}).items()}
+        self._slots: Dict[Tuple[str, str], int] = {}
+        for bot_id in dict.fromkeys(bot_ids):
+            endpoints = dict.fromkeys([*self.rates, *self.bot_rates.get(bot_id, {})])
+            for endpoint in [*endpoints, OTHER_ENDPOINTS]:
+                self._slots[(bot_id, endpoint)] = len(self._slots)
+        context = context or multiprocessing.get_context()
+        self._state = context.RawArray("d", len(self._slots) * SharedTokenBucket.FIELDS)
+        self._lock = context.Lock()
+        now = time.monotonic()
+        for (bot_id, endpoint), slot in self._slots.items():
+            rate, capacity = self.budget(bot_id, endpoint)
+            if rate <= 0 or capacity < 1:
+                raise ValueError("rate must be positive and capacity at least 1")
+            offset = slot * SharedTokenBucket.FIELDS
+            self._state[offset : offset + SharedTokenBucket.FIELDS] = [
+                rate,
+                rate,
+                capacity,
+                capacity,
+                now,
+                0.0,
+            ]
+
+    def budget(self, bot_id: Optional[str], endpoint: str) -> Tuple[float, int]:
+        """Return the budget of a bot's endpoint, honouring `bot_rates`."""
+        budgets = self.bot_rates.get(bot_id, {}) if bot_id is not None else {}
+        return budgets.get(endpoint) or self.rates.get(endpoint, self.default_rate)
+
+    def _new_bucket(self, key: Tuple[Optional[str], str]) -> TokenBucket:
+        bot_id, url = key
+        if bot_id is not None:
+            slot = self._slots.get((bot_id, endpoint_name(url)))
+            if slot is None:
+                slot = self._slots.get((bot_id, OTHER_ENDPOINTS))
+            if slot is not None:
+                return SharedTokenBucket(self._state, slot)
+        return super()._new_bucket(key)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_buckets"] = {}
+        state["_waits"] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
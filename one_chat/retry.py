@@ -0,0 +1,143 @@
+# one_chat/retry.py
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent traffic.
+
+    Every first attempt deposits `ratio` tokens and every retry withdraws
+    one, so retries can add at most ``ratio`` extra load on top of normal
+    traffic. A trickle of `min_per_second` tokens keeps low-traffic clients
+    able to retry at all. When the budget is empty, failures are returned
+    to the caller instead of being retried, which keeps an outage from being
+    amplified by synchronized retry storms.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 50.0):
+        """Create a budget that starts with `min(10, max_tokens)` tokens."""
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = min(10.0, max_tokens)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Credit the budget for one first-attempt request."""
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """Take one retry token; return False when the budget is exhausted."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.max_tokens, self.tokens + (now - self.updated) * self.min_per_second
+            )
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class RetryPolicy:
+    """Retry policy shared by every sender of a client.
+
+    Retries connection errors, timeouts and the statuses in `retry_statuses`
+    with capped exponential backoff and full jitter. A ``Retry-After`` header
+    overrides the computed backoff. All retries draw from a
+    :class:`RetryBudget`.
+
+    Note that the message endpoints are not idempotent: retrying a read
+    timeout may deliver a message twice.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        jitter: bool = True,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUS_CODES,
+        max_retry_after: float = 60.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        """Create a retry policy.
+
+        Parameters:
+        - max_attempts: Total attempts per call, including the first
+          (``1`` disables retries).
+        - backoff_base: Backoff before the first retry, doubled per retry.
+        - backoff_max: Upper bound for a single backoff.
+        - jitter: Sleep a random duration in ``[0, backoff]`` (full jitter).
+        - retry_statuses: HTTP statuses worth retrying.
+        - max_retry_after: Give up instead of honouring a longer Retry-After.
+        - budget: Retry budget; a fresh :class:`RetryBudget` by default.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.max_retry_after = max_retry_after
+        self.budget = budget or RetryBudget()
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "budget_exhausted": 0, "gave_up": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def is_retryable_exception(self, exc: Exception) -> bool:
+        """Return True for connect errors and timeouts raised by requests."""
+        return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def backoff(self, attempt: int) -> float:
+        """Return the sleep before retrying after failed attempt number `attempt`."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    def record_request(self) -> None:
+        """Note a first attempt so the retry budget can grow with traffic."""
+        self.budget.deposit()
+
+    def next_delay(
+        self,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """Decide whether failed attempt `attempt` should be retried.
+
+        `status_code` is the HTTP status of the failed attempt, or ``None``
+        when it raised a retryable exception. Returns the delay in seconds
+        before the next attempt, or ``None`` to give up.
+        """
+        if status_code is not None and status_code not in self.retry_statuses:
+            return None
+        if attempt >= self.max_attempts or (
+            retry_after is not None and retry_after > self.max_retry_after
+        ):
+            self._count("gave_up")
+            return None
+        if not self.budget.try_withdraw():
+            self._count("budget_exhausted")
+            return None
+        self._count("retries")
+        return retry_after if retry_after is not None else self.backoff(attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counts of retries, budget exhaustions and exhausted attempts."""
+        with self._lock:
+            return dict(self._stats, budget_tokens=self.budget.tokens)
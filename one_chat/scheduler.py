@@ -0,0 +1,223 @@
+# one_chat/scheduler.py
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .idempotency import DELIVERED_STATUSES
+from .one_chat import DEFAULT_SEND_WORKERS, PER_RECIPIENT_METHODS, OneChat
+
+SendAt = Union[float, datetime]
+ResultCallback = Callable[[int, str, dict], None]
+
+
+class _Job:
+    """Method and arguments shared by every recipient of one scheduling call."""
+
+    __slots__ = ("method", "bot_id", "args", "kwargs")
+
+    def __init__(self, method: str, bot_id: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+        self.method = method
+        self.bot_id = bot_id
+        self.args = args
+        self.kwargs = kwargs
+
+
+# Heap entry: (due epoch seconds, item id, recipient, shared job).
+_Entry = Tuple[float, int, str, _Job]
+
+
+def _timestamp(send_at: SendAt) -> float:
+    return send_at.timestamp() if isinstance(send_at, datetime) else float(send_at)
+
+
+class Scheduler:
+    """Release per-recipient sends at a given time from a priority heap.
+
+    Items wait in a min-heap ordered by due time; a dispatcher thread sleeps
+    until the earliest one is due and hands it to a pool of `max_workers`
+    threads calling the :class:`OneChat` facade, so scheduled sends go
+    through the same transport, rate limiter and retry policy as direct
+    calls. At most ``2 * max_workers`` sends are in flight; the rest stay in
+    the heap.
+
+    :meth:`schedule_many` can spread a batch evenly over a window after
+    `send_at` instead of releasing it all at once. Each item costs one small
+    heap tuple and an id in the pending set (so :meth:`cancel` never scans
+    the heap); the method and arguments are shared across the batch.
+    """
+
+    def __init__(
+        self,
+        client: OneChat,
+        max_workers: int = DEFAULT_SEND_WORKERS,
+        on_result: Optional[ResultCallback] = None,
+    ):
+        """Create and start a scheduler.
+
+        Parameters:
+        - client: Facade used to send.
+        - max_workers: Threads sending due items.
+        - on_result: Called as ``on_result(item_id, recipient, response)``
+          on a worker thread after each send.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self._heap: List[_Entry] = []
+        # Ids of the items still in the heap, cancelled or not.
+        self._queued: Set[int] = set()
+        self._cancelled: Set[int] = set()
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._slots = threading.BoundedSemaphore(2 * max_workers)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="one-chat-scheduler")
+        self._stats = {"scheduled": 0, "dispatched": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        self._in_flight = 0
+        self._stopping = False
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="one-chat-scheduler", daemon=True
+        )
+        self._dispatcher.start()
+
+    def schedule(
+        self, send_at: SendAt, method: str, to: str, bot_id: str, *args: Any, **kwargs: Any
+    ) -> int:
+        """Send ``client.<method>(to, bot_id, *args, **kwargs)`` at `send_at`.
+
+        `send_at` is a datetime or a Unix timestamp; past times are sent
+        immediately. Returns the item id for :meth:`cancel`.
+        """
+        return self.schedule_many(send_at, method, [to], bot_id, *args, **kwargs)[0]
+
+    def schedule_many(
+        self,
+        send_at: SendAt,
+        method: str,
+        recipients: Iterable[str],
+        bot_id: str,
+        *args: Any,
+        spread: float = 0.0,
+        **kwargs: Any,
+    ) -> List[int]:
+        """Schedule the same send for many recipients.
+
+        With `spread` > 0 the sends are spaced evenly over
+        ``[send_at, send_at + spread)`` seconds instead of all becoming due
+        at `send_at`. Returns the item ids in recipient order.
+        """
+        if method not in PER_RECIPIENT_METHODS:
+            raise ValueError(
+                f"Scheduler does not support {method!r}; use one of "
+                f"{', '.join(PER_RECIPIENT_METHODS)}."
+            )
+        start = _timestamp(send_at)
+        recipients = list(recipients)
+        step = spread / len(recipients) if spread > 0 and recipients else 0.0
+        job = _Job(method, bot_id, args, kwargs)
+        with self._condition:
+            ids = [next(self._ids) for _ in recipients]
+            entries = [
+                (start + offset * step, item_id, to, job)
+                for offset, (item_id, to) in enumerate(zip(ids, recipients))
+            ]
+            if len(entries) > len(self._heap):  # re-heapifying is cheaper than pushing
+                self._heap.extend(entries)
+                heapq.heapify(self._heap)
+            else:
+                for entry in entries:
+                    heapq.heappush(self._heap, entry)
+            self._queued.update(ids)
+            self._stats["scheduled"] += len(ids)
+            self._condition.notify_all()
+        return ids
+
+    def cancel(self, item_id: int) -> bool:
+        """Cancel a pending item; returns False if it is unknown or already sent."""
+        with self._condition:
+            if item_id not in self._queued or item_id in self._cancelled:
+                return False
+            self._cancelled.add(item_id)
+            self._stats["cancelled"] += 1
+            return True
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.time()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+                if self._stopping:
+                    return
+                _, item_id, to, job = heapq.heappop(self._heap)
+                self._queued.discard(item_id)
+                if item_id in self._cancelled:
+                    self._cancelled.discard(item_id)
+                    continue
+                self._stats["dispatched"] += 1
+                self._in_flight += 1
+            self._slots.acquire()
+            self._executor.submit(self._send, item_id, to, job)
+
+    def _send(self, item_id: int, to: str, job: _Job) -> None:
+        try:
+            try:
+                response = getattr(self.client, job.method)(to, job.bot_id, *job.args, **job.kwargs)
+            except Exception as e:
+                response = {"status": "fail", "message": f"Scheduled send failed: {e}"}
+            outcome = "succeeded" if response.get("status") in DELIVERED_STATUSES else "failed"
+            with self._condition:
+                self._stats[outcome] += 1
+            if self.on_result is not None:
+                self.on_result(item_id, to, response)
+        finally:
+            self._slots.release()
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every scheduled item was sent; return False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._heap) == len(self._cancelled) and not self._in_flight, timeout
+            )
+
+    def pending(self) -> int:
+        """Return the number of items not yet sent (excluding cancelled ones)."""
+        with self._condition:
+            return len(self._heap) - len(self._cancelled)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return scheduling counters, the pending count and seconds until the next item."""
+        with self._condition:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["pending"] = len(self._heap) - len(self._cancelled)
+            stats["next_due_in"] = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+        return stats
+
+    def close(self, wait: bool = True) -> None:
+        """Stop dispatching; items still pending in the heap are dropped.
+
+        With `wait`, sends already handed to workers are allowed to finish.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "Scheduler":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
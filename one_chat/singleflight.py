@@ -0,0 +1,121 @@
+# one_chat/singleflight.py
+
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+# Result handed to async followers when the leader was cancelled; they retry.
+_ABANDONED = object()
+
+
+class _Call:
+    """An in-flight call that waiting threads block on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution (threads).
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        """Create an empty group with zeroed counters."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run `func` for `key`, or wait for the identical call already in flight."""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return total calls, actual executions and coalesced calls."""
+        with self._lock:
+            return dict(self._stats)
+
+
+class AsyncSingleFlight:
+    """asyncio version of :class:`SingleFlight` for coroutines on one event loop."""
+
+    def __init__(self) -> None:
+        """Create an empty group with zeroed counters."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await `func()` for `key`, or share the result of the call in flight.
+
+        Cancelling the caller running `func()` does not cancel the callers
+        waiting on it: they are woken and one of them runs `func()` again.
+        """
+        import asyncio  # imported on first use so the sync client never loads it
+
+        self._stats["calls"] += 1
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self._stats["coalesced"] += 1
+            result = await asyncio.shield(future)
+            if result is not _ABANDONED:
+                return result
+            self._stats["coalesced"] -= 1  # the leader was cancelled; lead or join again
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self._stats["executions"] += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return total calls, actual executions and coalesced calls."""
+        return dict(self._stats)
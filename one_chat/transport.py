@@ -0,0 +1,522 @@
+# one_chat/transport.py
+
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from .circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from .codec import JSONCodec, get_codec
+from .hooks import (
+    CONNECTION_ACQUIRED,
+    ERROR,
+    HEADERS_SENT,
+    JSON_DECODED,
+    RESPONSE_RECEIVED,
+    Hooks,
+    RequestContext,
+    current_context,
+    set_current_context,
+)
+from .idempotency import DUPLICATE, DuplicateSendError, SendDeduplicator, request_key
+from .metrics import ERROR_STATUS, Metrics, body_size
+from .rate_limit import RateLimiter, endpoint_name, parse_retry_after
+from .retry import RetryPolicy
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+
+class PoolStats:
+    """Thread-safe counters describing how well pooled connections are reused.
+
+    A *hit* is a request served on an already-open keep-alive connection, a
+    *miss* is a request that had to open a new TCP/TLS connection, and an
+    *eviction* is a pooled connection closed because it sat idle too long.
+    """
+
+    def __init__(self):
+        """Create zeroed counters."""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record_checkout(self, reused: bool) -> None:
+        """Record a connection checkout as a hit (`reused`) or a miss."""
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_eviction(self) -> None:
+        """Record an idle connection being closed before reuse."""
+        with self._lock:
+            self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a consistent copy of the counters plus the hit ratio."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
+def request_bot_id(kwargs: Dict[str, Any]) -> Optional[str]:
+    """Return the bot_id carried by a request's JSON or form payload, if any."""
+    for name in ("json", "data"):
+        payload = kwargs.get(name)
+        payload = getattr(payload, "fields", payload)
+        if isinstance(payload, dict) and payload.get("bot_id"):
+            return payload["bot_id"]
+    return None
+
+
+def failure_result(error: requests.exceptions.RequestException) -> Dict[str, Any]:
+    """Normalize a request exception to the senders' error result.
+
+    A send suppressed by the deduplicator gets status "duplicate" rather
+    than "fail", since its message was already delivered.
+    """
+    if isinstance(error, DuplicateSendError):
+        return {"status": DUPLICATE, "message": str(error)}
+    return {"status": "fail", "message": f"Request failed: {str(error)}"}
+
+
+def _encode_json(kwargs: Dict[str, Any], codec: JSONCodec) -> Dict[str, Any]:
+    """Replace a ``json=`` payload with a body pre-encoded by `codec`.
+
+    The bytes are built once and reused as-is by every retry attempt. A
+    payload the codec cannot encode raises
+    ``requests.exceptions.InvalidJSONError``, as requests itself does.
+    """
+    payload = kwargs.pop("json")
+    try:
+        kwargs["data"] = codec.dumps(payload)
+    except (TypeError, ValueError) as e:
+        raise requests.exceptions.InvalidJSONError(e) from e
+    headers = kwargs.get("headers")
+    if headers is None or "Content-Type" not in headers:
+        kwargs["headers"] = dict(headers or {}, **{"Content-Type": "application/json"})
+    return kwargs
+
+
+def _rewind_files(kwargs: Dict[str, Any]) -> None:
+    """Seek multipart file objects back to the start before a retry."""
+    for value in (kwargs.get("files") or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
+def _checkout(pool: Any, conn: Any) -> Any:
+    """Evict `conn` if it idled past the pool limit, then record hit/miss."""
+    idle_timeout = pool.idle_timeout
+    if conn.sock is not None and idle_timeout is not None:
+        released_at = getattr(conn, "_one_chat_released_at", None)
+        if released_at is not None and time.monotonic() - released_at > idle_timeout:
+            conn.close()
+            if pool.stats is not None:
+                pool.stats.record_eviction()
+    if pool.stats is not None:
+        pool.stats.record_checkout(reused=conn.sock is not None)
+    context = current_context()
+    if context is not None:
+        context.emit(CONNECTION_ACQUIRED, reused=conn.sock is not None)
+    return conn
+
+
+def _mark_released(conn: Any) -> None:
+    """Stamp the time a connection went back to the pool."""
+    if conn is not None:
+        conn._one_chat_released_at = time.monotonic()
+
+
+class _HookedHTTPConnection(HTTPConnection):
+    """HTTP connection that reports ``headers_sent`` for the current attempt."""
+
+    def endheaders(self, *args: Any, **kwargs: Any) -> None:
+        super().endheaders(*args, **kwargs)
+        context = current_context()
+        if context is not None:
+            context.emit(HEADERS_SENT)
+
+
+class _HookedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that reports ``headers_sent`` for the current attempt."""
+
+    def endheaders(self, *args: Any, **kwargs: Any) -> None:
+        super().endheaders(*args, **kwargs)
+        context = current_context()
+        if context is not None:
+            context.emit(HEADERS_SENT)
+
+
+class _AccountingHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP pool that reports reuse statistics and evicts idle connections."""
+
+    ConnectionCls = _HookedHTTPConnection
+    stats: Optional[PoolStats] = None
+    idle_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout: Optional[float] = None) -> Any:
+        return _checkout(self, super()._get_conn(timeout))
+
+    def _put_conn(self, conn: Any) -> None:
+        _mark_released(conn)
+        super()._put_conn(conn)
+
+
+class _AccountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS pool that reports reuse statistics and evicts idle connections."""
+
+    ConnectionCls = _HookedHTTPSConnection
+    stats: Optional[PoolStats] = None
+    idle_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout: Optional[float] = None) -> Any:
+        return _checkout(self, super()._get_conn(timeout))
+
+    def _put_conn(self, conn: Any) -> None:
+        _mark_released(conn)
+        super()._put_conn(conn)
+
+
+class _AccountingPoolManager(PoolManager):
+    """PoolManager that builds accounting pools wired to shared stats."""
+
+    def __init__(self, *args: Any, stats: PoolStats, idle_timeout: Optional[float], **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.idle_timeout = idle_timeout
+        self.pool_classes_by_scheme = {
+            "http": _AccountingHTTPConnectionPool,
+            "https": _AccountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        request_context: Optional[Dict[str, Any]] = None,
+    ) -> HTTPConnectionPool:
+        pool = super()._new_pool(scheme, host, port, request_context)
+        if isinstance(pool, (_AccountingHTTPConnectionPool, _AccountingHTTPSConnectionPool)):
+            pool.stats = self.stats
+            pool.idle_timeout = self.idle_timeout
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """requests adapter whose connection pools feed a :class:`PoolStats`."""
+
+    def __init__(
+        self,
+        stats: PoolStats,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+    ):
+        """Create the adapter; arguments mirror :class:`requests.adapters.HTTPAdapter`."""
+        # Set before super().__init__, which calls init_poolmanager().
+        self.stats = stats
+        self.idle_timeout = idle_timeout
+        super().__init__(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block
+        )
+
+    def init_poolmanager(
+        self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any
+    ) -> None:
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _AccountingPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            stats=self.stats,
+            idle_timeout=self.idle_timeout,
+            **pool_kwargs,
+        )
+
+
+class Transport:
+    """Shared HTTP transport backed by a keep-alive connection pool.
+
+    A single instance is shared by every sender of a :class:`OneChat` client so
+    calls reuse TCP/TLS connections to chat-api.one.th instead of paying a new
+    handshake per request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        pool_block: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        metrics: Optional[Metrics] = None,
+        hooks: Optional[Hooks] = None,
+        json_codec: Union[None, str, JSONCodec] = None,
+        deduplicator: Optional[SendDeduplicator] = None,
+    ):
+        """Create a pooled transport.
+
+        Parameters:
+        - pool_connections: Number of per-host pools to keep cached.
+        - pool_maxsize: Maximum keep-alive connections kept per host.
+        - idle_timeout: Seconds a pooled connection may sit idle before it is
+          closed instead of reused; ``None`` disables idle eviction.
+        - pool_block: Block when all `pool_maxsize` connections are busy
+          instead of opening extra, non-pooled ones.
+        - rate_limiter: Optional :class:`RateLimiter` consulted before every
+          request, keyed by the payload's bot_id and the endpoint URL.
+        - retry_policy: Optional :class:`RetryPolicy`; without one every call
+          is attempted exactly once.
+        - circuit_breakers: Optional :class:`CircuitBreakerRegistry`; calls to
+          an endpoint whose circuit is open fail fast with
+          :class:`CircuitOpenError`.
+        - metrics: Optional :class:`Metrics` recording latency, bytes, errors
+          and retries per endpoint; without one nothing is timed.
+        - hooks: Optional :class:`Hooks` receiving request lifecycle events.
+        - json_codec: :class:`JSONCodec` (or "orjson"/"json") used to encode
+          ``json=`` payloads and decode responses; by default orjson when it
+          is installed, else the stdlib.
+        - deduplicator: Optional :class:`SendDeduplicator`; a send whose
+          idempotency key was accepted within its window fails fast with
+          :class:`DuplicateSendError` instead of reaching the network.
+        """
+        self.json_codec = get_codec(json_codec)
+        self.deduplicator = deduplicator
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breakers = circuit_breakers
+        self.metrics = metrics
+        self.hooks = hooks
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            self.stats,
+            idle_timeout=idle_timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(
+        self,
+        url: str,
+        bot_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Issue a POST through the pooled session; kwargs go to requests.
+
+        `bot_id` keys the rate limiter and hooks; it defaults to the one in
+        the ``json``/``data`` payload, so only pre-encoded bodies need it.
+
+        When a rate limiter is configured each attempt first waits for a token
+        for its (bot_id, url) bucket, and the response status is fed back so
+        server throttling slows the bucket down. When a retry policy is
+        configured, retryable exceptions and statuses are retried with
+        backoff; the last response is returned, or the last exception raised.
+
+        With a deduplicator, each call is checked once (not per attempt)
+        and its key is committed only when the API answers 200. The key is
+        derived from `idempotency_key` when given, else from the encoded
+        body; calls with neither (multipart uploads) are not deduplicated.
+        """
+        if bot_id is None:
+            bot_id = request_bot_id(kwargs)
+        if kwargs.get("json") is not None:
+            kwargs = _encode_json(kwargs, self.json_codec)
+        deduplicator = self.deduplicator
+        body = kwargs.get("data")
+        key = None
+        if deduplicator is not None:
+            key = request_key(url, body, idempotency_key)
+        if deduplicator is None or key is None:
+            return self._post_attempts(url, bot_id, kwargs)
+        if not deduplicator.begin(key):
+            error = DuplicateSendError(
+                f"Duplicate send to '{endpoint_name(url)}' suppressed (key {key.hex()})."
+            )
+            if self.metrics is not None:
+                self.metrics.record_error(endpoint_name(url), error)
+            if self.hooks is not None:
+                self.hooks.start(self.hooks.new_request_id(), 1, url, bot_id).emit(
+                    ERROR, error=error
+                )
+            raise error
+        try:
+            response = self._post_attempts(url, bot_id, kwargs)
+            if response.status_code == 200:
+                deduplicator.commit(key)
+            return response
+        finally:
+            deduplicator.release(key)
+
+    def _post_attempts(
+        self, url: str, bot_id: Optional[str], kwargs: Dict[str, Any]
+    ) -> requests.Response:
+        """Send `kwargs` to `url`, retrying as the retry policy allows."""
+        policy = self.retry_policy
+        if policy is not None:
+            policy.record_request()
+        hooks = self.hooks
+        request_id = hooks.new_request_id() if hooks is not None else 0
+
+        attempt = 1
+        while True:
+            context = hooks.start(request_id, attempt, url, bot_id) if hooks is not None else None
+            try:
+                response = self._send(url, bot_id, kwargs, context)
+            except requests.exceptions.RequestException as exc:
+                if policy is None or not policy.is_retryable_exception(exc):
+                    raise
+                delay = policy.next_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                if policy is None or response.status_code < 400:
+                    return response
+                delay = policy.next_delay(
+                    attempt,
+                    status_code=response.status_code,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+                if delay is None:
+                    return response
+                response.close()
+
+            if self.metrics is not None:
+                self.metrics.record_retry(endpoint_name(url))
+            time.sleep(delay)
+            _rewind_files(kwargs)
+            attempt += 1
+
+    def _send(
+        self,
+        url: str,
+        bot_id: Optional[str],
+        kwargs: Dict[str, Any],
+        context: Optional[RequestContext] = None,
+    ) -> requests.Response:
+        """Send a single attempt through the circuit breaker and rate limiter."""
+        breaker = None
+        if self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.get(url)
+            if not breaker.allow():
+                error = CircuitOpenError(f"Circuit open for '{breaker.name}'; failing fast.")
+                if self.metrics is not None:
+                    self.metrics.record_error(breaker.name, error)
+                if context is not None:
+                    context.emit(ERROR, error=error)
+                raise error
+
+        # An allowed call must record an outcome or hand its half-open probe back.
+        settled = False
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(bot_id, url)
+            metrics = self.metrics
+            started = time.perf_counter() if metrics is not None else 0.0
+            if context is not None:
+                set_current_context(context)
+            try:
+                response = self.session.post(url, **kwargs)
+            except requests.exceptions.RequestException as exc:
+                if breaker is not None:
+                    breaker.record_failure(timeout=isinstance(exc, requests.exceptions.Timeout))
+                    settled = True
+                if metrics is not None:
+                    endpoint = endpoint_name(url)
+                    metrics.observe(endpoint, ERROR_STATUS, time.perf_counter() - started)
+                    metrics.record_error(endpoint, exc)
+                if context is not None:
+                    context.emit(ERROR, error=exc)
+                raise
+            finally:
+                if context is not None:
+                    set_current_context(None)
+
+            if breaker is not None:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                settled = True
+
+            if context is not None:
+                response._one_chat_context = context  # type: ignore[attr-defined]
+                context.emit(
+                    RESPONSE_RECEIVED, status=response.status_code, bytes=len(response.content)
+                )
+
+            if metrics is not None:
+                metrics.observe(
+                    endpoint_name(url),
+                    str(response.status_code),
+                    time.perf_counter() - started,
+                    request_bytes=body_size(response.request.body),
+                    response_bytes=len(response.content),
+                )
+        finally:
+            if breaker is not None and not settled:
+                breaker.release_probe()
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_response(
+                bot_id,
+                url,
+                response.status_code,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return response
+
+    def decode_json(self, response: requests.Response) -> Any:
+        """Decode the response body with the JSON codec, firing ``json_decoded`` when hooked.
+
+        The raw bytes are parsed directly, skipping requests' charset
+        detection and text decoding. Invalid JSON raises
+        ``requests.exceptions.JSONDecodeError``, as ``response.json()`` does.
+        """
+        try:
+            data = self.json_codec.loads(response.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(str(e), response.text, 0) from e
+        context = getattr(response, "_one_chat_context", None)
+        if context is not None:
+            context.emit(JSON_DECODED)
+        return data
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection reuse counters (hits, misses, evictions, hit_ratio)."""
+        return self.stats.snapshot()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,112 @@
+# one_chat/upload_cache.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .singleflight import SingleFlight
+
+DEFAULT_UPLOAD_CACHE_BYTES = 64 * 1024 * 1024
+
+# (real path, size, mtime in ns): changes whenever the file is rewritten.
+StatKey = Tuple[str, int, int]
+
+
+class UploadCache:
+    """Content-addressed, byte-bounded LRU cache of file contents for uploads.
+
+    Files are identified by path, size and modification time, so an
+    unchanged file is read and hashed only once; its bytes are stored under
+    their SHA-256 digest, so identical files at different paths share one
+    entry. Sending the same report to many recipients then builds every
+    multipart body from memory instead of re-reading the disk.
+
+    Files larger than `max_bytes` are never cached and are streamed from
+    disk as usual.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_UPLOAD_CACHE_BYTES):
+        """Create an empty cache holding at most `max_bytes` of file contents."""
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self._contents: OrderedDict[str, bytes] = OrderedDict()
+        self._digests: Dict[StatKey, str] = {}
+        self._keys_by_digest: Dict[str, Set[StatKey]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stats = {"lookups": 0, "misses": 0, "evictions": 0, "too_large": 0}
+
+    def get(self, file_path: str) -> Optional[bytes]:
+        """Return the contents of `file_path`, reading it only on a cache miss.
+
+        Returns None when the file is too large to cache. Raises OSError if
+        the file cannot be stat'ed or read.
+        """
+        stat = os.stat(file_path)
+        if stat.st_size > self.max_bytes:
+            with self._lock:
+                self._stats["too_large"] += 1
+            return None
+        key: StatKey = (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            self._stats["lookups"] += 1
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._contents.move_to_end(digest)
+                return self._contents[digest]
+        # Concurrent misses for the same file share one read.
+        return self._flight.do(key, lambda: self._load(key, file_path))
+
+    def _load(self, key: StatKey, file_path: str) -> bytes:
+        """Read and hash the file, then store it (deduplicated by digest)."""
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:  # loaded by a call that finished meanwhile
+                return self._contents[digest]
+        with open(file_path, "rb") as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self._stats["misses"] += 1
+            existing = self._contents.get(digest)
+            if existing is not None:
+                content = existing
+                self._contents.move_to_end(digest)
+            else:
+                self._contents[digest] = content
+                self._bytes += len(content)
+            self._digests[key] = digest
+            self._keys_by_digest.setdefault(digest, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._evict_oldest()
+        return content
+
+    def _evict_oldest(self) -> None:
+        """Drop the least recently used content and its stat keys (lock held)."""
+        digest, content = self._contents.popitem(last=False)
+        self._bytes -= len(content)
+        for key in self._keys_by_digest.pop(digest, ()):
+            self._digests.pop(key, None)
+        self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every cached file."""
+        with self._lock:
+            self._contents.clear()
+            self._digests.clear()
+            self._keys_by_digest.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters, entry count and cached bytes.
+
+        A miss is a disk read; every other cacheable lookup is a hit.
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._contents), bytes=self._bytes)
+        stats["hits"] = stats.pop("lookups") - stats["misses"]
+        return stats
@@ -18,6 +18,10 @@ setup(
     install_requires=[
         "requests>=2.32.2",
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+        "orjson": ["orjson>=3.6"],
+    },
     python_requires=">=3.8",
     classifiers=[
         "Programming Language :: Python :: 3.8",
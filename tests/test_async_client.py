@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from one_chat.async_client import (  # noqa: E402
+    BROADCAST_PATH,
+    GETLISTROOM_PATH,
+    MESSAGE_PATH,
+    AsyncOneChat,
+)
+from one_chat.retry import RetryPolicy  # noqa: E402
+
+
+def test_async_send_message_success(stub_server):
+    async def main():
+        async with AsyncOneChat("Bearer dummy", base_url=stub_server.url) as client:
+            return await client.send_message("U1", "B1", "hi")
+
+    assert asyncio.run(main()) == {"status": "success"}
+    path, headers, body = stub_server.received[0]
+    assert path == MESSAGE_PATH
+    assert headers["Authorization"] == "Bearer dummy"
+    assert json.loads(body) == {"to": "U1", "bot_id": "B1", "type": "text", "message": "hi"}
+
+
+def test_async_error_is_normalized(stub_server):
+    stub_server.respond(BROADCAST_PATH, status=400, json_body={"status": "x", "message": "bad"})
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url) as client:
+            return await client.broadcast_message("B1", ["U1"], "hi")
+
+    assert asyncio.run(main()) == {"status": "fail", "message": "bad"}
+
+
+def test_async_invalid_json_body_is_a_failure(stub_server):
+    stub_server.respond(MESSAGE_PATH, body=b"<html>gateway</html>")
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url) as client:
+            return await client.send_message("U1", "B1", "hi")
+
+    resp = asyncio.run(main())
+    assert resp["status"] == "fail" and resp["message"].startswith("Request failed: ")
+
+
+def test_async_validation_matches_sync_client():
+    async def main():
+        async with AsyncOneChat("dummy") as client:
+            webview = await client.send_webview("U1", "B1", url="google.com")
+            broadcast = await client.broadcast_message("B1", [f"U{i}" for i in range(101)], "hi")
+            return webview, broadcast
+
+    webview, broadcast = asyncio.run(main())
+    assert "protocol" in webview["message"].lower()
+    assert "out of range" in broadcast["message"]
+
+
+def test_async_list_helpers(stub_server):
+    stub_server.respond(
+        GETLISTROOM_PATH,
+        json_body={
+            "status": "success",
+            "list_friend": [{"one_id": "U1"}],
+            "list_group": [{"group_id": "G1"}],
+        },
+    )
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url) as client:
+            return await client.list_friend_ids("B1"), await client.list_group_ids("B1")
+
+    assert asyncio.run(main()) == (["U1"], ["G1"])
+
+
+def test_async_send_file_multipart(stub_server, tmp_path):
+    f = tmp_path / "report.txt"
+    f.write_text("hello file")
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url) as client:
+            return await client.send_file("U1", "B1", str(f))
+
+    assert asyncio.run(main()) == {"status": "success"}
+    _, headers, body = stub_server.received[0]
+    assert headers["Content-Type"].startswith("multipart/form-data")
+    assert b"hello file" in body
+
+
+def test_async_concurrency_is_limited(stub_server):
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url, max_concurrency=2) as client:
+            results = await asyncio.gather(
+                *(client.send_message(f"U{i}", "B1", "hi") for i in range(10))
+            )
+            return results, client._semaphore
+
+    results, semaphore = asyncio.run(main())
+    assert all(r == {"status": "success"} for r in results)
+    assert semaphore._value == 2
+    assert len(stub_server.received) == 10
+
+
+def test_async_connection_error_is_normalized():
+    async def main():
+        async with AsyncOneChat(
+            "dummy", base_url="http://127.0.0.1:9", retry_policy=RetryPolicy(max_attempts=1)
+        ) as client:
+            return await client.send_sticker("U1", "B1", "STK1")
+
+    resp = asyncio.run(main())
+    assert resp["status"] == "fail"
+    assert resp["message"].startswith("Request failed:")
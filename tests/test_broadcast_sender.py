@@ -13,3 +13,44 @@ def test_broadcast_limits_recipients():
     resp = bs.broadcast_message("B1", too_many, "hi")
     assert resp["status"] == "fail"
     assert "out of range" in resp["message"]
+
+
+def test_broadcast_bulk_chunks_and_dedupes(requests_mock):
+    bs = BroadcastSender("dummy")
+    req = requests_mock.post(bs.base_url, json={"status": "success"}, status_code=200)
+    recipients = [f"U{i}" for i in range(250)] + ["U0", "U1"]
+
+    resp = bs.broadcast_bulk("B1", iter(recipients), "hi", max_workers=3)
+
+    assert resp["status"] == "success"
+    assert resp["total_recipients"] == 250
+    assert [len(c["to"]) for c in resp["chunks"]] == [100, 100, 50]
+    assert resp["succeeded"] == [0, 1, 2]
+    assert resp["failed"] == []
+    sent = sorted(u for r in req.request_history for u in r.json()["to"])
+    assert sent == sorted(f"U{i}" for i in range(250))
+
+
+def test_broadcast_bulk_reports_failed_chunks(requests_mock):
+    bs = BroadcastSender("dummy")
+
+    def respond(request, context):
+        if "U150" in request.json()["to"]:
+            context.status_code = 500
+            return {"message": "boom"}
+        return {"status": "success"}
+
+    requests_mock.post(bs.base_url, json=respond)
+
+    resp = bs.broadcast_bulk("B1", [f"U{i}" for i in range(300)], "hi")
+
+    assert resp["status"] == "partial"
+    assert resp["failed"] == [1]
+    assert resp["succeeded"] == [0, 2]
+    assert resp["chunks"][1]["response"] == {"status": "fail", "message": "boom"}
+
+
+def test_broadcast_bulk_rejects_string_and_empty():
+    bs = BroadcastSender("dummy")
+    assert bs.broadcast_bulk("B1", "U1", "hi")["status"] == "fail"
+    assert bs.broadcast_bulk("B1", [], "hi")["status"] == "fail"
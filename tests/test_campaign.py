@@ -0,0 +1,116 @@
+import pytest
+
+from one_chat import Campaign, OneChat, RetryPolicy, SendDeduplicator
+from one_chat.campaign import JOURNAL_MAGIC
+
+BROADCAST_URL = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
+
+
+@pytest.fixture
+def client():
+    return OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+
+def _recipients(n):
+    return [f"U{i}" for i in range(n)]
+
+
+def test_campaign_sends_all_chunks_and_journals_them(tmp_path, requests_mock, client):
+    req = requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    journal = tmp_path / "campaign.journal"
+    campaign = Campaign(client, "B1", _recipients(250), "hi", str(journal), max_workers=2)
+
+    result = campaign.run()
+
+    assert result == {
+        "status": "success",
+        "total_recipients": 250,
+        "total_chunks": 3,
+        "sent": 3,
+        "skipped": 0,
+        "failed": {},
+    }
+    assert req.call_count == 3
+    data = journal.read_bytes()
+    assert data.startswith(JOURNAL_MAGIC) and len(data) == 4 + 32 + 3 * 5
+
+
+def test_campaign_resumes_after_acknowledged_chunks(tmp_path, requests_mock, client):
+    journal = str(tmp_path / "campaign.journal")
+
+    def respond(request, context):
+        if request.json()["to"][0] == "U100":
+            context.status_code = 503
+            return {"message": "down"}
+        return {"status": "success"}
+
+    requests_mock.post(BROADCAST_URL, json=respond)
+    first = Campaign(client, "B1", _recipients(300), "hi", journal, max_workers=1).run()
+    assert first["status"] == "partial"
+    assert list(first["failed"]) == [1]
+    assert first["failed"][1]["message"] == "down"
+
+    req = requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    second = Campaign(client, "B1", _recipients(300), "hi", journal).run()
+
+    assert second["status"] == "success"
+    assert second["sent"] == 1 and second["skipped"] == 2
+    assert [r.json()["to"][0] for r in req.request_history] == ["U100"]
+    assert Campaign(client, "B1", _recipients(300), "hi", journal).progress() == {
+        "total_chunks": 3,
+        "acked": 3,
+        "failed": 0,
+    }
+
+
+def test_torn_journal_record_is_ignored(tmp_path, requests_mock, client):
+    requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    journal = tmp_path / "campaign.journal"
+    campaign = Campaign(client, "B1", _recipients(200), "hi", str(journal))
+    campaign.run()
+    journal.write_bytes(journal.read_bytes()[:-2])  # crash mid-append
+
+    assert campaign.progress()["acked"] == 1
+    assert campaign.run()["sent"] == 1
+    assert campaign.progress()["acked"] == 2
+
+
+def test_journal_torn_inside_its_header_starts_over(tmp_path, requests_mock, client):
+    requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    journal = tmp_path / "campaign.journal"
+    journal.write_bytes(JOURNAL_MAGIC[:3])  # crash while creating the journal
+
+    campaign = Campaign(client, "B1", _recipients(200), "hi", str(journal))
+    assert campaign.run()["sent"] == 2
+    assert journal.read_bytes().startswith(JOURNAL_MAGIC)
+    assert campaign.progress()["acked"] == 2
+
+
+def test_journal_rejects_a_different_campaign(tmp_path, requests_mock, client):
+    requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    journal = str(tmp_path / "campaign.journal")
+    Campaign(client, "B1", _recipients(10), "hi", journal).run()
+
+    with pytest.raises(ValueError, match="different campaign"):
+        Campaign(client, "B1", _recipients(10), "changed", journal).run()
+
+
+def test_chunks_sent_before_a_lost_journal_are_not_resent(tmp_path, requests_mock):
+    req = requests_mock.post(BROADCAST_URL, json={"status": "success"}, status_code=200)
+    client = OneChat("dummy", deduplicator=SendDeduplicator())
+    journal = tmp_path / "campaign.journal"
+    Campaign(client, "B1", _recipients(250), "hi", str(journal)).run()
+    journal.unlink()  # as if the process died before journaling the sends
+
+    result = Campaign(client, "B1", _recipients(250), "hi", str(journal)).run()
+
+    assert result["status"] == "success" and result["sent"] == 3
+    assert req.call_count == 3 and client.dedupe_stats()["suppressed"] == 3
+
+
+def test_progress_of_an_unstarted_campaign_does_not_create_the_journal(tmp_path, client):
+    journal = tmp_path / "campaign.journal"
+    campaign = Campaign(client, "B1", _recipients(150), "hi", str(journal))
+
+    assert campaign.progress() == {"total_chunks": 2, "acked": 0, "failed": 0}
+    assert not journal.exists()
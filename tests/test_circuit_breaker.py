@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+import requests
+
+from one_chat import OneChat
+from one_chat.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+)
+from one_chat.retry import RetryPolicy
+
+
+def test_opens_on_failure_rate_and_recovers_through_half_open():
+    breaker = CircuitBreaker("push_message", minimum_calls=4, open_timeout=0.0)
+    for _ in range(2):
+        breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_rejects_until_timeout():
+    breaker = CircuitBreaker("getlistroom", consecutive_timeouts=2, open_timeout=60.0)
+    breaker.record_failure(timeout=True)
+    breaker.record_failure(timeout=True)
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("x", consecutive_timeouts=1, open_timeout=0.0)
+    breaker.record_failure(timeout=True)
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_registry_is_per_endpoint_and_notifies():
+    changes = []
+    registry = CircuitBreakerRegistry(consecutive_timeouts=1)
+    registry.on_state_change(lambda *change: changes.append(change))
+
+    push = registry.get("https://chat-api.one.th/message/api/v1/push_message")
+    assert registry.get("https://chat-api.one.th/message/api/v1/push_message") is push
+    assert registry.get("https://chat-api.one.th/manage/api/v1/getlistroom") is not push
+
+    push.record_failure(timeout=True)
+    assert changes == [("push_message", CLOSED, OPEN)]
+    assert registry.states()["push_message"]["state"] == OPEN
+    assert registry.states()["getlistroom"]["state"] == CLOSED
+
+
+def test_client_fails_fast_when_circuit_open(requests_mock):
+    registry = CircuitBreakerRegistry(minimum_calls=2, open_timeout=60.0)
+    client = OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1), circuit_breakers=registry)
+    req = requests_mock.post(
+        client.message_sender.base_url, json={"message": "down"}, status_code=500
+    )
+
+    client.send_message("U1", "B1", "hi")
+    client.send_message("U1", "B1", "hi")
+    resp = client.send_message("U1", "B1", "hi")
+
+    assert req.call_count == 2
+    assert resp["status"] == "fail"
+    assert "circuit open" in resp["message"].lower()
+    assert client.circuit_states()["push_message"]["state"] == OPEN
+
+
+def test_client_breaker_counts_timeouts(requests_mock):
+    registry = CircuitBreakerRegistry(consecutive_timeouts=1)
+    client = OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1), circuit_breakers=registry)
+    requests_mock.post(client.message_sender.base_url, exc=requests.exceptions.ReadTimeout)
+
+    assert client.send_message("U1", "B1", "hi")["status"] == "fail"
+    assert client.circuit_states()["push_message"]["state"] == OPEN
+
+
+def test_async_client_fails_fast(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import MESSAGE_PATH, AsyncOneChat
+
+    stub_server.respond(MESSAGE_PATH, status=503, json_body={"message": "down"})
+    registry = CircuitBreakerRegistry(minimum_calls=1, open_timeout=60.0)
+
+    async def main():
+        async with AsyncOneChat(
+            "dummy",
+            base_url=stub_server.url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=registry,
+        ) as client:
+            first = await client.send_message("U1", "B1", "hi")
+            second = await client.send_message("U1", "B1", "hi")
+            return first, second
+
+    first, second = asyncio.run(main())
+    assert first == {"status": "fail", "message": "down"}
+    assert "circuit open" in second["message"].lower()
+    assert len(stub_server.received) == 1
+
+
+def test_cancelled_probe_is_released(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import MESSAGE_PATH, AsyncOneChat
+
+    registry = CircuitBreakerRegistry(minimum_calls=1, open_timeout=0.0)
+
+    async def main():
+        async with AsyncOneChat(
+            "dummy", base_url=stub_server.url, circuit_breakers=registry
+        ) as client:
+            stub_server.respond(MESSAGE_PATH, status=503, json_body={"message": "down"})
+            await client.send_message("U1", "B1", "hi")
+            stub_server.respond(MESSAGE_PATH, delay=0.5)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.send_message("U1", "B1", "hi"), 0.05)
+            assert registry.get(MESSAGE_PATH).state == HALF_OPEN
+            stub_server.respond(MESSAGE_PATH)
+            return await client.send_message("U1", "B1", "hi")
+
+    assert asyncio.run(main()) == {"status": "success"}
+    assert registry.get(MESSAGE_PATH).state == CLOSED
+
+
+def test_probe_is_released_on_unexpected_error(requests_mock):
+    req = requests_mock.post(
+        "https://chat-api.one.th/message/api/v1/push_message",
+        [{"status_code": 503}, {"exc": RuntimeError("boom")}, {"json": {"status": "success"}}],
+    )
+    registry = CircuitBreakerRegistry(minimum_calls=1, open_timeout=0.0)
+    client = OneChat("dummy", circuit_breakers=registry)
+
+    client.send_message("U1", "B1", "hi")
+    with pytest.raises(RuntimeError):
+        client.send_message("U1", "B1", "hi")
+
+    assert registry.get("push_message").state == HALF_OPEN
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert registry.get("push_message").state == CLOSED and req.call_count == 3
@@ -0,0 +1,142 @@
+import json
+import time
+
+import pytest
+
+from one_chat import OneChat, RetryPolicy
+from one_chat.cli import LatencyHistogram, build_rows, iter_records, main
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+
+
+@pytest.fixture
+def client():
+    return OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+
+def test_csv_rows_are_sent_and_results_written(requests_mock, client, tmp_path, capsys):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    source = tmp_path / "to.csv"
+    source.write_text("to,message,name\nU1,hello,Ann\nU2,,Bob\n")
+    results = tmp_path / "out.jsonl"
+
+    code = main(
+        [str(source), "--bot-id", "B1", "--message", "default", "--results", str(results)],
+        client=client,
+    )
+
+    assert code == 0
+    sent = {r.json()["to"]: r.json()["message"] for r in requests_mock.request_history}
+    assert sent == {"U1": "hello", "U2": "default"}
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert sorted((r["line"], r["to"], r["status"]) for r in lines) == [
+        (2, "U1", "success"),
+        (3, "U2", "success"),
+    ]
+    assert "sent 2 (ok 2, failed 0, invalid 0)" in capsys.readouterr().err
+
+
+def test_jsonl_rows_parse_json_arguments_and_override_bot(requests_mock, client, tmp_path):
+    req = requests_mock.post(
+        "https://chat-api.one.th/bot-message/api/v1/image-carousel",
+        json={"status": "success"},
+        status_code=200,
+    )
+    source = tmp_path / "to.jsonl"
+    records = ['{"to": "U1", "elements": [{"label": "a"}]}', "", '{"to": "U2", "bot_id": "B2"}']
+    source.write_text("\n".join(records) + "\n")
+
+    code = main(
+        [
+            str(source),
+            "--method",
+            "send_image_carousel",
+            "--bot-id",
+            "B1",
+            "--set",
+            'elements=[{"label": "default"}]',
+        ],
+        client=client,
+    )
+
+    assert code == 0
+    bodies = sorted(
+        (r.json()["to"], r.json()["bot_id"], r.json()["elements"][0]["label"])
+        for r in req.request_history
+    )
+    assert bodies == [("U1", "B1", "a"), ("U2", "B2", "default")]
+
+
+def test_invalid_rows_and_failures_are_reported(requests_mock, client, tmp_path):
+    requests_mock.post(MESSAGE_URL, json={"message": "nope"}, status_code=500)
+    source = tmp_path / "to.jsonl"
+    source.write_text('{"to": "U1"}\nnot json\n{"message": "no recipient"}\n')
+    results = tmp_path / "out.csv"
+
+    code = main(
+        [str(source), "--bot-id", "B1", "--message", "hi", "--results", str(results), "--quiet"],
+        client=client,
+    )
+
+    assert code == 1
+    assert requests_mock.call_count == 1
+    lines = results.read_text().splitlines()
+    assert lines[0] == "line,to,status,latency_ms,response"
+    assert len(lines) == 4 and all(",fail," in line for line in lines[1:])
+
+
+def test_sends_once_by_default_and_rejects_zero_retries(requests_mock, tmp_path, capsys):
+    req = requests_mock.post(MESSAGE_URL, status_code=503, json={"message": "down"})
+    source = tmp_path / "in.csv"
+    source.write_text("to\nU1\n")
+
+    assert main([str(source), "--token", "t", "--bot-id", "B1", "--message", "hi", "--quiet"]) == 1
+    assert req.call_count == 1
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(source), "--token", "t", "--bot-id", "B1", "--retries", "0"])
+    assert exit_info.value.code == 2
+    assert "--retries must be at least 1" in capsys.readouterr().err
+
+
+def test_build_rows_requires_method_arguments():
+    records = iter([(1, {"to": "U1"}), (2, {"to": "U2", "sticker_id": "S1"})])
+    rows = list(build_rows(records, "send_sticker", "B1", {}))
+    assert rows[0].error == "missing 'sticker_id'"
+    assert rows[1].error is None and rows[1].kwargs == {"sticker_id": "S1"}
+
+
+def test_iter_records_streams_csv(tmp_path):
+    source = tmp_path / "to.csv"
+    source.write_text("to\n" + "".join(f"U{i}\n" for i in range(1000)))
+    records = iter_records(str(source))
+    assert next(records) == (2, {"to": "U0"})
+    assert sum(1 for _ in records) == 999
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=0.05)
+
+
+def test_rate_limits_sends(requests_mock, client, tmp_path):
+    times = []
+
+    def respond(request, context):
+        times.append(time.monotonic())
+        return {"status": "success"}
+
+    requests_mock.post(MESSAGE_URL, json=respond)
+    source = tmp_path / "to.csv"
+    source.write_text("to\nU1\nU2\nU3\nU4\n")
+
+    code = main(
+        [str(source), "--bot-id", "B1", "--message", "hi", "--rate", "20", "--quiet"],
+        client=client,
+    )
+
+    assert code == 0
+    assert max(times) - min(times) >= 0.14
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+import one_chat
+from one_chat import ClientPool, RetryPolicy
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+BROADCAST_URL = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
+LISTROOM_URL = "https://chat-api.one.th/manage/api/v1/getlistroom"
+
+
+@pytest.fixture
+def pool():
+    pool = ClientPool(
+        {"B1": "token-1", "B2": "token-2", "B3": "token-1"},
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+    yield pool
+    pool.close()
+
+
+def test_each_bot_gets_its_own_client_and_budget(pool):
+    clients = [pool.client(bot_id) for bot_id in pool.bot_ids]
+
+    assert len({id(c.transport) for c in clients}) == 3
+    assert len({id(c.transport.rate_limiter) for c in clients}) == 3
+    with pytest.raises(ValueError):
+        pool.client("B9")
+    with pytest.raises(ValueError):
+        ClientPool({"B1": "t"}, transport=object())
+
+
+def test_calls_are_routed_by_bot_id(requests_mock, pool):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+
+    assert pool.send_message("U1", "B2", "hi") == {"status": "success"}
+    assert pool.send_template("U1", bot_id="B1", template=[{"type": "text"}])["status"] == "success"
+
+    assert [r.headers["Authorization"] for r in req.request_history] == [
+        "Bearer token-2",
+        "Bearer token-1",
+    ]
+    assert pool.client("B2").rate_limit_stats()["acquired"] == 1
+    assert pool.client("B3").rate_limit_stats()["acquired"] == 0
+    with pytest.raises(AttributeError):
+        pool.no_such_method()
+
+
+def test_shard_balances_by_rate_budget_and_audience():
+    pool = ClientPool([("B1", "t"), ("B2", "t")], bot_rates={"B2": {"push_message": (60.0, 60)}})
+    recipients = [f"U{i}" for i in range(80)]
+
+    shards, unreachable = pool.shard(recipients + ["U0"])
+
+    assert unreachable == []
+    assert (len(shards["B1"]), len(shards["B2"])) == (20, 60)
+    assert sorted(shards["B1"] + shards["B2"]) == sorted(recipients)
+
+    audiences = {"B1": {"U1", "U2"}, "B2": {"U2", "U3"}}
+    shards, unreachable = pool.shard(["U1", "U2", "U3", "U4"], audiences=audiences)
+    assert shards == {"B1": ["U1"], "B2": ["U2", "U3"]}
+    assert unreachable == ["U4"]
+
+
+def test_send_sharded_streams_results_from_every_bot(requests_mock, pool):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    recipients = [f"U{i}" for i in range(30)]
+
+    results = list(
+        pool.send_sharded(
+            "send_sticker",
+            recipients + ["X"],
+            "STK1",
+            audiences={bot_id: set(recipients) for bot_id in pool.bot_ids},
+        )
+    )
+
+    assert results[0] == (None, "X", results[0][2]) and results[0][2]["status"] == "fail"
+    sent = {to: bot_id for bot_id, to, resp in results[1:] if resp == {"status": "success"}}
+    assert set(sent) == set(recipients)
+    assert {bot_id: list(sent.values()).count(bot_id) for bot_id in pool.bot_ids} == {
+        "B1": 10,
+        "B2": 10,
+        "B3": 10,
+    }
+    assert all(r.json()["bot_id"] == sent[r.json()["to"]] for r in req.request_history)
+    with pytest.raises(ValueError):
+        pool.send_sharded("broadcast_message", recipients)
+
+
+def test_closing_send_sharded_stops_the_producers(requests_mock, pool):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    threads_before = threading.active_count()
+
+    results = pool.send_sharded("send_message", [f"U{i}" for i in range(3000)], "hi", max_workers=2)
+    first = [next(results) for _ in range(5)]
+    results.close()
+    sent = req.call_count
+    time.sleep(0.1)
+
+    assert len(first) == 5 and sent < 100
+    assert req.call_count == sent  # nothing is sent after close() returns
+    assert threading.active_count() == threads_before
+
+
+class _Abort(BaseException):
+    pass
+
+
+def test_send_sharded_reraises_base_exceptions_from_a_shard(requests_mock, pool):
+    requests_mock.post(MESSAGE_URL, exc=_Abort)
+
+    with pytest.raises(_Abort):
+        list(pool.send_sharded("send_message", [f"U{i}" for i in range(6)], "hi"))
+
+
+def test_broadcast_sharded_aggregates_per_bot(requests_mock, pool):
+    requests_mock.post(BROADCAST_URL, json={"status": "success"})
+
+    result = pool.broadcast_sharded([f"U{i}" for i in range(300)], "hello", bot_ids=["B1", "B2"])
+
+    assert result["status"] == "success" and result["unreachable"] == []
+    assert {bot_id: r["total_recipients"] for bot_id, r in result["bots"].items()} == {
+        "B1": 150,
+        "B2": 150,
+    }
+
+
+def test_audiences_come_from_each_bots_directory(requests_mock, pool):
+    def listroom(request, context):
+        bot_id = request.json()["bot_id"]
+        if bot_id == "B3":
+            context.status_code = 500
+            return {"message": "down"}
+        return {
+            "status": "success",
+            "list_friend": [{"one_id": f"{bot_id}-friend"}],
+            "list_group": [{"group_id": f"{bot_id}-group"}],
+        }
+
+    requests_mock.post(LISTROOM_URL, json=listroom)
+
+    assert pool.audiences() == {
+        "B1": frozenset({"B1-friend", "B1-group"}),
+        "B2": frozenset({"B2-friend", "B2-group"}),
+        "B3": frozenset(),
+    }
+
+
+def test_init_pool_routes_wrapper_calls(requests_mock):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    one_chat.init_pool({"B1": "token-1", "B2": "token-2"}, to="U1", bot_id="B1")
+
+    assert one_chat.send_message(message="a") == {"status": "success"}
+    assert one_chat.send_message(bot_id="B2", message="b") == {"status": "success"}
+
+    assert [r.headers["Authorization"] for r in req.request_history] == [
+        "Bearer token-1",
+        "Bearer token-2",
+    ]
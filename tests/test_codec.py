@@ -0,0 +1,105 @@
+import json
+
+import pytest
+import requests
+
+from one_chat import JSONCodec, OneChat, RetryPolicy
+from one_chat.codec import get_codec
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+
+
+def _codecs():
+    names = ["json"]
+    try:
+        import orjson  # noqa: F401
+
+        names.append("orjson")
+    except ImportError:
+        pass
+    return names
+
+
+def test_stdlib_codec_emits_compact_utf8():
+    body = JSONCodec().dumps({"message": "สวัสดี", "to": ["U1", "U2"]})
+    assert body == '{"message":"สวัสดี","to":["U1","U2"]}'.encode()
+    assert JSONCodec().loads(body) == {"message": "สวัสดี", "to": ["U1", "U2"]}
+
+
+def test_get_codec_resolves_names():
+    assert type(get_codec("json")) is JSONCodec
+    assert get_codec() is get_codec("auto")
+    custom = JSONCodec()
+    assert get_codec(custom) is custom
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_auto_prefers_orjson_when_installed():
+    pytest.importorskip("orjson")
+    assert get_codec().name == "orjson"
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_payload_is_sent_pre_encoded(requests_mock, codec):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success", "text": "ได้รับแล้ว"})
+    client = OneChat("dummy", json_codec=codec)
+
+    result = client.send_message("U1", "B1", "สวัสดี")
+
+    assert result == {"status": "success", "text": "ได้รับแล้ว"}
+    sent = req.last_request
+    assert isinstance(sent.body, bytes)
+    assert "สวัสดี".encode() in sent.body
+    assert sent.headers["Content-Type"] == "application/json"
+    assert json.loads(sent.body) == {
+        "to": "U1",
+        "bot_id": "B1",
+        "type": "text",
+        "message": "สวัสดี",
+    }
+
+
+def test_custom_codec_encodes_once_across_retries(requests_mock):
+    class CountingCodec(JSONCodec):
+        encoded = 0
+
+        def dumps(self, obj):
+            CountingCodec.encoded += 1
+            return super().dumps(obj)
+
+    req = requests_mock.post(
+        MESSAGE_URL,
+        [{"status_code": 503, "json": {}}, {"status_code": 200, "json": {"status": "success"}}],
+    )
+    client = OneChat(
+        "dummy",
+        json_codec=CountingCodec(),
+        retry_policy=RetryPolicy(max_attempts=2, backoff_base=0),
+    )
+
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert req.call_count == 2 and CountingCodec.encoded == 1
+    assert req.request_history[0].body == req.request_history[1].body
+
+
+def test_invalid_json_response_is_a_failed_request(requests_mock):
+    requests_mock.post(MESSAGE_URL, text="<html>bad gateway</html>", status_code=200)
+    client = OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+    result = client.send_message("U1", "B1", "hi")
+
+    assert result["status"] == "fail" and result["message"].startswith("Request failed:")
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_unencodable_payload_is_a_failed_request(requests_mock, codec):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    client = OneChat("dummy", json_codec=codec)
+
+    result = client.send_template("U1", "B1", [{"title": object()}])
+
+    assert result["status"] == "fail" and result["message"].startswith("Request failed:")
+    assert req.call_count == 0
+    with pytest.raises(requests.exceptions.InvalidJSONError):
+        client.transport.post(MESSAGE_URL, json={"bot_id": "B1", "value": object()})
@@ -0,0 +1,52 @@
+import pytest
+
+from one_chat import OneChat
+from one_chat.directory import Directory
+
+RESPONSE = {
+    "status": "success",
+    "list_friend": [
+        {"one_id": "U1", "display_name": "Alice"},
+        {"one_id": "U2", "display_name": "Bob"},
+        {"one_id": "U3", "display_name": "alice"},
+    ],
+    "list_group": [{"group_id": "G1", "group_name": "Ops"}],
+}
+
+
+def test_lookups_by_id_and_name():
+    d = Directory.from_response(RESPONSE)
+    assert d.friend("U2") == {"one_id": "U2", "display_name": "Bob"}
+    assert d.friend("nope") is None
+    assert d.group("G1")["group_name"] == "Ops"
+    assert [f["one_id"] for f in d.friends_named("ALICE")] == ["U1", "U3"]
+    assert d.groups_named("ops") == [RESPONSE["list_group"][0]]
+    assert "U1" in d and "G1" in d and "X" not in d
+    assert len(d) == 4
+    assert d.friend_ids() == {"U1", "U2", "U3"}
+
+
+def test_diff_between_snapshots():
+    old = Directory.from_response(RESPONSE)
+    new = Directory(
+        friends=[{"one_id": "U2"}, {"one_id": "U4"}],
+        groups=[{"group_id": "G1"}, {"group_id": "G2"}],
+    )
+    diff = old.diff(new)
+    assert diff.added_friends == {"U4"}
+    assert diff.removed_friends == {"U1", "U3"}
+    assert diff.added_groups == {"G2"}
+    assert diff.removed_groups == frozenset()
+    assert not diff.is_empty
+    assert new.diff(new).is_empty
+
+
+def test_failed_response_raises():
+    with pytest.raises(ValueError):
+        Directory.from_response({"status": "fail", "message": "bad"})
+
+
+def test_client_fetch_directory(requests_mock):
+    client = OneChat("dummy")
+    requests_mock.post(client.friends_and_groups.base_url, json=RESPONSE)
+    assert client.fetch_directory("B1").friend("U1")["display_name"] == "Alice"
@@ -0,0 +1,100 @@
+import multiprocessing
+import time
+
+import pytest
+
+from one_chat import CampaignDispatcher, RetryPolicy, SharedRateLimiter
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+BROADCAST_URL = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
+
+# Worker processes inherit requests_mock's patched transport through fork.
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method"
+)
+
+
+def _reserve(limiter, results):
+    results.put(limiter.reserve("B1", MESSAGE_URL))
+
+
+def test_shared_rate_limiter_budget_spans_processes():
+    context = multiprocessing.get_context("fork")
+    limiter = SharedRateLimiter(["B1"], rates={"push_message": (10.0, 5)}, context=context)
+    assert [limiter.reserve("B1", MESSAGE_URL) for _ in range(5)] == [0.0] * 5
+
+    results = context.Queue()
+    child = context.Process(target=_reserve, args=(limiter, results))
+    child.start()
+    child.join()
+
+    assert 0.05 < results.get(timeout=5) <= 0.1
+    assert 0.1 < limiter.reserve("B1", MESSAGE_URL) <= 0.2
+    assert limiter.reserve("B2", MESSAGE_URL) == 0.0  # undeclared bots stay process-local
+
+
+def test_dispatcher_streams_and_merges_worker_results(requests_mock):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    recipients = [f"U{i}" for i in range(60)]
+
+    with CampaignDispatcher(
+        {"B1": "t1", "B2": "t2"},
+        processes=2,
+        batch_size=10,
+        mp_context="fork",
+        retry_policy=RetryPolicy(max_attempts=1),
+    ) as dispatcher:
+        results = list(
+            dispatcher.send(
+                "send_message",
+                recipients + ["X"],
+                "hi",
+                audiences={"B1": set(recipients), "B2": set(recipients)},
+            )
+        )
+        stats = dispatcher.stats()
+
+    assert results[0][:2] == (None, "X") and results[0][2]["status"] == "fail"
+    sent = {to: bot_id for bot_id, to, resp in results[1:] if resp == {"status": "success"}}
+    assert set(sent) == set(recipients)
+    assert stats["sent"] == stats["succeeded"] == 60 and stats["unreachable"] == 1
+    assert stats["bots"] == {
+        "B1": {"sent": 30, "succeeded": 30, "failed": 0},
+        "B2": {"sent": 30, "succeeded": 30, "failed": 0},
+    }
+    assert sum(worker["sent"] for worker in stats["workers"].values()) == 60
+    assert stats["rate_limit"]["acquired"] == 60
+
+
+def test_workers_share_one_rate_budget(requests_mock):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"})
+
+    with CampaignDispatcher(
+        {"B1": "t1"},
+        processes=4,
+        batch_size=5,
+        rates={"push_message": (50.0, 1)},
+        mp_context="fork",
+    ) as dispatcher:
+        started = time.monotonic()
+        results = list(dispatcher.send("send_message", [f"U{i}" for i in range(40)], "hi"))
+        elapsed = time.monotonic() - started
+
+    assert len(results) == 40
+    assert elapsed >= 39 / 50 * 0.9  # 4 workers together still send at 50/s
+
+
+def test_dispatcher_broadcast_chunks(requests_mock):
+    req = requests_mock.post(BROADCAST_URL, json={"status": "success"})
+
+    with CampaignDispatcher(
+        [("B1", "t1"), ("B2", "t2")], processes=2, batch_size=200, mp_context="fork"
+    ) as dispatcher:
+        results = list(dispatcher.broadcast([f"U{i}" for i in range(450)], "news"))
+        with pytest.raises(ValueError):
+            dispatcher.send("broadcast_message", ["U1"], "x")
+
+    assert sorted(len(chunk) for _, chunk, _ in results) == [25, 25, 100, 100, 100, 100]
+    assert {bot_id for bot_id, _, _ in results} == {"B1", "B2"}
+    assert all(resp == {"status": "success"} for _, _, resp in results)
+    assert req.call_count == 0  # requests ran in the worker processes
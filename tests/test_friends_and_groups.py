@@ -1,3 +1,5 @@
+import time
+
 from one_chat.get_friends_and_groups import FriendAndGroupManager
 
 
@@ -33,3 +35,67 @@ def test_fetch_error_handling(requests_mock):
     requests_mock.post(fm.base_url, json=error, status_code=400)
     resp = fm.fetch_friends_and_groups("B1")
     assert resp["status"] == "fail"
+
+
+PAYLOAD = {
+    "status": "success",
+    "list_friend": [{"one_id": "U1"}, {"one_id": "U2"}],
+    "list_group": [{"group_id": "G1"}],
+}
+
+
+def test_cache_serves_all_list_helpers_from_one_fetch(requests_mock):
+    fm = FriendAndGroupManager("dummy", cache_ttl=60)
+    req = requests_mock.post(fm.base_url, json=PAYLOAD, status_code=200)
+
+    assert fm.list_friend_ids("B1") == ["U1", "U2"]
+    assert fm.list_group_ids("B1") == ["G1"]
+    assert fm.list_all_friends("B1") == PAYLOAD["list_friend"]
+    assert fm.list_all_groups("B1") == PAYLOAD["list_group"]
+    assert req.call_count == 1
+
+    fm.list_friend_ids("B2")
+    assert req.call_count == 2
+    assert fm.cache_stats()["hits"] == 3
+
+
+def test_cache_does_not_store_failures(requests_mock):
+    fm = FriendAndGroupManager("dummy", cache_ttl=60)
+    req = requests_mock.post(fm.base_url, json={"message": "bad"}, status_code=400)
+    fm.fetch_friends_and_groups("B1")
+    fm.fetch_friends_and_groups("B1")
+    assert req.call_count == 2
+
+
+def test_cache_invalidate_and_lru_eviction(requests_mock):
+    fm = FriendAndGroupManager("dummy", cache_ttl=60, cache_maxsize=1)
+    req = requests_mock.post(fm.base_url, json=PAYLOAD, status_code=200)
+
+    fm.fetch_friends_and_groups("B1")
+    fm.invalidate("B1")
+    fm.fetch_friends_and_groups("B1")
+    assert req.call_count == 2
+
+    fm.fetch_friends_and_groups("B2")
+    fm.fetch_friends_and_groups("B1")
+    assert req.call_count == 4
+    assert fm.cache_stats()["evictions"] == 2
+
+
+def test_stale_while_revalidate_refreshes_in_background(requests_mock):
+    fm = FriendAndGroupManager("dummy", cache_ttl=0, stale_ttl=60)
+    updated = dict(PAYLOAD, list_friend=[{"one_id": "U9"}])
+    req = requests_mock.post(
+        fm.base_url, [{"json": PAYLOAD, "status_code": 200}, {"json": updated, "status_code": 200}]
+    )
+
+    assert fm.list_friend_ids("B1") == ["U1", "U2"]
+    assert fm.list_friend_ids("B1") == ["U1", "U2"]  # stale, refresh started
+
+    for _ in range(100):
+        if req.call_count == 2 and fm._refreshing == set():
+            break
+        time.sleep(0.01)
+    assert req.call_count == 2
+    fm.cache.ttl = 60
+    assert fm.list_friend_ids("B1") == ["U9"]
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+import requests
+
+from one_chat import Hooks, OneChat, RetryPolicy
+from one_chat.message_sender import MessageSender
+from one_chat.transport import Transport
+
+MESSAGE_PATH = "/message/api/v1/push_message"
+
+
+def _recording_hooks():
+    hooks = Hooks()
+    events = []
+    hooks.on("*", events.append)
+    return hooks, events
+
+
+def test_events_fire_in_lifecycle_order(stub_server):
+    stub_server.respond(MESSAGE_PATH, json_body={"status": "success"})
+    hooks, events = _recording_hooks()
+    ms = MessageSender("dummy", Transport(hooks=hooks))
+    ms.base_url = stub_server.url + MESSAGE_PATH
+
+    assert ms.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert ms.send_message("U1", "B1", "again") == {"status": "success"}
+
+    first = [e for e in events if e.request_id == 1]
+    assert [e.name for e in first] == [
+        "request_start",
+        "connection_acquired",
+        "headers_sent",
+        "response_received",
+        "json_decoded",
+    ]
+    assert all(e.endpoint == "push_message" and e.bot_id == "B1" for e in events)
+    assert [e.elapsed for e in first] == sorted(e.elapsed for e in first)
+    assert first[1].attributes == {"reused": False}
+    assert first[3].attributes["status"] == 200
+    second = [e for e in events if e.request_id == 2]
+    assert second[1].attributes == {"reused": True}
+
+
+def test_retries_share_request_id_and_errors_are_reported(requests_mock):
+    hooks, events = _recording_hooks()
+    client = OneChat("dummy", hooks=hooks, retry_policy=RetryPolicy(max_attempts=2, backoff_base=0))
+    requests_mock.post(
+        client.message_sender.base_url,
+        [{"exc": requests.exceptions.ConnectTimeout}, {"exc": requests.exceptions.ConnectTimeout}],
+    )
+
+    assert client.send_message("U1", "B1", "hi")["status"] == "fail"
+
+    errors = [e for e in events if e.name == "error"]
+    assert [(e.request_id, e.attempt) for e in errors] == [(1, 1), (1, 2)]
+    assert isinstance(errors[0].attributes["error"], requests.exceptions.ConnectTimeout)
+
+
+def test_unknown_event_is_rejected():
+    with pytest.raises(ValueError):
+        Hooks().on("request_end", print)
+
+
+def test_async_client_fires_events(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import AsyncOneChat
+
+    stub_server.respond(MESSAGE_PATH, json_body={"status": "success"})
+    hooks, events = _recording_hooks()
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url, hooks=hooks) as client:
+            return await client.send_message("U1", "B1", "hi")
+
+    assert asyncio.run(main()) == {"status": "success"}
+    assert [e.name for e in events] == [
+        "request_start",
+        "connection_acquired",
+        "headers_sent",
+        "response_received",
+        "json_decoded",
+    ]
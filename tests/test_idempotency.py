@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from one_chat import JSONCodec, Metrics, OneChat, RetryPolicy, SendDeduplicator
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+BROADCAST_URL = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
+LISTROOM_URL = "https://chat-api.one.th/manage/api/v1/getlistroom"
+
+
+class _AsciiCodec(JSONCodec):
+    def dumps(self, obj):
+        return json.dumps(obj).encode()
+
+
+@pytest.fixture
+def client():
+    return OneChat(
+        "dummy",
+        retry_policy=RetryPolicy(max_attempts=2, backoff_base=0),
+        deduplicator=SendDeduplicator(window=60),
+        metrics=Metrics(),
+    )
+
+
+def test_identical_send_is_suppressed(requests_mock, client):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+    duplicate = client.send_message("U1", "B1", "hi")
+    assert client.send_message("U2", "B1", "hi") == {"status": "success"}
+    assert client.send_message("U1", "B2", "hi") == {"status": "success"}
+    assert client.send_message("U1", "B1", "hello") == {"status": "success"}
+
+    assert duplicate["status"] == "duplicate" and "Duplicate send" in duplicate["message"]
+    assert req.call_count == 4
+    stats = client.dedupe_stats()
+    assert (stats["checked"], stats["suppressed"], stats["committed"]) == (5, 1, 4)
+    assert client.metrics_snapshot()["errors"]
+
+
+def test_failed_send_is_released_and_can_be_retried(requests_mock, client):
+    req = requests_mock.post(
+        MESSAGE_URL,
+        [
+            {"status_code": 503, "json": {}},
+            {"status_code": 503, "json": {"message": "down"}},
+            {"status_code": 200, "json": {"status": "success"}},
+        ],
+    )
+
+    assert client.send_message("U1", "B1", "hi")["status"] == "fail"
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert client.send_message("U1", "B1", "hi")["status"] == "duplicate"
+
+    assert req.call_count == 3  # retries inside one call are not duplicates
+    stats = client.dedupe_stats()
+    assert (stats["released"], stats["committed"], stats["suppressed"]) == (1, 1, 1)
+    assert stats["in_flight"] == 0
+
+
+def test_broadcasts_and_prepared_sends_are_deduplicated(requests_mock, client):
+    broadcast = requests_mock.post(BROADCAST_URL, json={"status": "success"})
+    message = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+
+    client.broadcast_message("B1", ["U1", "U2"], "news")
+    client.broadcast_message("B1", ["U1", "U2"], "news")
+    prepared = client.prepare("send_message", "B1", "hi")
+    client.send_message("U1", "B1", "hi")
+    client.send_prepared(prepared, "U1")
+
+    assert broadcast.call_count == 1 and message.call_count == 1
+    assert client.dedupe_stats()["suppressed"] == 2
+
+
+def test_bulk_broadcast_counts_duplicates_as_delivered(requests_mock, client):
+    req = requests_mock.post(BROADCAST_URL, json={"status": "success"})
+    recipients = [f"U{i}" for i in range(150)]
+
+    assert client.broadcast_bulk("B1", recipients, "news")["status"] == "success"
+    again = client.broadcast_bulk("B1", recipients, "news")
+
+    assert again["status"] == "success" and again["failed"] == []
+    assert [c["response"]["status"] for c in again["chunks"]] == ["duplicate", "duplicate"]
+    assert req.call_count == 2
+
+
+def test_reads_are_never_suppressed(requests_mock, client):
+    req = requests_mock.post(LISTROOM_URL, json={"status": "success", "list_friend": []})
+
+    client.fetch_friends_and_groups("B1")
+    client.fetch_friends_and_groups("B1")
+
+    assert req.call_count == 2 and client.dedupe_stats()["checked"] == 0
+
+
+def test_explicit_key_is_stable_across_codecs(requests_mock):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"})
+    dedupe = SendDeduplicator()
+    compact = OneChat("dummy", json_codec="json", deduplicator=dedupe)
+    ascii_escaped = OneChat("dummy", json_codec=_AsciiCodec(), deduplicator=dedupe)
+
+    assert compact.send_message("U1", "B1", "สวัสดี")["status"] == "success"
+    assert ascii_escaped.send_message("U1", "B1", "สวัสดี")["status"] == "success"  # new body key
+    assert compact.send_message("U1", "B1", "สวัสดี", idempotency_key="o-1")["status"] == "success"
+    duplicate = ascii_escaped.send_message("U1", "B1", "สวัสดี", idempotency_key="o-1")
+    assert duplicate["status"] == "duplicate"
+    assert compact.send_sticker("U1", "B1", "S1", idempotency_key="o-2")["status"] == "success"
+
+    assert req.call_count == 4
+    with pytest.raises(ValueError):
+        compact.send_many("send_message", ["U1", "U2"], "B1", "hi", idempotency_key="x")
+
+
+def test_window_slides():
+    dedupe = SendDeduplicator(window=0.2, buckets=2)
+    key = os.urandom(16)
+    assert dedupe.begin(key)
+    assert not dedupe.begin(key)  # in flight
+    dedupe.commit(key)
+    assert not dedupe.begin(key)
+
+    time.sleep(0.25)
+
+    assert dedupe.begin(key)
+    assert dedupe.stats()["suppressed_in_flight"] == 1
+
+
+def test_exact_lru_confirms_bloom_hits():
+    keys = [os.urandom(16) for _ in range(200)]
+    fresh = [os.urandom(16) for _ in range(50)]
+    bloom_only = SendDeduplicator(capacity=8, false_positive_rate=0.1, buckets=1)
+    exact = SendDeduplicator(capacity=8, false_positive_rate=0.1, buckets=1, exact_size=500)
+    for dedupe in (bloom_only, exact):
+        for key in keys:
+            dedupe.begin(key)
+            dedupe.commit(key)
+
+    # An overfilled filter reports false positives; the exact LRU catches them.
+    assert not all(bloom_only.begin(key) for key in fresh)
+    assert all(exact.begin(key) for key in fresh)
+    assert exact.stats()["unconfirmed_bloom_hits"] > 0
+    assert not any(exact.begin(key) for key in keys)
+
+
+def test_async_send_is_deduplicated(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import AsyncOneChat
+
+    dedupe = SendDeduplicator()
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url, deduplicator=dedupe) as client:
+            first = await client.send_message("U1", "B1", "hi")
+            second = await client.send_message("U1", "B1", "hi")
+            return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first == {"status": "success"}
+    assert second["status"] == "duplicate" and "Duplicate send" in second["message"]
+    assert len(stub_server.received) == 1
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+import requests
+
+from one_chat import Metrics, OneChat, RetryPolicy
+from one_chat.message_sender import MessageSender
+from one_chat.transport import Transport
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        metrics.observe("push_message", "200", seconds, request_bytes=10, response_bytes=5)
+
+    snap = metrics.snapshot()
+    hist = snap["latency"]["push_message"]["200"]
+    assert hist["count"] == 4 and hist["sum"] == pytest.approx(3.65)
+    assert hist["buckets"] == {0.1: 2, 1.0: 3, "+Inf": 4}
+    assert snap["request_bytes"] == {"push_message": 40}
+    assert snap["response_bytes"] == {"push_message": 20}
+
+
+def test_transport_records_latency_bytes_retries_and_errors(requests_mock):
+    metrics = Metrics()
+    transport = Transport(retry_policy=RetryPolicy(backoff_base=0), metrics=metrics)
+    ms = MessageSender("dummy", transport)
+    requests_mock.post(
+        MESSAGE_URL,
+        [
+            {"json": {"message": "busy"}, "status_code": 503},
+            {"json": {"status": "success"}, "status_code": 200},
+            {"exc": requests.exceptions.ConnectTimeout},
+            {"exc": requests.exceptions.ConnectTimeout},
+            {"exc": requests.exceptions.ConnectTimeout},
+        ],
+    )
+
+    assert ms.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert ms.send_message("U1", "B1", "hi")["status"] == "fail"
+
+    snap = metrics.snapshot()
+    latency = snap["latency"]["push_message"]
+    assert latency["503"]["count"] == 1 and latency["200"]["count"] == 1
+    assert latency["error"]["count"] == 3
+    assert snap["errors"] == {"push_message": {"ConnectTimeout": 3}}
+    assert snap["retries"] == {"push_message": 3}
+    assert snap["request_bytes"]["push_message"] > 0
+    assert snap["response_bytes"]["push_message"] == len(b'{"message": "busy"}') + len(
+        b'{"status": "success"}'
+    )
+
+
+def test_prometheus_export(requests_mock):
+    metrics = Metrics(buckets=(0.5,))
+    client = OneChat("dummy", metrics=metrics)
+    requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    client.send_message("U1", "B1", "hi")
+
+    text = metrics.to_prometheus()
+    assert "# TYPE one_chat_request_duration_seconds histogram" in text
+    assert (
+        'one_chat_request_duration_seconds_bucket{endpoint="push_message",status="200",le="+Inf"} 1'
+        in text
+    )
+    assert 'one_chat_request_duration_seconds_count{endpoint="push_message",status="200"} 1' in text
+    assert 'one_chat_response_bytes_total{endpoint="push_message"} 21' in text
+    assert client.metrics_snapshot()["latency"]["push_message"]["200"]["count"] == 1
+    assert OneChat("dummy").metrics_snapshot() == {}
+
+
+def test_async_client_records_metrics(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import MESSAGE_PATH, AsyncOneChat
+
+    stub_server.respond(MESSAGE_PATH, json_body={"status": "success"})
+    metrics = Metrics()
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url, metrics=metrics) as client:
+            return await client.send_message("U1", "B1", "hi")
+
+    assert asyncio.run(main()) == {"status": "success"}
+    assert metrics.snapshot()["latency"]["push_message"]["200"]["count"] == 1
@@ -0,0 +1,61 @@
+import requests
+
+from one_chat.message_sender import MessageSender
+from one_chat.multipart import MultipartEncoder
+
+
+def _requests_body(fields, path, boundary):
+    with open(path, "rb") as f:
+        req = requests.Request("POST", "http://x", data=fields, files={"file": (path, f)}).prepare()
+    return req.body.replace(
+        req.headers["Content-Type"].split("=", 1)[1].encode(), boundary.encode()
+    )
+
+
+def test_encoder_matches_requests_multipart(tmp_path):
+    f = tmp_path / "doc.bin"
+    f.write_bytes(bytes(range(256)) * 10)
+    fields = {"to": "U1", "bot_id": "B1", "type": "file"}
+    enc = MultipartEncoder(fields, "file", str(f), chunk_size=100, boundary="b0undary")
+
+    body = enc.read_all()
+    assert body == _requests_body(fields, str(f), "b0undary")
+    assert len(enc) == len(body)
+
+
+def test_mmap_and_read_paths_are_identical(tmp_path):
+    f = tmp_path / "doc.bin"
+    f.write_bytes(b"abc" * 5000)
+    read = MultipartEncoder({}, "file", str(f), chunk_size=4096, boundary="b")
+    mapped = MultipartEncoder({}, "file", str(f), chunk_size=4096, use_mmap=True, boundary="b")
+    assert mapped.read_all() == read.read_all()
+
+
+def test_progress_reports_every_chunk_and_is_reiterable(tmp_path):
+    f = tmp_path / "doc.bin"
+    f.write_bytes(b"x" * 1000)
+    seen = []
+    enc = MultipartEncoder({}, "file", str(f), chunk_size=400, progress=lambda s, t: seen.append(s))
+
+    enc.read_all()
+    assert seen[-1] == len(enc)
+    assert seen == sorted(seen) and len(seen) == 5  # head, 3 chunks, tail
+    assert enc.read_all() == enc.read_all()
+
+
+def test_send_file_streams_with_content_length(stub_server, tmp_path):
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"z" * 300_000)
+    ms = MessageSender("dummy")
+    ms.base_url = stub_server.url + "/message/api/v1/push_message"
+    stub_server.respond("/message/api/v1/push_message", json_body={"status": "success"})
+    progress = []
+
+    resp = ms.send_file("U1", "B1", str(f), use_mmap=True, progress=lambda s, t: progress.append(t))
+
+    assert resp == {"status": "success"}
+    _, headers, body = stub_server.received[0]
+    assert headers["Content-Length"] == str(len(body))
+    assert headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert b'name="bot_id"\r\n\r\nB1' in body and body.count(b"z") == 300_000
+    assert progress[-1] == len(body)
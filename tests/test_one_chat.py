@@ -0,0 +1,81 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from one_chat import OneChat, RetryPolicy, Transport
+
+
+def test_send_many_streams_per_recipient_results(requests_mock):
+    client = OneChat("dummy")
+    req = requests_mock.post(client.message_sender.base_url, json={"status": "success"})
+    recipients = [f"U{i}" for i in range(40)]
+
+    results = dict(
+        client.send_many(
+            "send_template", recipients, "B1", template=[{"title": "t"}], max_workers=5
+        )
+    )
+
+    assert set(results) == set(recipients)
+    assert all(r == {"status": "success"} for r in results.values())
+    assert req.call_count == 40
+    bodies = [r.json() for r in req.request_history]
+    assert {b["to"] for b in bodies} == set(recipients)
+    assert all(b["type"] == "template" and b["elements"] == [{"title": "t"}] for b in bodies)
+
+
+def test_send_many_positional_payload_and_lazy_iterable(requests_mock):
+    client = OneChat("dummy")
+    req = requests_mock.post(client.sticker_sender.api_url, json={"status": "success"})
+
+    results = list(client.send_many("send_sticker", (f"U{i}" for i in range(3)), "B1", "STK"))
+
+    assert sorted(to for to, _ in results) == ["U0", "U1", "U2"]
+    assert all(r.json()["sticker_id"] == "STK" for r in req.request_history)
+
+
+def test_send_many_rejects_unknown_method():
+    client = OneChat("dummy")
+    with pytest.raises(ValueError):
+        client.send_many("broadcast_message", ["U1"], "B1", "hi")
+
+
+def test_senders_are_built_once_on_first_access():
+    client = OneChat("Bearer dummy")
+    assert "message_sender" not in vars(client)
+
+    with ThreadPoolExecutor(8) as pool:
+        senders = list(pool.map(lambda _: client.message_sender, range(32)))
+
+    assert all(sender is senders[0] for sender in senders)
+    assert senders[0].transport is client.transport
+    assert senders[0].headers["Authorization"] == "Bearer dummy"
+    assert "sticker_sender" not in vars(client)
+
+
+def test_shared_transport_rejects_transport_options():
+    transport = Transport()
+    assert OneChat("dummy", transport=transport).transport is transport
+    with pytest.raises(ValueError, match="retry_policy"):
+        OneChat("dummy", transport=transport, retry_policy=RetryPolicy())
+    with pytest.raises(ValueError, match="json_codec"):
+        OneChat("dummy", transport=transport, json_codec="json")
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, one_chat; "
+        "assert 'requests' not in sys.modules and 'one_chat.async_client' not in sys.modules; "
+        "from one_chat import OneChat, Scheduler; "
+        "assert 'one_chat.message_sender' not in sys.modules; "
+        "assert 'aiohttp' not in sys.modules and 'asyncio' not in sys.modules; "
+        "assert one_chat.Scheduler is Scheduler and 'AsyncOneChat' in dir(one_chat)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_unknown_attribute_raises():
+    with pytest.raises(ImportError):
+        from one_chat import NoSuchThing  # noqa: F401
@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+
+from one_chat import OneChat, Outbox, RetryPolicy, SendDeduplicator
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+BROADCAST_URL = "https://chat-api.one.th/bc_msg/api/v1/broadcast_group"
+
+
+@pytest.fixture
+def client():
+    return OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+
+def test_outbox_delivers_and_acks_items(tmp_path, requests_mock, client):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    with Outbox(client, str(tmp_path / "outbox.db"), workers=2, batch_size=3) as outbox:
+        ids = [outbox.enqueue("send_message", f"U{i}", "B1", "hi") for i in range(10)]
+        assert outbox.join(timeout=5)
+        stats = outbox.stats()
+        assert stats["delivered"] == 10 and stats["depth"] == 0 and stats["lag_seconds"] == 0.0
+        assert outbox.status(ids[0]) == {
+            "method": "send_message",
+            "state": "delivered",
+            "attempts": 1,
+            "response": {"status": "success"},
+        }
+    assert req.call_count == 10
+    assert {r.json()["to"] for r in req.request_history} == {f"U{i}" for i in range(10)}
+
+
+def test_outbox_recovers_in_flight_items_after_restart(tmp_path, requests_mock, client):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(client, path, batch_size=2, autostart=False)
+    outbox.enqueue_many(
+        [("send_message", ("U1", "B1", "a"), {}), ("send_message", ("U2", "B1", "b"), {})]
+    )
+    outbox.enqueue("send_message", "U3", "B1", "c")
+    outbox._claim()  # simulate a crash after claiming a batch
+    assert outbox.stats()["in_flight"] == 2
+    outbox.close(drain=False)
+
+    with Outbox(client, path) as reopened:
+        assert reopened.recovered == 2
+        assert reopened.join(timeout=5)
+        assert reopened.stats()["delivered"] == 3
+
+
+def test_outbox_locks_its_journal_to_one_process(tmp_path, client):
+    path = str(tmp_path / "outbox.db")
+    with Outbox(client, path, autostart=False) as outbox:
+        outbox.enqueue("send_message", "U1", "B1", "a")
+        other = sqlite3.connect(path, timeout=0.1)
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                other.execute("UPDATE outbox SET state = 'pending'")
+        finally:
+            other.close()
+    with Outbox(client, path, autostart=False) as reopened:
+        assert reopened.stats()["depth"] == 1
+
+
+def test_outbox_treats_duplicates_as_delivered(tmp_path, requests_mock):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    client = OneChat("dummy", deduplicator=SendDeduplicator())
+    with Outbox(client, str(tmp_path / "outbox.db"), workers=1) as outbox:
+        first = outbox.enqueue("send_message", "U1", "B1", "hi", idempotency_key="order-7")
+        again = outbox.enqueue("send_message", "U1", "B1", "hi", idempotency_key="order-7")
+        assert outbox.join(timeout=5)
+        assert outbox.status(first)["response"] == {"status": "success"}
+        assert outbox.status(again)["state"] == "delivered"
+        assert outbox.status(again)["response"]["status"] == "duplicate"
+    assert req.call_count == 1
+
+
+def test_outbox_records_failures_and_requeues_them(tmp_path, requests_mock, client):
+    requests_mock.post(
+        BROADCAST_URL,
+        [
+            {"json": {"status": "fail", "message": "bad"}, "status_code": 400},
+            {"json": {"status": "success"}, "status_code": 200},
+        ],
+    )
+    with Outbox(client, str(tmp_path / "outbox.db"), workers=1) as outbox:
+        item = outbox.enqueue("broadcast_message", "B1", ["U1", "U2"], "hello")
+        assert outbox.join(timeout=5)
+        assert outbox.status(item)["state"] == "failed"
+        assert outbox.status(item)["response"]["message"] == "bad"
+
+        assert outbox.retry_failed() == 1
+        assert outbox.join(timeout=5)
+        assert outbox.status(item)["state"] == "delivered"
+        assert outbox.status(item)["attempts"] == 2
+
+
+class _LockedOnce:
+    """Connection proxy failing the first acknowledgement write like a busy journal."""
+
+    def __init__(self, db):
+        self._db = db
+        self.failed = False
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def executemany(self, sql, rows):
+        if "finished_at" in sql and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("database is locked")
+        return self._db.executemany(sql, rows)
+
+
+def test_outbox_retries_a_failed_acknowledgement(tmp_path, requests_mock, client):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    with Outbox(client, str(tmp_path / "outbox.db"), workers=1, autostart=False) as outbox:
+        outbox._db = _LockedOnce(outbox._db)
+        item = outbox.enqueue("send_message", "U1", "B1", "hi")
+        outbox.start()
+
+        assert outbox.join(timeout=5)
+        assert outbox.status(item)["state"] == "delivered"
+        assert outbox.stats()["journal_errors"] == 1
+        assert isinstance(outbox.last_error, sqlite3.OperationalError)
+
+
+def test_outbox_rejects_unknown_methods(tmp_path, client):
+    with Outbox(client, str(tmp_path / "outbox.db"), autostart=False) as outbox:
+        with pytest.raises(ValueError):
+            outbox.enqueue("list_friend_ids", "B1")
+        assert outbox.stats()["depth"] == 0
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from one_chat import Hooks, OneChat, RetryPolicy
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+CAROUSEL_URL = "https://chat-api.one.th/bot-message/api/v1/image-carousel"
+QUICKREPLY_URL = "https://chat-api.one.th/message/api/v1/push_quickreply"
+
+TEMPLATE = [{"type": "text", "message": 'สวัสดี "quoted"'}]
+QUICK_REPLY = [{"label": "Yes", "type": "text", "message": "yes", "payload": "y"}]
+
+
+@pytest.fixture
+def client():
+    return OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+
+@pytest.mark.parametrize(
+    "method, url, args",
+    [
+        ("send_message", MESSAGE_URL, ("hello",)),
+        ("send_template", MESSAGE_URL, (TEMPLATE,)),
+        ("send_sticker", MESSAGE_URL, ("STK1",)),
+        ("send_quickreply", QUICKREPLY_URL, ("pick", QUICK_REPLY)),
+        ("send_image_carousel", CAROUSEL_URL, ([{"image": "a.png", "title": "A"}],)),
+    ],
+)
+def test_prepared_body_matches_regular_send(requests_mock, client, method, url, args):
+    req = requests_mock.post(url, json={"status": "success"})
+    prepared = client.prepare(method, "B1", *args)
+
+    assert getattr(client, method)("U1", "B1", *args, "notify") == {"status": "success"}
+    assert client.send_prepared(prepared, "U1", "notify") == {"status": "success"}
+
+    regular, spliced = (json.loads(r.body) for r in req.request_history)
+    assert spliced == regular
+
+
+def test_prepared_body_splices_escaped_recipient():
+    client = OneChat("dummy")
+    prepared = client.prepare("send_template", "B1", TEMPLATE)
+
+    body = prepared.body('U"1')
+
+    assert json.loads(body) == {
+        "to": 'U"1',
+        "bot_id": "B1",
+        "type": "template",
+        "elements": TEMPLATE,
+    }
+    assert body[len(b'{"to":"U\\"1"') :] == prepared.body("U2")[len(b'{"to":"U2"') :]
+
+
+def test_prepare_validates_once():
+    client = OneChat("dummy")
+    with pytest.raises(ValueError):
+        client.prepare("send_image_carousel", "B1", [])
+    with pytest.raises(ValueError):
+        client.prepare("send_quickreply", "B1", "pick", None)
+    with pytest.raises(ValueError):
+        client.prepare("send_file", "B1", "/tmp/x")
+    with pytest.raises(ValueError):
+        client.prepare("send_message", "", "hi")
+    with pytest.raises(TypeError):
+        client.prepare("send_message", "B1")
+
+
+def test_send_prepared_many_and_bot_id_reaches_hooks(requests_mock):
+    hooks = Hooks()
+    bots = []
+    hooks.on("request_start", lambda event: bots.append(event.bot_id))
+    client = OneChat("dummy", hooks=hooks)
+    req = requests_mock.post(CAROUSEL_URL, json={"status": "success"})
+    prepared = client.prepare("send_image_carousel", "B1", [{"image": "a.png"}])
+
+    results = dict(client.send_prepared_many(prepared, [f"U{i}" for i in range(20)], max_workers=4))
+
+    assert len(results) == 20 and all(r == {"status": "success"} for r in results.values())
+    assert {r.json()["to"] for r in req.request_history} == set(results)
+    assert bots == ["B1"] * 20
+
+
+def test_send_prepared_normalizes_errors(requests_mock, client):
+    requests_mock.post(MESSAGE_URL, json={"status": "fail", "message": "bad bot"}, status_code=400)
+    prepared = client.prepare("send_message", "B1", "hi")
+
+    assert client.send_prepared(prepared, "U1") == {"status": "fail", "message": "bad bot"}
+
+
+def test_async_send_prepared(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import IMAGE_CAROUSEL_PATH, AsyncOneChat
+
+    async def main():
+        async with AsyncOneChat("dummy", base_url=stub_server.url) as client:
+            prepared = client.prepare("send_image_carousel", "B1", [{"image": "a.png"}])
+            return await client.send_prepared(prepared, "U1", "note")
+
+    assert asyncio.run(main()) == {"status": "success"}
+    path, headers, body = stub_server.received[0]
+    assert path == IMAGE_CAROUSEL_PATH
+    assert json.loads(body) == {
+        "to": "U1",
+        "custom_notification": "note",
+        "bot_id": "B1",
+        "elements": [{"image": "a.png"}],
+    }
@@ -0,0 +1,86 @@
+import threading
+
+from one_chat import OneChat
+from one_chat.rate_limit import RateLimiter, TokenBucket, endpoint_name, parse_retry_after
+from one_chat.retry import RetryPolicy
+
+PUSH_URL = "https://chat-api.one.th/message/api/v1/push_message"
+
+
+def test_endpoint_name_and_retry_after():
+    assert endpoint_name(PUSH_URL) == "push_message"
+    assert endpoint_name("https://x/bot-message/api/v1/image-carousel?a=1") == "image-carousel"
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.0
+    assert abs(bucket.reserve(now) - 0.1) < 1e-9
+    assert abs(bucket.reserve(now) - 0.2) < 1e-9
+
+
+def test_token_bucket_throttle_pauses_and_halves_rate():
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    now = bucket.updated
+    bucket.throttle(now, retry_after=1.5)
+    assert bucket.rate == 5.0
+    assert bucket.reserve(now) >= 1.5
+    bucket.recover()
+    assert bucket.rate == 6.0
+
+
+def test_limiter_buckets_are_per_bot_and_endpoint():
+    limiter = RateLimiter(rates={"push_message": (1.0, 1)})
+    assert limiter.reserve("B1", PUSH_URL) == 0.0
+    assert limiter.reserve("B1", PUSH_URL) > 0.0
+    assert limiter.reserve("B2", PUSH_URL) == 0.0
+
+    stats = limiter.stats()
+    assert stats["acquired"] == 3
+    assert stats["waited"] == 1
+    assert stats["buckets"]["B1 push_message"]["wait_seconds"] > 0
+
+
+def test_limiter_is_thread_safe():
+    limiter = RateLimiter(rates={"push_message": (1000.0, 1000)})
+
+    def worker():
+        for _ in range(100):
+            limiter.reserve("B1", PUSH_URL)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert limiter.stats()["acquired"] == 800
+
+
+def test_client_paces_and_reacts_to_throttling(requests_mock):
+    limiter = RateLimiter(rates={"push_message": (100.0, 1)})
+    client = OneChat("dummy", rate_limiter=limiter, retry_policy=RetryPolicy(max_attempts=1))
+    requests_mock.post(
+        client.message_sender.base_url,
+        [
+            {"json": {"status": "fail"}, "status_code": 429, "headers": {"Retry-After": "0"}},
+            {"json": {"status": "success"}, "status_code": 200},
+        ],
+    )
+
+    assert client.send_message("U1", "B1", "hi")["status"] == "fail"
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+
+    stats = client.rate_limit_stats()
+    assert stats["acquired"] == 2
+    assert stats["throttled"] == 1
+    assert stats["waited"] == 1
+
+
+def test_rate_limit_stats_empty_when_disabled():
+    assert OneChat("dummy").rate_limit_stats() == {}
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+import requests
+
+from one_chat import OneChat
+from one_chat.message_sender import MessageSender
+from one_chat.retry import RetryBudget, RetryPolicy
+from one_chat.transport import Transport
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0, jitter=False)
+    assert [policy.backoff(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 4.0]
+    jittered = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+    assert all(0 <= jittered.backoff(3) <= 4.0 for _ in range(50))
+
+
+def test_next_delay_rules():
+    policy = RetryPolicy(max_attempts=3, jitter=False, max_retry_after=10)
+    assert policy.next_delay(1, status_code=400) is None
+    assert policy.next_delay(1, status_code=503) == 0.5
+    assert policy.next_delay(1, status_code=429, retry_after=3.0) == 3.0
+    assert policy.next_delay(1, status_code=429, retry_after=30.0) is None
+    assert policy.next_delay(3, status_code=503) is None
+    assert policy.next_delay(1) == 0.5
+    assert policy.stats()["retries"] == 3
+    assert policy.stats()["gave_up"] == 2
+
+
+def test_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=1.0)
+    policy = RetryPolicy(budget=budget, jitter=False)
+    assert policy.next_delay(1, status_code=500) is not None
+    assert policy.next_delay(1, status_code=500) is None
+    policy.record_request()
+    policy.record_request()
+    assert policy.next_delay(1, status_code=500) is not None
+    assert policy.stats()["budget_exhausted"] == 1
+
+
+def test_transport_retries_5xx_then_succeeds(requests_mock):
+    client = OneChat("dummy", retry_policy=RetryPolicy(backoff_base=0))
+    req = requests_mock.post(
+        client.message_sender.base_url,
+        [
+            {"json": {"message": "down"}, "status_code": 503},
+            {"json": {"message": "down"}, "status_code": 502},
+            {"json": {"status": "success"}, "status_code": 200},
+        ],
+    )
+
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
+    assert req.call_count == 3
+    assert client.retry_stats()["retries"] == 2
+
+
+def test_transport_gives_up_with_last_error(requests_mock):
+    client = OneChat("dummy", retry_policy=RetryPolicy(max_attempts=2, backoff_base=0))
+    req = requests_mock.post(
+        client.message_sender.base_url, json={"message": "down"}, status_code=500
+    )
+
+    assert client.send_message("U1", "B1", "hi") == {"status": "fail", "message": "down"}
+    assert req.call_count == 2
+
+
+def test_transport_retries_connect_errors(requests_mock):
+    transport = Transport(retry_policy=RetryPolicy(backoff_base=0))
+    ms = MessageSender("dummy", transport)
+    requests_mock.post(
+        ms.base_url,
+        [
+            {"exc": requests.exceptions.ConnectTimeout},
+            {"json": {"status": "success"}, "status_code": 200},
+        ],
+    )
+    assert ms.send_message("U1", "B1", "hi") == {"status": "success"}
+
+
+def test_non_retryable_exception_is_not_retried(requests_mock):
+    transport = Transport(retry_policy=RetryPolicy(backoff_base=0))
+    ms = MessageSender("dummy", transport)
+    req = requests_mock.post(ms.base_url, exc=requests.exceptions.InvalidURL)
+    assert ms.send_message("U1", "B1", "hi")["status"] == "fail"
+    assert req.call_count == 1
+
+
+def test_send_file_retry_resends_whole_file(tmp_path, requests_mock):
+    transport = Transport(retry_policy=RetryPolicy(backoff_base=0))
+    ms = MessageSender("dummy", transport)
+    req = requests_mock.post(
+        ms.base_url,
+        [
+            {"json": {}, "status_code": 503},
+            {"json": {"status": "success"}, "status_code": 200},
+        ],
+    )
+    f = tmp_path / "x.txt"
+    f.write_text("file-content")
+
+    assert ms.send_file("U1", "B1", str(f)) == {"status": "success"}
+    assert all(b"file-content" in r.body.read_all() for r in req.request_history)
+
+
+def test_async_client_retries_server_errors(stub_server):
+    pytest.importorskip("aiohttp")
+    from one_chat.async_client import MESSAGE_PATH, AsyncOneChat
+
+    stub_server.respond(MESSAGE_PATH, status=503, json_body={"message": "down"})
+
+    async def main():
+        policy = RetryPolicy(max_attempts=2, backoff_base=0)
+        async with AsyncOneChat("dummy", base_url=stub_server.url, retry_policy=policy) as client:
+            return await client.send_message("U1", "B1", "hi")
+
+    assert asyncio.run(main()) == {"status": "fail", "message": "down"}
+    assert len(stub_server.received) == 2
+
+
+def test_default_client_sends_once_on_read_timeout(requests_mock):
+    req = requests_mock.post(
+        "https://chat-api.one.th/message/api/v1/push_message", exc=requests.exceptions.ReadTimeout
+    )
+
+    resp = OneChat("dummy").send_message("U1", "B1", "hi")
+
+    assert resp["status"] == "fail" and "Request failed" in resp["message"]
+    assert req.call_count == 1
@@ -0,0 +1,75 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from one_chat import OneChat, RetryPolicy, Scheduler
+
+MESSAGE_URL = "https://chat-api.one.th/message/api/v1/push_message"
+
+
+@pytest.fixture
+def client():
+    return OneChat("dummy", retry_policy=RetryPolicy(max_attempts=1))
+
+
+def test_items_are_sent_in_due_order(requests_mock, client):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    now = time.time()
+    with Scheduler(client, max_workers=1) as scheduler:
+        scheduler.schedule(now + 0.2, "send_message", "late", "B1", "hi")
+        scheduler.schedule(
+            datetime.now() + timedelta(seconds=0.1), "send_message", "mid", "B1", "hi"
+        )
+        scheduler.schedule(now - 5, "send_message", "overdue", "B1", "hi")
+        assert scheduler.join(timeout=5)
+        assert scheduler.stats()["succeeded"] == 3
+
+    assert [r.json()["to"] for r in req.request_history] == ["overdue", "mid", "late"]
+
+
+def test_nothing_is_sent_before_it_is_due(requests_mock, client):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    with Scheduler(client) as scheduler:
+        scheduler.schedule(time.time() + 60, "send_message", "U1", "B1", "hi")
+        time.sleep(0.05)
+        stats = scheduler.stats()
+        assert stats["pending"] == 1 and 0 < stats["next_due_in"] <= 60
+    assert req.call_count == 0
+
+
+def test_schedule_many_spreads_sends_over_the_window(requests_mock, client):
+    requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    sent_at = {}
+
+    def record(item_id, to, response):
+        sent_at[to] = time.time()
+
+    start = time.time() + 0.05
+    with Scheduler(client, max_workers=4, on_result=record) as scheduler:
+        scheduler.schedule_many(start, "send_message", ["A", "B", "C", "D"], "B1", "hi", spread=0.4)
+        assert scheduler.join(timeout=5)
+
+    assert sent_at["A"] < sent_at["B"] < sent_at["C"] < sent_at["D"]
+    assert sent_at["D"] - start >= 0.3
+
+
+def test_cancel_pending_item(requests_mock, client):
+    req = requests_mock.post(MESSAGE_URL, json={"status": "success"}, status_code=200)
+    with Scheduler(client) as scheduler:
+        keep, drop = scheduler.schedule_many(
+            time.time() + 0.1, "send_message", ["K", "D"], "B1", "x"
+        )
+        assert scheduler.cancel(drop)
+        assert not scheduler.cancel(drop)
+        assert scheduler.join(timeout=5)
+        assert not scheduler.cancel(keep)
+        assert scheduler.stats()["cancelled"] == 1
+
+    assert [r.json()["to"] for r in req.request_history] == ["K"]
+
+
+def test_rejects_unsupported_methods(client):
+    with Scheduler(client) as scheduler:
+        with pytest.raises(ValueError):
+            scheduler.schedule(time.time(), "broadcast_message", "U1", "B1", "hi")
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from one_chat.get_friends_and_groups import FriendAndGroupManager
+from one_chat.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_thread_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"status": "success"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("B1", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("B1", slow))) for _ in range(5)
+    ]
+    for t in followers:
+        t.start()
+    while flight.stats()["coalesced"] < 5:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 6 and all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 6, "executions": 1, "coalesced": 5}
+
+
+def test_errors_propagate_and_key_is_released():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_async_calls_are_coalesced():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"status": "success"}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("B1", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"status": "success"} for r in results)
+    assert flight.stats()["coalesced"] == 9
+
+
+def test_cancelled_async_leader_does_not_cancel_followers():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("B1", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.do("B1", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == [2, 2, 2]
+    assert len(calls) == 2
+    assert flight.stats() == {"calls": 4, "executions": 2, "coalesced": 2}
+
+
+def test_manager_coalesces_concurrent_fetches(requests_mock):
+    fm = FriendAndGroupManager("dummy", cache_ttl=60)
+    gate = threading.Event()
+
+    def respond(request, context):
+        gate.wait(5)
+        return {"status": "success", "list_friend": [], "list_group": []}
+
+    req = requests_mock.post(fm.base_url, json=respond)
+    threads = [threading.Thread(target=fm.fetch_friends_and_groups, args=("B1",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while fm.coalesce_stats()["calls"] < 8:
+        time.sleep(0.001)
+    gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert req.call_count == 1
+    assert fm.coalesce_stats()["coalesced"] == 7
@@ -0,0 +1,53 @@
+from one_chat import OneChat
+from one_chat.message_sender import MessageSender
+from one_chat.transport import Transport
+
+
+def test_onechat_senders_share_one_transport():
+    client = OneChat("dummy")
+    senders = [
+        client.message_sender,
+        client.broadcast_sender,
+        client.location_sender,
+        client.sticker_sender,
+        client.quick_reply_sender,
+        client.image_carousel_sender,
+        client.friends_and_groups,
+    ]
+    assert all(s.transport is client.transport for s in senders)
+
+
+def test_pool_reuses_keepalive_connection(stub_server):
+    transport = Transport()
+    ms = MessageSender("dummy", transport)
+    ms.base_url = stub_server.url + "/message/api/v1/push_message"
+
+    for _ in range(3):
+        assert ms.send_message("U1", "B1", "hi") == {"status": "success"}
+
+    stats = transport.pool_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["hit_ratio"] == 2 / 3
+    transport.close()
+
+
+def test_idle_connections_are_evicted(stub_server):
+    transport = Transport(idle_timeout=0.0)
+    ms = MessageSender("dummy", transport)
+    ms.base_url = stub_server.url + "/message/api/v1/push_message"
+
+    ms.send_message("U1", "B1", "one")
+    ms.send_message("U1", "B1", "two")
+
+    stats = transport.pool_stats()
+    assert stats["evictions"] == 1
+    assert stats["misses"] == 2
+    assert stats["hits"] == 0
+    transport.close()
+
+
+def test_transport_works_with_requests_mock(requests_mock):
+    client = OneChat("dummy")
+    requests_mock.post(client.message_sender.base_url, json={"status": "success"})
+    assert client.send_message("U1", "B1", "hi") == {"status": "success"}
@@ -0,0 +1,83 @@
+import os
+
+from one_chat import OneChat
+from one_chat.upload_cache import UploadCache
+
+
+def test_unchanged_file_is_read_once(tmp_path):
+    f = tmp_path / "report.pdf"
+    f.write_bytes(b"pdf" * 100)
+    cache = UploadCache()
+
+    assert cache.get(str(f)) == b"pdf" * 100
+    assert cache.get(str(f)) == b"pdf" * 100
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "too_large": 0,
+        "entries": 1,
+        "bytes": 300,
+    }
+
+
+def test_modified_file_is_reloaded(tmp_path):
+    f = tmp_path / "report.csv"
+    f.write_bytes(b"v1")
+    cache = UploadCache()
+    cache.get(str(f))
+
+    f.write_bytes(b"v2-longer")
+    os.utime(f, ns=(1, 1))
+    assert cache.get(str(f)) == b"v2-longer"
+    assert cache.stats()["misses"] == 2
+
+
+def test_identical_content_shares_one_entry(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    cache = UploadCache()
+
+    assert cache.get(str(a)) is cache.get(str(b))
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 4
+
+
+def test_lru_eviction_by_bytes_and_large_files_bypass(tmp_path):
+    files = []
+    for name in ("a", "b", "c"):
+        f = tmp_path / name
+        f.write_bytes(name.encode() * 40)
+        files.append(str(f))
+    big = tmp_path / "big"
+    big.write_bytes(b"x" * 101)
+    cache = UploadCache(max_bytes=100)
+
+    cache.get(files[0])
+    cache.get(files[1])
+    cache.get(files[0])  # a is now most recently used
+    cache.get(files[2])  # evicts b
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 80
+    cache.get(files[0])
+    assert cache.stats()["hits"] == 2
+    assert cache.get(str(big)) is None
+    assert cache.stats()["too_large"] == 1
+
+
+def test_send_many_file_reads_disk_once(tmp_path, requests_mock):
+    f = tmp_path / "report.pdf"
+    f.write_bytes(b"%PDF" * 1000)
+    client = OneChat("dummy", upload_cache_bytes=1024 * 1024)
+    req = requests_mock.post(
+        client.message_sender.base_url, json={"status": "success"}, status_code=200
+    )
+
+    results = dict(client.send_many("send_file", ["U1", "U2", "U3"], "B1", str(f)))
+
+    assert set(results) == {"U1", "U2", "U3"}
+    assert client.upload_cache_stats()["misses"] == 1
+    assert client.upload_cache_stats()["hits"] == 2
+    for request in req.request_history:
+        assert request.body.read_all().count(b"%PDF") == 1000
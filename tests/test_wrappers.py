@@ -1,4 +1,4 @@
-from one_chat import broadcast_message, init, send_message
+from one_chat import broadcast_bulk, broadcast_message, init, send_message
 
 
 def test_wrapper_send_message_success(requests_mock):
@@ -29,3 +29,17 @@ def test_wrapper_broadcast_normalizes_to_string(requests_mock):
     # Ensure body has list for 'to'
     assert isinstance(req.last_request.json()["to"], list)
     assert req.last_request.json()["to"] == ["U1"]
+
+
+def test_wrapper_broadcast_bulk_uses_default_bot(requests_mock):
+    init("dummy", to="U1", bot_id="B1")
+
+    from one_chat.broadcast_sender import BroadcastSender
+
+    bs = BroadcastSender("dummy")
+    req = requests_mock.post(bs.base_url, json={"status": "success"}, status_code=200)
+
+    resp = broadcast_bulk(to=[f"U{i}" for i in range(150)], message="hello")
+    assert resp["status"] == "success"
+    assert req.call_count == 2
+    assert all(r.json()["bot_id"] == "B1" for r in req.request_history)